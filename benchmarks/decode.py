@@ -0,0 +1,56 @@
+"""
+Decode cost per endpoint for every installed JSON backend, with and without a node schema, and the
+size of the decoded page that stays in memory.
+
+Payloads are synthetic pages shaped like the GraphQL responses, or captured responses given as
+ENDPOINT=path arguments:
+
+    python benchmarks/decode.py
+    python benchmarks/decode.py get_followers=followers.json
+"""
+import json, os, sys, timeit
+
+# Run from a checkout, the package is imported from the repository rather than an installed copy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from threadscrape.decoding import BACKENDS, JSONDecoder
+from threadscrape.mock_server import fake_user, fake_post, fake_connection
+
+USER_SCHEMA = {"pk": True, "username": True, "full_name": True, "is_verified": True, "profile_pic_url": True}
+THREAD_SCHEMA = {"id": True, "thread_items": {"post": {"pk": True, "code": True, "caption": True, "like_count": True}}}
+
+
+SYNTHETIC = {
+    "get_followers": ("BarcelonaFriendshipsFollowersTabQuery", USER_SCHEMA,
+                      {"data": {"fetch__XDTUserDict": {"followers": fake_connection([fake_user(i) for i in range(50)], 0, 1000)}}}),
+    "get_user_profile_threads": ("BarcelonaProfileThreadsTabQuery", THREAD_SCHEMA,
+                                 {"data": {"mediaData": fake_connection([{"id": str(i), "thread_items": [{"post": fake_post(i)}, {"post": fake_post(i + 100)}]} for i in range(25)], 0, 1000)}}),
+    "get_post_info": ("BarcelonaPostPageQuery", None,
+                      {"data": {"data": fake_connection([{"thread_items": [{"post": fake_post(i, carousel=3)} for i in range(3)]}], 0, 1)}}),
+}
+
+
+def main(argv):
+    payloads = {name: (key, schema, json.dumps(value).encode()) for name, (key, schema, value) in SYNTHETIC.items()}
+    for argument in argv:
+        name, path = argument.split("=", 1)
+        key, schema, _ = payloads[name]
+        with open(path, "rb") as f:
+            payloads[name] = (key, schema, f.read())
+
+    # Schemas add a pruning pass after the full decode, what they buy is the smaller page kept in memory
+    print("{:<26} {:<8} {:<7} {:>10} {:>10} {:>9}".format("endpoint", "backend", "schema", "us/decode", "MB/s", "kept KB"))
+    for name, (key, schema, content) in payloads.items():
+        for backend in BACKENDS:
+            for use_schema in (False, True) if schema else (False,):
+                decoder = JSONDecoder(backend, {key: schema} if use_schema else None)
+                number = 200
+                seconds = min(timeit.repeat(lambda: decoder.decode(content, key), number=number, repeat=5)) / number
+                kept = len(json.dumps(decoder.decode(content, key))) / 1024
+                print("{:<26} {:<8} {:<7} {:>10.1f} {:>10.1f} {:>9.1f}".format(
+                    name, backend, "yes" if use_schema else "no", seconds * 1e6, len(content) / seconds / 1e6, kept,
+                ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
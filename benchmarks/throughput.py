@@ -0,0 +1,156 @@
+"""
+Requests/sec, p50/p99 latency and client CPU per request of every operation, for the sync, threaded and
+async clients, against the local stand-in server of threadscrape.mock_server.
+
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --requests 500 --workers 32 --latency 0.05 --jitter 0.02 --json results.json
+
+The server runs in a subprocess so its CPU isn't counted as the client's.
+"""
+import argparse, asyncio, json, os, subprocess, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+# Run from a checkout, the package is imported from the repository rather than an installed copy
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from threadscrape import ThreadScrape, AsyncThreadScrape, UserRef, PostRef, create_session
+from threadscrape.mock_server import CREDENTIALS
+
+# Every call gets its own target, so caches and request coalescing don't hide the requests
+OPERATIONS = {
+    "get_user_id": lambda api, i: api.get_user_id("user_{}".format(i)),
+    "resolve_post": lambda api, i: api.resolve_post("{}/@user_{}/post/C{}".format(api.BASE_URL, i, i)),
+    "get_profile_info": lambda api, i: api.get_profile_info("user_{}".format(i)),
+    "get_followers": lambda api, i: api.get_followers(UserRef(i + 1), 50),
+    "get_user_profile_threads": lambda api, i: api.get_user_profile_threads(UserRef(i + 1), 25),
+    "get_post_info": lambda api, i: api.get_post_info(PostRef(str(i + 1), "1")),
+    "create_thread": lambda api, i: api.create_thread("Benchmark thread {}".format(i)),
+}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(round(q * (len(values) - 1)))] if values else 0.0
+
+
+def summarize(mode, name, latencies, errors, wall, cpu):
+    count = len(latencies) + errors
+    return {
+        "mode": mode,
+        "operation": name,
+        "requests": count,
+        "errors": errors,
+        "requests_per_second": count / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "cpu_ms_per_request": cpu / count * 1000 if count else 0.0,
+    }
+
+
+def timed(operation, api, i):
+    started = time.perf_counter()
+    try:
+        operation(api, i)
+    except Exception:
+        return None
+    return time.perf_counter() - started
+
+
+def run_sync(url, name, requests, workers):
+    api = ThreadScrape(CREDENTIALS, base_url=url)
+    operation = OPERATIONS[name]
+    started, cpu = time.perf_counter(), time.process_time()
+    results = [timed(operation, api, i) for i in range(requests)]
+    return results, time.perf_counter() - started, time.process_time() - cpu
+
+
+def run_threaded(url, name, requests, workers):
+    api = ThreadScrape(CREDENTIALS, base_url=url, session=create_session(pool_maxsize=workers))
+    operation = OPERATIONS[name]
+    started, cpu = time.perf_counter(), time.process_time()
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda i: timed(operation, api, i), range(requests)))
+    return results, time.perf_counter() - started, time.process_time() - cpu
+
+
+def run_async(url, name, requests, workers):
+    operation = OPERATIONS[name]
+
+    async def timed_async(api, i, slots):
+        # Like the thread pool, only workers calls run at once and the wait for a slot isn't timed
+        async with slots:
+            started = time.perf_counter()
+            try:
+                await operation(api, i)
+            except Exception:
+                return None
+            return time.perf_counter() - started
+
+    async def main():
+        slots = asyncio.Semaphore(workers)
+        async with AsyncThreadScrape(CREDENTIALS, max_concurrency=workers, max_connections=workers, base_url=url) as api:
+            return await asyncio.gather(*[timed_async(api, i, slots) for i in range(requests)])
+
+    started, cpu = time.perf_counter(), time.process_time()
+    results = asyncio.run(main())
+    return results, time.perf_counter() - started, time.process_time() - cpu
+
+
+MODES = {"sync": run_sync, "threaded": run_threaded, "async": run_async}
+
+
+def start_server(args):
+    command = [
+        sys.executable, "-m", "threadscrape.mock_server", "--port", "0",
+        "--latency", str(args.latency), "--jitter", str(args.jitter),
+        "--rate-limit-rate", str(args.rate_limit_rate), "--error-rate", str(args.error_rate), "--seed", "0",
+    ]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, cwd=ROOT)
+    line = server.stdout.readline()
+    return server, line.strip().rsplit(" ", 1)[-1]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per operation and mode.")
+    parser.add_argument("--workers", type=int, default=16, help="Threads, or concurrent coroutines for async.")
+    parser.add_argument("--modes", default="sync,threaded,async")
+    parser.add_argument("--operations", default=",".join(OPERATIONS))
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args(argv)
+
+    server, url = start_server(args)
+    rows = []
+    try:
+        print("{:<9} {:<25} {:>9} {:>9} {:>9} {:>12} {:>7}".format(
+            "mode", "operation", "req/s", "p50 ms", "p99 ms", "cpu ms/req", "errors",
+        ))
+        for mode in args.modes.split(","):
+            for name in args.operations.split(","):
+                try:
+                    results, wall, cpu = MODES[mode](url, name, args.requests, args.workers)
+                except ImportError as error:
+                    print("{:<9} skipped: {}".format(mode, error))
+                    break
+
+                latencies = [result for result in results if result is not None]
+                row = summarize(mode, name, latencies, len(results) - len(latencies), wall, cpu)
+                rows.append(row)
+                print("{mode:<9} {operation:<25} {requests_per_second:>9.1f} {p50_ms:>9.2f} {p99_ms:>9.2f} "
+                      "{cpu_ms_per_request:>12.3f} {errors:>7}".format(**row))
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
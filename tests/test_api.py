@@ -0,0 +1,13 @@
+import pytest
+from threadscrape import ThreadScrape, PostRef, ThreadScrapeError
+from threadscrape.mock_server import CREDENTIALS
+
+
+def test_post_ref_without_url_or_user_id_is_rejected():
+    api = ThreadScrape(CREDENTIALS)
+
+    assert api.get_post_id(PostRef("123")) == "123"
+    with pytest.raises(ThreadScrapeError):
+        api.resolve_post(PostRef("123"))
+    with pytest.raises(ThreadScrapeError):
+        api.get_id(PostRef("123"))
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from threadscrape import ServerError
+from threadscrape.hooks import Hooks
+from threadscrape.mock_server import CREDENTIALS, MockServer
+from threadscrape.ratelimit import Backoff, RequestDispatcher
+from threadscrape.response_cache import ResponseCache
+
+httpx = pytest.importorskip("httpx")
+from threadscrape import AsyncThreadScrape
+
+
+def run(server, coroutine_function, **kwargs):
+    async def main():
+        async with AsyncThreadScrape(CREDENTIALS, base_url=server.url, **kwargs) as api:
+            return api, await coroutine_function(api)
+
+    return asyncio.run(main())
+
+
+def test_rate_limited_pages_are_retried():
+    dispatcher = RequestDispatcher(retry_on=(Exception,), backoff=Backoff(base=0.01, max_delay=0.01, max_retries=10))
+
+    with MockServer(rate_limit_rate=0.3, seed=1, page_bytes=20000) as server:
+        async def resolve(api):
+            return await asyncio.gather(*(api.get_user_id("user_{}".format(index)) for index in range(20)))
+
+        api, user_ids = run(server, resolve, dispatcher=dispatcher)
+
+    assert len(set(user_ids)) == 20
+    assert dispatcher.retries > 0
+
+
+def test_server_errors_are_raised_as_such():
+    with MockServer(error_rate=1.0) as server:
+        with pytest.raises(ServerError):
+            run(server, lambda api: api.get_user_id("user_1"), dispatcher=RequestDispatcher())
+        with pytest.raises(ServerError):
+            run(server, lambda api: api.get_profile_info("user_1"), dispatcher=RequestDispatcher())
+
+
+def test_responses_are_cached_and_hooks_called():
+    hooks, events = Hooks(), []
+    hooks.register("after_response", lambda **fields: events.append((fields["key"], fields["phase"])))
+
+    with MockServer() as server:
+        async def twice(api):
+            first = await api.get_profile_info("user_1")
+            return first, await api.get_profile_info("user_1")
+
+        api, (first, second) = run(server, twice, response_cache=ResponseCache(), hooks=hooks)
+
+    assert first == second
+    assert server.requests == 1
+    assert [phase for _, phase in events] == ["request", "decode"]
+
+
+def test_connections_are_split_over_small_clients():
+    async def main():
+        async with AsyncThreadScrape(CREDENTIALS, max_connections=100) as api:
+            return len(api.sessions)
+
+    assert asyncio.run(main()) == 7
@@ -0,0 +1,80 @@
+import asyncio, itertools, time
+from threadscrape.batch import run_batch, run_batch_async
+
+
+def square(item):
+    if item == 3:
+        raise ValueError(item)
+    return item * item
+
+
+def test_results_are_deduplicated_and_failures_captured():
+    results = list(run_batch(square, [1, 2, 3, 2, 4, 1], max_workers=2))
+
+    assert [item.input for item in results] == [1, 2, 3, 4]
+    assert [item.result for item in results] == [1, 4, None, 16]
+    assert isinstance(results[2].error, ValueError) and not results[2].ok
+
+
+def test_unordered_results_cover_every_input():
+    results = run_batch(square, range(100), max_workers=4, ordered=False)
+
+    assert sorted(item.input for item in results) == list(range(100))
+
+
+def test_inputs_are_read_as_the_batch_goes():
+    pulled = []
+
+    def endless():
+        for item in itertools.count():
+            pulled.append(item)
+            yield item
+
+    batch = run_batch(lambda item: item, endless(), max_workers=4)
+    assert next(batch).input == 0
+    assert len(pulled) <= 2 * 4 + 1
+
+    batch.close()
+    assert len(pulled) <= 2 * 4 + 1
+
+
+def test_closing_cancels_pending_items_and_waits_for_running_ones():
+    finished = []
+
+    def slow(item):
+        time.sleep(0.1)
+        finished.append(item)
+        return item
+
+    batch = run_batch(slow, [1, 2, 3], max_workers=1)
+    assert next(batch).input == 1
+    batch.close()
+
+    # 2 was running and is waited for, 3 was pending and never runs
+    assert finished == [1, 2]
+    time.sleep(0.2)
+    assert finished == [1, 2]
+
+
+def test_async_batch_reads_inputs_as_it_goes():
+    pulled = []
+
+    def endless():
+        for item in itertools.count():
+            pulled.append(item)
+            yield item
+
+    async def double(item):
+        await asyncio.sleep(0)
+        return item * 2
+
+    async def main():
+        results = []
+        async for item in run_batch_async(double, endless(), max_concurrency=3):
+            results.append(item.result)
+            if len(results) == 10:
+                break
+        return results
+
+    assert asyncio.run(main()) == [item * 2 for item in range(10)]
+    assert len(pulled) <= 10 + 2 * 3
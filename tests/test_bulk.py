@@ -0,0 +1,58 @@
+import time
+from threadscrape import ThreadScrape, BulkExecutor, SQLiteCache
+from threadscrape.mock_server import CREDENTIALS, MockServer
+
+
+def client(server):
+    api, sent = ThreadScrape(CREDENTIALS, base_url=server.url), []
+    api.hooks.register("before_request", lambda key, **fields: sent.append(key))
+    return api, sent
+
+
+def test_journal_skips_jobs_done_in_an_earlier_run(tmp_path):
+    with MockServer(page_bytes=5000) as server:
+        api, sent = client(server)
+        jobs = [("like_post", "{}/@user_{}/post/C{}".format(server.url, index, index)) for index in range(3)]
+        first = BulkExecutor(api, rates={"like_post": 100}, journal=SQLiteCache(str(tmp_path / "bulk.db"), ttl=None)).run(jobs)
+        second = BulkExecutor(api, rates={"like_post": 100}, journal=SQLiteCache(str(tmp_path / "bulk.db"), ttl=None)).run(jobs)
+
+    assert [result.status for result in first.results] == ["done"] * 3
+    assert [result.status for result in second.results] == ["skipped"] * 3
+    assert sent.count("useBarcelonaLikeMutationLikeMutation") == 3
+
+
+def test_last_job_on_a_target_wins_whatever_its_spelling():
+    with MockServer(page_bytes=5000) as server:
+        api, sent = client(server)
+        report = BulkExecutor(api, check_state=False).run([
+            ("follow_user", "user_1"),
+            ("follow_user", "https://www.threads.net/@user_1"),
+            ("unfollow_user", "https://www.threads.net/@user_1/"),
+            ("follow_user", "user_2"),
+        ])
+
+    assert [result.status for result in report.results] == ["superseded", "superseded", "done", "done"]
+
+
+def test_actions_already_in_effect_are_skipped():
+    with MockServer(page_bytes=5000) as server:
+        api, sent = client(server)
+        # Mock users are neither followed nor blocked
+        report = BulkExecutor(api).run([("unfollow_user", "user_1"), ("follow_user", "user_2")])
+
+    assert [result.status for result in report.results] == ["skipped", "done"]
+    assert sent.count("BarcelonaUsernameHoverCardImplQuery") == 2
+    assert [key for key in sent if "Mutation" in key] == ["useBarcelonaFollowMutationFollowMutation"]
+
+
+def test_rates_pace_the_mutations():
+    with MockServer(page_bytes=5000) as server:
+        api, sent = client(server)
+        executor = BulkExecutor(api, rates={"follow_user": (20, 1)}, check_state=False)
+        jobs = [("follow_user", "user_{}".format(index)) for index in range(6)]
+
+        assert executor.estimate(jobs) == 6 / 20
+        started = time.monotonic()
+        executor.run(jobs)
+
+    assert time.monotonic() - started >= 5 / 20
@@ -0,0 +1,79 @@
+from threadscrape import ThreadScrape
+from threadscrape import cache as cache_module
+from threadscrape.cache import LRUCache, SQLiteCache
+from threadscrape.mock_server import CREDENTIALS, MockServer, fake_id
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+def test_lru_entries_expire_and_evict(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=None)
+    clock.now += 59
+    assert cache.get("a") == 1
+
+    # 'a' was used last, adding 'c' evicts 'b'
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 1}
+
+
+def test_sqlite_entries_survive_a_restart_and_expire(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    path = str(tmp_path / "users.db")
+
+    cache = SQLiteCache(path, maxsize=2, ttl=60)
+    cache.set("user_1", 1)
+    cache.set("user_2", 2, ttl=600)
+    cache.close()
+
+    cache = SQLiteCache(path, maxsize=2, ttl=60)
+    assert cache.get("user_1") == 1
+    clock.now += 61
+    assert cache.get("user_1") is None
+    assert cache.get("user_2") == 2
+
+    # Least recently used first
+    clock.now += 1
+    cache.set("user_3", 3)
+    clock.now += 1
+    cache.set("user_4", 4)
+    assert len(cache) == 2
+    assert cache.get("user_2") is None
+    assert cache.get("user_4") == 4
+    cache.close()
+
+
+def test_get_user_id_fetches_each_profile_once(tmp_path):
+    path = str(tmp_path / "users.db")
+    with MockServer() as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url, user_id_cache=SQLiteCache(path))
+        assert api.get_user_id("user_1") == fake_id("user_1")
+        assert api.get_user_id("https://www.threads.net/@USER_1") == fake_id("user_1")
+        assert server.requests == 1
+
+        # A new client on the same file doesn't fetch it again
+        api = ThreadScrape(CREDENTIALS, base_url=server.url, user_id_cache=SQLiteCache(path))
+        assert api.get_user_id("user_1") == fake_id("user_1")
+        assert server.requests == 1
+
+        api.invalidate_user_id("user_1")
+        assert api.get_user_id("user_1") == fake_id("user_1")
+        assert server.requests == 2
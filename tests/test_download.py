@@ -0,0 +1,63 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from threadscrape.batch import BatchResult
+from threadscrape.download import MediaDownloader
+from threadscrape.errors import ThreadScrapeError
+
+
+class RenditionHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        # Every rendition of the image shares the path, its content depends on the query
+        body = self.path.encode() * 1000
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RenditionHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:{}".format(httpd.server_address[1])
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_renditions_of_one_image_get_their_own_files(server, tmp_path):
+    urls = ["{}/v/123_n.jpg?stp=dst-jpg_s{}x{}&oh=abc".format(server, size, size) for size in (320, 640, 1080)]
+    downloader = MediaDownloader(str(tmp_path))
+
+    report = downloader.download(urls)
+
+    assert not report.failed
+    assert len({result.path for result in report.files}) == 3
+    for result in report.files:
+        with open(result.path, "rb") as f:
+            assert f.read() == result.url[len(server):].encode() * 1000
+
+    # A later run with refreshed signatures finds the same files
+    again = downloader.download([url.replace("oh=abc", "oh=def") for url in urls])
+    assert [result.status for result in again.files] == ["exists"] * 3
+
+
+class MissingPosts:
+    def get_post_info_many(self, posts, max_workers=8):
+        for post in posts:
+            yield BatchResult(post, None, ThreadScrapeError("Post not found"))
+
+
+def test_a_failed_post_doesnt_abort_the_download(server, tmp_path):
+    post = "https://www.threads.net/@user_1/post/C0000000001"
+    url = "{}/v/456_n.jpg?stp=dst-jpg_s640x640".format(server)
+    downloader = MediaDownloader(str(tmp_path), api=MissingPosts())
+
+    report = downloader.download([post, url])
+
+    assert [result.url for result in report.files] == [url]
+    assert [item.input for item in report.failed] == [post]
+    assert isinstance(report.failed[0].error, ThreadScrapeError)
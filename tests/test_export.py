@@ -0,0 +1,61 @@
+import json
+import pytest
+from threadscrape.export import JSONLWriter, ParquetWriter, USER_FIELDS, export_pages, flatten_user
+from threadscrape.mock_server import fake_connection, fake_user
+from threadscrape.pagination import ConnectionIterator
+
+TOTAL = 45
+PAGE_SIZE = 3
+
+
+def iterate(fail_at=None):
+    def fetch_page(cursor):
+        offset = int(cursor or 0)
+        if fail_at is not None and offset >= fail_at:
+            raise RuntimeError("Crashed at {}".format(offset))
+        nodes = [fake_user(index) for index in range(offset, min(offset + PAGE_SIZE, TOTAL))]
+        return {"data": {"fetch__XDTUserDict": {"followers": fake_connection(nodes, offset, TOTAL)}}}
+
+    return lambda cursor: ConnectionIterator(fetch_page, cursor)
+
+
+def test_parquet_export_reads_back(tmp_path):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "followers")
+
+    state = export_pages(iterate(), ParquetWriter(path, USER_FIELDS), flatten_user, path + ".checkpoint")
+
+    table = pyarrow_parquet.read_table(path)
+    assert state == {"done": True, "rows": TOTAL}
+    assert table.num_rows == TOTAL
+    assert table.schema.field("is_verified").type == "bool"
+    assert sorted(table.column("username").to_pylist()) == sorted("user_{}".format(index) for index in range(TOTAL))
+
+
+def test_resume_before_first_checkpoint_starts_over(tmp_path):
+    path = str(tmp_path / "followers.jsonl")
+
+    # Crashes on the 6th page, before the checkpoint written after the 10th
+    with pytest.raises(RuntimeError):
+        export_pages(iterate(fail_at=15), JSONLWriter(path), flatten_user, path + ".checkpoint")
+
+    state = export_pages(iterate(), JSONLWriter(path), flatten_user, path + ".checkpoint")
+
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert state["rows"] == len(rows) == TOTAL
+    assert len({row["pk"] for row in rows}) == TOTAL
+
+
+def test_resume_after_checkpoint_discards_later_rows(tmp_path):
+    path = str(tmp_path / "followers.jsonl")
+
+    with pytest.raises(RuntimeError):
+        export_pages(iterate(fail_at=36), JSONLWriter(path), flatten_user, path + ".checkpoint", checkpoint_every=5)
+
+    state = export_pages(iterate(), JSONLWriter(path), flatten_user, path + ".checkpoint", checkpoint_every=5)
+
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert state["rows"] == len(rows) == TOTAL
+    assert len({row["pk"] for row in rows}) == TOTAL
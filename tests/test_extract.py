@@ -0,0 +1,54 @@
+import requests
+from threadscrape.extract import PageExtractor, extract_from_response
+from threadscrape.mock_server import MockServer, fake_id
+
+PAGE = b"<html>" + b"x" * 1000 + b'"postID":"3141592653589793238"' + b"y" * 700 + b'"id":"3141592653589793238_271828"' + b"z" * 500
+
+
+def feed(chunks, names=("postID", "id")):
+    extractor = PageExtractor(names)
+    for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    return extractor
+
+
+def test_markers_split_at_every_position():
+    expected = {"postID": "3141592653589793238", "id": "3141592653589793238_271828"}
+    start = PAGE.index(b'"postID"')
+    end = PAGE.index(b'"id"') + len(b'"id":"3141592653589793238_271828"')
+
+    # Every cut through either marker, including one past the overlap from the chunk start
+    for cut in list(range(start, start + 31)) + list(range(end - 34, end + 1)):
+        assert feed([PAGE[:cut], PAGE[cut:]]).found == expected, cut
+
+
+def test_chunks_smaller_than_a_marker():
+    # A marker spans many chunks, the tail keeps growing up to the overlap
+    for size in (1, 3, 17, 255, 256, 257):
+        chunks = [PAGE[start:start + size] for start in range(0, len(PAGE), size)]
+        extractor = feed(chunks)
+        assert extractor.found == {"postID": "3141592653589793238", "id": "3141592653589793238_271828"}, size
+        assert extractor.bytes_read < len(PAGE)
+
+
+def test_the_overlap_bounds_a_split_marker():
+    # The overlap must be longer than any match, a match it can't hold is only found within a chunk
+    extractor = feed([PAGE[:PAGE.index(b'"postID"') + 5], PAGE[PAGE.index(b'"postID"') + 5:]], ["postID"])
+    assert extractor.found == {"postID": "3141592653589793238"}
+
+    short = PageExtractor(["postID"], overlap=4)
+    short.feed(PAGE[:PAGE.index(b'"postID"') + 5])
+    short.feed(PAGE[PAGE.index(b'"postID"') + 5:])
+    assert short.found == {}
+
+
+def test_extract_from_a_streamed_page():
+    with MockServer(page_bytes=50000) as server:
+        response = requests.get("{}/@user_1".format(server.url), stream=True)
+        extractor = PageExtractor(["userID"])
+        found = extract_from_response(response, ["userID"], chunk_size=100, extractor=extractor)
+
+    assert found == {"userID": str(fake_id("user_1"))}
+    # Stopped reading once the marker in the middle of the page was found
+    assert extractor.bytes_read < 50000
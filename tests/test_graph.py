@@ -0,0 +1,127 @@
+import random, time
+import pytest
+from threadscrape.graph import GraphCrawler
+from threadscrape.mock_server import fake_connection
+from threadscrape.pagination import ConnectionIterator
+from threadscrape.refs import UserRef
+
+USERS = 2000
+
+
+class FakeApi:
+    def __init__(self):
+        rng = random.Random(1)
+        self.followers = {user: set() for user in range(1, USERS + 1)}
+        for user in range(1, USERS + 1):
+            for followed in rng.sample(range(1, USERS + 1), 5):
+                self.followers[followed].add(user)
+
+    def _user_ref(self, username):
+        return UserRef(int(username.split("_")[1]), username)
+
+    def iter_followers(self, user, page_size, after=None):
+        nodes = [{"pk": str(follower), "username": "user_{}".format(follower)} for follower in sorted(self.followers[user.user_id])]
+
+        def fetch_page(cursor):
+            offset = int(cursor or 0)
+            return fake_connection(nodes[offset:offset + page_size], offset, len(nodes))
+
+        return ConnectionIterator(fetch_page, after)
+
+
+class Crash(BaseException):
+    pass
+
+
+def crawl(directory, crash_after=None):
+    crawler = GraphCrawler(
+        FakeApi(), str(directory), max_depth=6, page_size=2, checkpoint_every=10, bloom_capacity=100000, max_workers=2,
+    )
+    if crash_after is not None:
+        discover, calls = crawler._discover, []
+
+        def crashing(*args):
+            calls.append(args)
+            if len(calls) > crash_after:
+                raise Crash()
+            return discover(*args)
+
+        crawler._discover = crashing
+    return crawler
+
+
+def test_resume_matches_an_uninterrupted_crawl(tmp_path):
+    with crawl(tmp_path / "full") as crawler:
+        expected = crawler.crawl(["user_1"])
+        expected_edges = set(zip(*[iter(crawler.edges.load())] * 2))
+        expected_nodes = set(crawler.iter_nodes())
+
+    crawler = crawl(tmp_path / "resumed", crash_after=300)
+    with pytest.raises(Crash):
+        crawler.crawl(["user_1"])
+    # Simulate the process dying, buffered writes are lost
+    crawler.frontier.close()
+    crawler.edges._file.close()
+    crawler._nodes.close()
+
+    # Resume, then close without writing anything new, and resume again
+    crawl(tmp_path / "resumed").close()
+    with crawl(tmp_path / "resumed") as crawler:
+        assert crawler.crawl(["user_1"]) == expected
+        assert set(zip(*[iter(crawler.edges.load())] * 2)) == expected_edges
+        assert set(crawler.iter_nodes()) == expected_nodes
+
+
+class HugeAccountApi:
+    """
+    One seed followed by a million users, served a page at a time.
+    """
+
+    followers = 1000000
+
+    def __init__(self):
+        self.pages = 0
+
+    def _user_ref(self, username):
+        return UserRef(1, username)
+
+    def iter_followers(self, user, page_size, after=None):
+        def fetch_page(cursor):
+            self.pages += 1
+            offset = int(cursor or 0)
+            count = min(page_size, self.followers - offset) if user.user_id == 1 else 0
+            nodes = [{"pk": str(10 + offset + index), "username": None} for index in range(count)]
+            return fake_connection(nodes, offset, self.followers if user.user_id == 1 else 0)
+
+        return ConnectionIterator(fetch_page, after)
+
+
+def test_deadline_cuts_a_large_expansion_and_resumes_it(tmp_path):
+    api = HugeAccountApi()
+    crawler = GraphCrawler(api, str(tmp_path), max_depth=1, max_edges_per_node=None, page_size=100, max_workers=2)
+
+    started = time.monotonic()
+    stats = crawler.crawl(["user_1"], max_seconds=0.2)
+    crawler.close()
+
+    assert time.monotonic() - started < 2
+    assert 0 < stats["edges"] < HugeAccountApi.followers
+    assert stats["expanded"] == 0
+
+    with GraphCrawler(api, str(tmp_path), max_depth=1, max_edges_per_node=None, page_size=100) as crawler:
+        resumed = crawler.crawl(max_seconds=0.2)
+        followers = crawler.edges.load()[::2]
+
+    # Resumed from the saved cursor, so no follower is recorded twice
+    assert resumed["edges"] > stats["edges"]
+    assert len(followers) == len(set(followers)) == resumed["edges"]
+
+
+def test_max_edges_per_node_bounds_the_pages_fetched(tmp_path):
+    api = HugeAccountApi()
+
+    with GraphCrawler(api, str(tmp_path), max_depth=1, page_size=100, max_edges_per_node=250) as crawler:
+        stats = crawler.crawl(["user_1"])
+
+    assert stats == {"nodes": 251, "edges": 250, "expanded": 1, "failed": 0}
+    assert api.pages == 3
@@ -0,0 +1,155 @@
+import re
+from threadscrape import ThreadScrape
+from threadscrape import hooks as hooks_module
+from threadscrape.hooks import Hooks, OpenTelemetryHooks
+from threadscrape.mock_server import CREDENTIALS, MockServer
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\[\\"n])*)"(?:,|$)')
+
+
+def parse_labels(text):
+    labels, position = {}, 0
+    while position < len(text):
+        match = LABEL.match(text, position)
+        assert match, "bad labels: {}".format(text)
+        value = re.sub(r'\\(.)', lambda escape: "\n" if escape.group(1) == "n" else escape.group(1), match.group(2))
+        labels[match.group(1)] = value
+        position = match.end()
+    return labels
+
+
+def parse_exposition(text):
+    """
+    Parse the Prometheus text format, checking each family is declared once and its samples are contiguous.
+    """
+    assert text.endswith("\n")
+    families, family = {}, None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name not in families, "{} declared twice".format(name)
+            assert kind in ("counter", "gauge", "histogram")
+            family = families[name] = {"type": kind, "samples": []}
+            continue
+
+        match = SAMPLE.match(line)
+        assert match, "bad sample: {!r}".format(line)
+        name, labels, value = match.group(1), parse_labels(match.group(2) or ""), float(match.group(3))
+        suffixes = ("_bucket", "_sum", "_count") if family["type"] == "histogram" else ("",)
+        current = list(families)[-1]
+        assert name in [current + suffix for suffix in suffixes], "{} outside its family".format(name)
+        family["samples"].append((name, labels, value))
+    return families
+
+
+def check_families(families):
+    for name, family in families.items():
+        if family["type"] == "counter":
+            assert name.endswith("_total"), name
+            assert all(value >= 0 for _, _, value in family["samples"])
+        if family["type"] == "histogram":
+            series = {}
+            for sample, labels, value in family["samples"]:
+                key = tuple(sorted((label, text) for label, text in labels.items() if label != "le"))
+                series.setdefault(key, {"buckets": []})
+                if sample.endswith("_bucket"):
+                    series[key]["buckets"].append((labels["le"], value))
+                else:
+                    series[key][sample[len(name):]] = value
+            for values in series.values():
+                counts = [count for _, count in values["buckets"]]
+                assert counts == sorted(counts)
+                assert values["buckets"][-1] == ("+Inf", values["_count"])
+
+
+def test_prometheus_exposition_parses():
+    with MockServer() as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        metrics = api.enable_metrics()
+        api.get_user_id("user_1")
+        api.get_user_id("user_1")
+        api.get_profile_info("user_1")
+
+    # Label values are escaped
+    metrics.on_error('odd "key"\\\n', ValueError())
+
+    families = parse_exposition(metrics.prometheus())
+    check_families(families)
+
+    assert families["threadscrape_phase_seconds"]["type"] == "histogram"
+    assert families["threadscrape_cache_size"]["type"] == "gauge"
+    events = {
+        (labels["cache"], labels["event"]): value
+        for _, labels, value in families["threadscrape_cache_events_total"]["samples"]
+    }
+    assert events[("user_id", "hits")] == 1
+    assert events[("user_id", "misses")] == 1
+    assert ("user_id", "size") not in events
+
+    errors = [labels for _, labels, _ in families["threadscrape_errors_total"]["samples"]]
+    assert {"operation": 'odd "key"\\\n', "error": "ValueError"} in errors
+
+
+class FakeSpan:
+    def __init__(self, name, start_time=None, attributes=None):
+        self.name = name
+        self.start_time = start_time
+        self.end_time = None
+        self.attributes = dict(attributes or {})
+        self.exceptions = []
+        self.status = None
+
+    def record_exception(self, error):
+        self.exceptions.append(error)
+
+    def set_status(self, status):
+        self.status = status
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time=None, attributes=None):
+        span = FakeSpan(name, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+def test_opentelemetry_spans(monkeypatch):
+    if hooks_module.trace is None:
+        # opentelemetry isn't installed, the fake tracer stands in for it
+        monkeypatch.setattr(hooks_module, "trace", object())
+        monkeypatch.setattr(hooks_module, "StatusCode", type("StatusCode", (), {"ERROR": "error"}), raising=False)
+        monkeypatch.setattr(hooks_module, "Status", lambda code, description: (code, description), raising=False)
+
+    tracer = FakeTracer()
+    hooks = Hooks()
+    OpenTelemetryHooks(tracer).attach(hooks)
+
+    with MockServer() as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url, hooks=hooks)
+        api.get_profile_info("user_1")
+
+    names = [span.name for span in tracer.spans]
+    assert "BarcelonaUsernameHoverCardImplQuery request" in names
+    assert "BarcelonaUsernameHoverCardImplQuery decode" in names
+    for span in tracer.spans:
+        assert span.start_time <= span.end_time
+    request = tracer.spans[names.index("BarcelonaUsernameHoverCardImplQuery request")]
+    assert request.attributes["http.status_code"] == 200
+    assert request.attributes["threadscrape.operation"] == "BarcelonaUsernameHoverCardImplQuery"
+
+    error = RuntimeError("down")
+    hooks.emit("on_error", key="page", error=error, attempt=2)
+    span = tracer.spans[-1]
+    assert span.name == "page error"
+    assert span.exceptions == [error]
+    assert span.attributes["threadscrape.attempt"] == 2
+    assert span.status is not None
@@ -0,0 +1,19 @@
+from threadscrape.mock_server import fake_post
+from threadscrape.utils import arrange_media_data
+
+
+def post_info():
+    edges = [{"node": {"thread_items": [{"post": fake_post(1, carousel=3)}]}}] + [
+        {"node": {"thread_items": [{"post": fake_post(1 + reply)}]}} for reply in range(1, 4)
+    ]
+    return {"data": {"data": {"edges": edges}}}
+
+
+def test_replies_are_opt_in():
+    assert [image["index"] for image in arrange_media_data(post_info())["images"]] == [1, 2, 3]
+    assert len(arrange_media_data(post_info(), include_replies=True)["images"]) == 6
+
+
+def test_image_size_picks_the_largest_fitting_rendition():
+    images = arrange_media_data(post_info(), image_size=640)["images"]
+    assert {(image["width"], image["height"]) for image in images} == {(640, 640)}
@@ -0,0 +1,43 @@
+import json
+import pytest
+from threadscrape import ThreadScrape
+from threadscrape.mock_server import CREDENTIALS, MockServer, fake_id, fake_user
+from threadscrape.operations import BY_FRIENDLY_NAME, LOGGED_IN, OPERATIONS
+
+
+def test_variables_are_validated_and_converted():
+    operation = OPERATIONS["get_followers"]
+
+    assert operation.variables(userID=314, first="10") == {"userID": "314", LOGGED_IN: True, "first": 10}
+    # Optional variables left as None are omitted
+    assert operation.variables(userID=314, after=None) == {"userID": "314", LOGGED_IN: True}
+
+    with pytest.raises(ValueError, match="Missing variable for BarcelonaFriendshipsFollowersTabQuery: userID"):
+        operation.variables(first=10)
+    with pytest.raises(ValueError, match="Missing variable"):
+        operation.variables(userID=None)
+    with pytest.raises(ValueError, match="Unknown variables for BarcelonaFriendshipsFollowersTabQuery: user_id"):
+        operation.variables(user_id=314)
+
+
+def test_build_serializes_quotes_and_backslashes():
+    query = 'say "hi" \\ {"first": 1}\n'
+    data = OPERATIONS["search"].build("dtsg", query=query, first=5)
+
+    assert data["fb_dtsg"] == "dtsg"
+    assert data["doc_id"] == OPERATIONS["search"].doc_id
+    assert data["fb_api_req_friendly_name"] == "useBarcelonaAccountSearchGraphQLDataSourceQuery"
+    assert json.loads(data["variables"]) == {"query": query, "first": 5, LOGGED_IN: True}
+
+
+def test_friendly_names_are_unique():
+    assert len(BY_FRIENDLY_NAME) == len(OPERATIONS)
+
+
+def test_the_server_reads_the_variables_as_sent():
+    username = 'odd"name\\'
+    with MockServer() as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        user = api.get_profile_info(username)["data"]["user"]
+
+    assert user == fake_user(fake_id(username) % 100000)
@@ -0,0 +1,58 @@
+import json
+import pytest
+import requests
+from threadscrape import ThreadScrape, SessionPool, UserRef, ThreadScrapeError, RateLimitError
+from threadscrape.mock_server import CREDENTIALS, MockServer
+from threadscrape.ratelimit import RequestDispatcher
+
+
+def pooled_client(status, body, accounts=2):
+    pool = SessionPool([dict(CREDENTIALS, sessionid=str(index)) for index in range(accounts)], quarantine_after=2)
+    api = ThreadScrape(pool, dispatcher=RequestDispatcher(retry_on=()))
+
+    def request(method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode()
+        return response
+
+    for pooled in pool.sessions:
+        pooled.session.request = request
+    return api
+
+
+def test_graphql_errors_count_against_the_account():
+    # The fake transport answers every request with a GraphQL error payload
+    api = pooled_client(200, {"errors": [{"message": "Please wait a few minutes"}]})
+
+    for _ in range(4):
+        with pytest.raises(ThreadScrapeError):
+            api.get_followers(UserRef(1, "user_1"))
+
+    stats = api.session_stats()
+    assert [account["errors"] for account in stats] == [2, 2]
+    assert [account["in_flight"] for account in stats] == [0, 0]
+    assert all(account["quarantined"] for account in stats)
+
+
+def test_rate_limited_requests_count_against_the_account():
+    api = pooled_client(429, {}, accounts=1)
+
+    with pytest.raises(RateLimitError):
+        api.get_followers(UserRef(1, "user_1"))
+
+    assert api.session_stats()[0]["errors"] == 1
+
+
+def test_successful_requests_are_released():
+    with MockServer() as server:
+        pool = SessionPool([dict(CREDENTIALS, sessionid=str(index)) for index in range(2)])
+        api = ThreadScrape(pool, base_url=server.url)
+
+        for _ in range(4):
+            api.get_followers(UserRef(1, "user_1"))
+
+        stats = api.session_stats()
+        assert [account["requests"] for account in stats] == [2, 2]
+        assert [account["in_flight"] for account in stats] == [0, 0]
+        assert [account["errors"] for account in stats] == [0, 0]
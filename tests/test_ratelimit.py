@@ -0,0 +1,42 @@
+import pytest
+from threadscrape.errors import ServerError, CircuitOpenError, RateLimitError
+from threadscrape.ratelimit import Backoff, CircuitBreaker, RequestDispatcher
+
+
+def failing(error):
+    def send():
+        raise error
+    return send
+
+
+def test_server_errors_open_the_breaker():
+    dispatcher = RequestDispatcher(breaker=CircuitBreaker(failure_threshold=5))
+
+    for _ in range(5):
+        with pytest.raises(ServerError):
+            dispatcher.call("get_followers", failing(ServerError("Error", 500)))
+
+    assert dispatcher.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        dispatcher.call("get_followers", lambda: "sent")
+
+
+def test_server_errors_are_retried_when_asked():
+    dispatcher = RequestDispatcher(
+        backoff=Backoff(base=0, max_retries=2), retry_on=(RateLimitError, ServerError),
+    )
+
+    with pytest.raises(ServerError):
+        dispatcher.call("get_followers", failing(ServerError("Error", 503)))
+
+    assert dispatcher.retries == 2
+    assert dispatcher.breaker.failures == 3
+
+
+def test_other_errors_dont_count():
+    dispatcher = RequestDispatcher()
+
+    with pytest.raises(ValueError):
+        dispatcher.call("get_followers", failing(ValueError("Bad input")))
+
+    assert dispatcher.breaker.failures == 0
@@ -0,0 +1,95 @@
+import threading, time
+from threadscrape import ThreadScrape, PostRef
+from threadscrape.mock_server import CREDENTIALS, MockServer
+from threadscrape.operations import OPERATIONS
+from threadscrape import response_cache as response_cache_module
+from threadscrape.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def post_info(post_id="1"):
+    return OPERATIONS['get_post_info'].build("dtsg", postID=post_id)
+
+
+class Sender:
+    def __init__(self):
+        self.calls = 0
+        self.during = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.during is not None:
+            self.during()
+        return {"calls": self.calls}
+
+
+def test_fresh_stale_and_expired_responses(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache_module, "time", clock)
+    cache = ResponseCache(ttls={"get_post_info": 120}, stale_ttl=60)
+    send = Sender()
+
+    assert cache.fetch(post_info(), send) == {"calls": 1}
+    clock.now += 119
+    assert cache.fetch(post_info(), send) == {"calls": 1}
+
+    # Stale: served as is while a background request refreshes it
+    clock.now += 2
+    refreshed = threading.Event()
+    send.during = refreshed.set
+    assert cache.fetch(post_info(), send) == {"calls": 1}
+    assert refreshed.wait(5)
+    while cache._refreshing:
+        time.sleep(0.01)
+    send.during = None
+    assert cache.fetch(post_info(), send) == {"calls": 2}
+
+    # Past the stale window it's sent again in the foreground
+    clock.now += 181
+    assert cache.fetch(post_info(), send) == {"calls": 3}
+    assert cache.stats() == {"hits": 2, "stale_hits": 1, "misses": 2, "refreshes": 1}
+
+
+def test_invalidating_a_tag_drops_its_responses():
+    cache = ResponseCache()
+    send = Sender()
+
+    cache.fetch(post_info("1"), send, ["post:1"])
+    cache.fetch(post_info("2"), send, ["post:2"])
+    cache.invalidate(["post:1"])
+
+    assert cache.fetch(post_info("1"), send, ["post:1"]) == {"calls": 3}
+    assert cache.fetch(post_info("2"), send, ["post:2"]) == {"calls": 2}
+
+
+def test_invalidation_during_send_isnt_lost():
+    cache = ResponseCache()
+    send = Sender()
+    send.during = lambda: cache.invalidate(["post:1"])
+
+    cache.fetch(post_info("1"), send, ["post:1"])
+    send.during = None
+
+    # The response was read before the invalidation, it mustn't be served
+    assert cache.fetch(post_info("1"), send, ["post:1"]) == {"calls": 2}
+
+
+def test_like_invalidates_the_authors_profile_threads():
+    with MockServer() as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url, response_cache=ResponseCache())
+        author = api.get_user_id("user_1")
+
+        api.get_user_profile_threads("user_1")
+        api.get_user_profile_threads("user_1")
+        assert api.response_cache.stats()["hits"] == 1
+
+        api.like_post(PostRef("42", user_id=author))
+        api.get_user_profile_threads("user_1")
+        assert api.response_cache.stats()["misses"] == 2
@@ -0,0 +1,84 @@
+import threading, time
+from threadscrape.ratelimit import TokenBucket
+from threadscrape.scheduler import PollScheduler, ScheduledTarget
+
+
+def test_interval_follows_the_rate_of_change():
+    scheduler = PollScheduler(lambda target: 0, min_interval=10, max_interval=1000, initial_interval=100, smoothing=0.5)
+    entry = ScheduledTarget("user_1", 100, 0)
+
+    # The first poll has nothing to measure a rate against
+    assert scheduler._next_interval(entry, 3, 0) == 100
+    entry.polled_at = 0
+
+    # 2 changes in 100 seconds, one expected per poll
+    assert scheduler._next_interval(entry, 2, 100) == 50
+    entry.polled_at = 100
+
+    # No change in 50 seconds halves the rate average, doubling the interval
+    assert scheduler._next_interval(entry, 0, 150) == 100
+    entry.polled_at = 150
+
+    # Clamped to min_interval and max_interval
+    assert scheduler._next_interval(entry, 1000, 160) == 10
+    entry.rate = 0
+    entry.interval = 800
+    assert scheduler._next_interval(entry, 0, 1000) == 1000
+
+
+def test_failed_polls_back_off():
+    def poll(target):
+        raise RuntimeError("down")
+
+    scheduler = PollScheduler(poll, budget=1000, min_interval=0.01, max_interval=0.08, initial_interval=0.01)
+    scheduler.add("user_1")
+    scheduler.run(duration=0.5)
+
+    entry = scheduler.targets["user_1"]
+    assert scheduler.stats()["failures"] == entry.failures == entry.polls
+    assert isinstance(entry.last_error, RuntimeError)
+    # 0.01, 0.02, 0.04 then 0.08 between polls, rather than 50 polls at min_interval
+    assert 4 <= entry.polls <= 10
+
+
+def test_budget_caps_the_polls():
+    scheduler = PollScheduler(
+        lambda target: 1, budget=TokenBucket(20, capacity=1), min_interval=0.001, initial_interval=0.001,
+    )
+    for index in range(10):
+        scheduler.add("user_{}".format(index))
+
+    started = time.monotonic()
+    scheduler.run(duration=0.5)
+
+    assert scheduler.stats()["polls"] <= 20 * (time.monotonic() - started) + 2
+
+
+def test_stop_before_run_isnt_lost():
+    scheduler = PollScheduler(lambda target: 0, min_interval=0.01, initial_interval=0.01)
+    scheduler.add("user_1")
+    scheduler.stop()
+
+    started = time.monotonic()
+    scheduler.run(duration=5)
+
+    assert time.monotonic() - started < 1
+    assert scheduler.stats()["polls"] == 0
+
+
+def test_stop_from_another_thread():
+    polled = threading.Event()
+
+    def poll(target):
+        polled.set()
+        return 0
+
+    scheduler = PollScheduler(poll, budget=1000, min_interval=0.01, initial_interval=0.01)
+    scheduler.add("user_1")
+    runner = threading.Thread(target=scheduler.run)
+    runner.start()
+
+    assert polled.wait(5)
+    scheduler.stop()
+    runner.join(5)
+    assert not runner.is_alive()
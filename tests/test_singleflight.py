@@ -0,0 +1,99 @@
+import asyncio, threading, time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threadscrape import ThreadScrape
+from threadscrape.mock_server import CREDENTIALS, MockServer
+from threadscrape.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def func():
+        runs.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, "key", func) for _ in range(8)]
+        wait_for(lambda: flight.stats()["shared"] == 7)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 1, "shared": 7}
+
+    # Once done, the next call runs again
+    assert flight.do("key", lambda: "again") == "again"
+    assert flight.stats()["calls"] == 2
+
+
+def test_errors_are_shared_and_not_kept():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def func():
+        release.wait(5)
+        raise RuntimeError("down")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "key", func) for _ in range(4)]
+        wait_for(lambda: flight.stats()["shared"] == 3)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="down"):
+                future.result()
+
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_async_calls_share_one_run_and_survive_a_cancelled_waiter():
+    async def main():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        runs = []
+
+        async def func():
+            runs.append(1)
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(flight.do("key", func))
+        others = [asyncio.ensure_future(flight.do("key", func)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        # Cancelling the caller that started the call leaves it running for the others
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*others) == ["value"] * 3
+        assert first.cancelled()
+        assert len(runs) == 1
+        assert flight.stats() == {"calls": 1, "shared": 3}
+
+        assert await flight.do("key", func) == "value"
+        assert len(runs) == 2
+
+    asyncio.run(main())
+
+
+def test_concurrent_requests_for_one_profile_are_sent_once():
+    with MockServer(latency=0.3) as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda _: api.get_profile_info("user_1"), range(6)))
+
+        assert server.requests == 1
+        assert all(result == results[0] for result in results)
+        assert api.inflight.stats() == {"calls": 1, "shared": 5}
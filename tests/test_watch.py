@@ -0,0 +1,103 @@
+from threadscrape import ThreadScrape
+from threadscrape.mock_server import CREDENTIALS, MockServer, fake_connection, fake_post
+from threadscrape.operations import OPERATIONS
+from threadscrape.watch import ThreadWatcher, WatchState
+
+
+class ProfileServer(MockServer):
+    """
+    Serves the profile threads of one account newest first, posts being added by raising posted.
+    """
+
+    def __init__(self, posted, **kwargs):
+        super().__init__(**kwargs)
+        self.posted = posted
+        self.pages = 0
+
+    def graphql(self, friendly_name, variables):
+        if friendly_name != OPERATIONS["get_user_profile_threads"].friendly_name:
+            return super().graphql(friendly_name, variables)
+
+        self.pages += 1
+        first, offset = int(variables.get("first") or 10), int(variables.get("after") or 0)
+        indexes = range(self.posted - 1 - offset, max(-1, self.posted - 1 - offset - first), -1)
+        threads = [{"id": str(index), "thread_items": [{"post": fake_post(index)}]} for index in indexes]
+        return 200, {"data": {"mediaData": fake_connection(threads, offset, self.posted)}}
+
+
+def thread_ids(threads):
+    return [int(thread.id) for thread in threads]
+
+
+def test_polls_emit_only_new_threads(tmp_path):
+    with ProfileServer(posted=20) as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        state = WatchState(str(tmp_path / "watch.db"))
+        watcher = ThreadWatcher(api, state, page_size=5)
+
+        # The first poll emits the first page
+        assert thread_ids(watcher.poll("user_1")) == [19, 18, 17, 16, 15]
+        assert state.get(api.get_user_id("user_1")) == (1700000000 + 19, 3 * 10 ** 18 + 19)
+
+        # Nothing new costs one page
+        server.pages = 0
+        assert watcher.poll("user_1") == []
+        assert server.pages == 1
+
+        # Pages are read until one reaches the mark
+        server.posted = 27
+        server.pages = 0
+        assert thread_ids(watcher.poll("user_1")) == [26, 25, 24, 23, 22, 21, 20]
+        assert server.pages == 2
+
+
+def test_a_new_watcher_resumes_from_the_stored_marks(tmp_path):
+    path = str(tmp_path / "watch.db")
+    with ProfileServer(posted=10) as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        ThreadWatcher(api, WatchState(path), first_poll_pages=0).poll("user_1")
+
+        server.posted = 12
+        state = WatchState(path)
+        assert len(state) == 1
+        assert thread_ids(ThreadWatcher(api, state).poll("user_1")) == [11, 10]
+
+
+def test_first_poll_pages_zero_only_records_the_mark(tmp_path):
+    with ProfileServer(posted=10) as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        watcher = ThreadWatcher(api, WatchState(str(tmp_path / "watch.db")), first_poll_pages=0)
+
+        assert watcher.poll("user_1") == []
+        server.posted = 11
+        assert thread_ids(watcher.poll("user_1")) == [10]
+
+
+def test_stream_advances_the_mark_once_threads_are_consumed(tmp_path):
+    with ProfileServer(posted=10) as server:
+        api = ThreadScrape(CREDENTIALS, base_url=server.url)
+        watcher = ThreadWatcher(api, WatchState(str(tmp_path / "watch.db")), first_poll_pages=0)
+        watcher.poll("user_1")
+        server.posted = 13
+
+        # Stopping midway, such as a crash, leaves the mark where it was
+        stream = watcher.stream(["user_1"])
+        first = next(stream)
+        stream.close()
+        assert (first.username, int(first.thread.id)) == ("user_1", 12)
+
+        assert [int(item.thread.id) for item in watcher.stream(["user_1"])] == [12, 11, 10]
+        assert list(watcher.stream(["user_1"])) == []
+
+
+def test_marks_never_move_back(tmp_path):
+    state = WatchState(str(tmp_path / "watch.db"))
+    state.set(1, (100, 5), "user_1")
+    state.set(1, (100, 4))
+    state.set(1, (99, 9))
+    assert state.get(1) == (100, 5)
+
+    state.set(1, (101, 1))
+    assert state.get(1) == (101, 1)
+    state.forget(1)
+    assert state.get(1) is None
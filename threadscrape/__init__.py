@@ -1 +1,20 @@
-from .api import ThreadScrape
\ No newline at end of file
+from .api import ThreadScrape
+from .cache import LRUCache, SQLiteCache
+from .refs import UserRef, PostRef
+from .transport import create_session
+from .async_api import AsyncThreadScrape
+from .batch import BatchResult
+from .errors import ThreadScrapeError, RateLimitError, ServerError, CircuitOpenError
+from .ratelimit import RequestDispatcher, RateLimiter, Backoff, CircuitBreaker
+from .pool import SessionPool
+from .models import User, Post, MediaItem, Thread, Page
+from .decoding import JSONDecoder
+from .media import iter_post_media, RenditionIndex, Rendition
+from .download import MediaDownloader, DownloadReport
+from .response_cache import ResponseCache
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .bulk import BulkExecutor, BulkReport
+from .hooks import Hooks, Metrics, OpenTelemetryHooks
+from .watch import ThreadWatcher, WatchState
+from .scheduler import PollScheduler
+from .graph import GraphCrawler, BloomFilter, EdgeStore
@@ -1,753 +1,1088 @@
-import requests, re, json
-from .errors import ThreadScrapeError
-from .utils import get_json_response, arrange_media_data
-
-
-class ThreadScrape:
-    """
-    A class for scraping data from the Threads.net WEB-API.
-    """
-
-    def __init__(self, data):
-        """
-        Initializes a ThreadScrape instance with user data.
-
-        Args:
-            data (dict): A dictionary containing user session data with keys 'sessionid', 'fb_dtsg', and 'x-csrftoken'.
-                These are required for making authenticated requests.
-        """
-        self.session = requests.Session()
-        self.BASE_URL = "https://www.threads.net"
-        self.GRAPHQL_URL = "https://www.threads.net/api/graphql"
-        self.lsd_token = "AVqw_XEyRAI"
-        self.common_headers = self.get_common_headers()
-        self.setup_credentials(data)
-        self.setup_headers()
-
-    def get_common_headers(self):
-        """
-        Get common HTTP headers used in requests.
-
-        Returns:
-            dict: A dictionary containing common HTTP headers.
-        """
-        return {
-            "authority": self.BASE_URL,
-            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            "accept-language": "en,en-US;q=0.9,en-IN;q=0.8",
-            "cache-control": "max-age=0",
-            "dpr": "1.5",
-            "sec-ch-prefers-color-scheme": "dark",
-            "sec-ch-ua": '"Chromium";v="116", "Not)A;Brand";v="24", "Google Chrome";v="116"',
-            "sec-ch-ua-full-version-list": '"Chromium";v="116.0.5845.180", "Not)A;Brand";v="24.0.0.0", "Google Chrome";v="116.0.5845.180"',
-            "sec-fetch-dest": "document",
-            "sec-fetch-mode": "navigate",
-            "sec-fetch-site": "none",
-            "sec-fetch-user": "?1",
-            "upgrade-insecure-requests": "1",
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36",
-            "viewport-width": "1280",
-        }
-
-
-    def setup_credentials(self, data):
-        """
-        Set up user credentials for the session.
-
-        Args:
-            data (dict): A dictionary containing user session data.
-
-        Raises:
-            ValueError: If required keys are missing or data format is invalid.
-        """
-        # Check if all required keys are present
-        required_keys = ["sessionid", "fb_dtsg", "x-csrftoken"]
-        missing_keys = [key for key in required_keys if key not in data]
-
-        if missing_keys:
-            raise ValueError(f"Missing keys: {', '.join(missing_keys)}")
-
-        # Check if values are in the expected format
-        if not isinstance(data["sessionid"], str) or not isinstance(data["fb_dtsg"], str) or not isinstance(data["x-csrftoken"], str):
-            raise ValueError("Invalid data format")
-
-        self.sessionid = data["sessionid"]
-        self.fb_dtsg = data["fb_dtsg"]
-        self.x_csrftoken = data["x-csrftoken"]
-
-    def setup_headers(self):
-        """
-        Set up HTTP headers for the session.
-        """
-        self.session.cookies.update({"sessionid": self.sessionid})
-        self.session.headers.update(
-            {
-                "authority": "www.threads.net",
-                "accept": "*/*",
-                "accept-language": "en,en-US;q=0.9,en-IN;q=0.8",
-                "content-type": "application/x-www-form-urlencoded",
-                "dpr": "1.5",
-                "origin": "https://www.threads.net",
-                "sec-ch-prefers-color-scheme": "dark",
-                "sec-ch-ua": '"Chromium";v="116", "Not)A;Brand";v="24", "Google Chrome";v="116"',
-                "sec-ch-ua-full-version-list": '"Chromium";v="116.0.5845.180", "Not)A;Brand";v="24.0.0.0", "Google Chrome";v="116.0.5845.180"',
-                "sec-ch-ua-mobile": "?0",
-                "sec-ch-ua-model": '""',
-                "sec-ch-ua-platform": '"Windows"',
-                "sec-ch-ua-platform-version": '"15.0.0"',
-                "sec-fetch-dest": "empty",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-site": "same-origin",
-                "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36",
-                "x-asbd-id": "129477",
-                "x-fb-lsd": self.lsd_token,
-                "x-ig-app-id": "238260118697367",
-            }
-        )
-
-    def get_user_id(self, url):
-        """
-        Get the user ID from a Threads.net profile URL or username.
-
-        Args:
-            url (str): The profile URL or username.
-
-        Returns:
-            int: The user ID.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving the user ID.
-        """
-        if "https" in url:
-          pattern = r'https://www\.threads\.net/@([^/]+)'
-          username = re.search(pattern, url).group(1)
-        else:
-          username = url
-
-        headers = self.get_common_headers()
-
-        response = requests.get(
-            "{}/@{}".format(self.BASE_URL, username), headers=headers
-        ).text
-
-        pattern = r'"userID":"(\d+)"'
-        match = re.search(pattern, response)
-
-        if match:
-            user_id = match.group(1)
-        else:
-            raise ThreadScrapeError("Error Retriving userID")
-
-        return int(user_id)
-
-    def get_post_id(self, url):
-        """
-        Get the post ID from a Threads.net post URL.
-
-        Args:
-            url (str): The post URL.
-
-        Returns:
-            str: The post ID.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving the post ID.
-        """
-        headers = self.get_common_headers()
-
-        response = self.session.get(url, headers=headers).text
-
-
-        pattern = r'"postID":"(\d+)"'
-        match = re.search(pattern, response)
-
-        if match:
-            post_id = match.group(1)
-        else:
-            raise ThreadScrapeError("Error Retriving postID")
-
-        return post_id
-
-    def get_id(self, url):
-        """
-        Get the ID from a Threads.net URL.
-
-        Args:
-            url (str): The URL.
-
-        Returns:
-            str: The ID.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving the ID.
-        """
-        headers = self.get_common_headers()
-
-
-        response = self.session.get(url, headers=headers).text
-
-
-        pattern = r'"id":"(\d+_\d+)"'
-        match = re.search(pattern, response)
-
-        if match:
-            id = match.group(1)
-        else:
-            raise ThreadScrapeError("Error Retriving ID")
-
-        return id
-
-
-    def get_followers(self, username):
-        """
-        Get the Followers from a Threads.net profile URL or username.
-
-        Args:
-            username (str): The profile URL or username.
-
-        Returns:
-            dict: Get the Followers from a Threads.net profile URL or username.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving the user ID.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'BarcelonaFriendshipsFollowersTabQuery'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'lsd': 'nucUUd7UtYh-1Efz-5wTiC',
-            'fb_api_req_friendly_name': 'BarcelonaFriendshipsFollowersTabQuery',
-            'variables': '{{"userID":"{}","__relay_internal__pv__BarcelonaIsLoggedInrelayprovider":true}}'.format(userID),
-            'server_timestamps': 'true',
-            'doc_id': "6173206472779164",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error retrieving Followers for {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def get_following(self, username):
-        """
-        Get the user's following data
-
-        Args:
-            username (str): The username or profile URL of the user.
-
-        Returns:
-            dict: A JSON response containing following data.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving following data.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'BarcelonaFriendshipsFollowingTabQuery'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'lsd': 'nucUUd7UtYh-1Efz-5wTiC',
-            'fb_api_req_friendly_name': 'BarcelonaFriendshipsFollowingTabQuery',
-            'variables': '{{"userID":"{}","__relay_internal__pv__BarcelonaIsLoggedInrelayprovider":true}}'.format(userID),
-            'server_timestamps': 'true',
-            'doc_id': "6566004623483043",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error retrieving Followers for username {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def follow_user(self, username):
-        """
-        Follow a Threads.net user.
-
-        Args:
-            username (str): The username or profile URL of the user to follow.
-
-        Returns:
-            dict: A JSON response confirming the follow action.
-
-        Raises:
-            ThreadScrapeError: If there's an error while attempting to follow the user.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaFollowMutationFollowMutation'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'lsd': 'BSWpx6WGeZ94S2rNbmkxn4',
-            'fb_api_req_friendly_name': 'useBarcelonaFollowMutationFollowMutation',
-            'variables': '{{"target_user_id":"{}"}}'.format(userID),
-            'server_timestamps': 'true',
-            'doc_id': "6240353742756860",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Following User {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def unfollow_user(self, username):
-        """
-        Unfollow a Threads.net user.
-
-        Args:
-            username (str): The username or profile URL of the user to unfollow.
-
-        Returns:
-            dict: A JSON response confirming the unfollow action.
-
-        Raises:
-            ThreadScrapeError: If there's an error while attempting to unfollow the user.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaFollowMutationUnfollowMutation'})
-
-        data = {
-          'fb_dtsg': self.fb_dtsg,
-          'lsd': 'BSWpx6WGeZ94S2rNbmkxn4',
-          'fb_api_req_friendly_name': 'useBarcelonaFollowMutationUnfollowMutation',
-          'variables': '{{"target_user_id":"{}"}}'.format(userID),
-          'server_timestamps': 'true',
-          'doc_id': "6419596478124270",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error UnFollowing User {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def like_post(self, postURL):
-        """
-        Like a Threads.net post.
-
-        Args:
-            postURL (str): The URL of the post to like.
-
-        Returns:
-            dict: A JSON response confirming the like action.
-
-        Raises:
-            ThreadScrapeError: If there's an error while attempting to like the post.
-        """
-        postID = self.get_post_id(postURL)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaLikeMutationLikeMutation'})
-
-        data = {
-
-            'fb_dtsg': self.fb_dtsg,
-            'lsd': 'OacJH75YYKAh8Xtd4UtEJT',
-            'fb_api_req_friendly_name': 'useBarcelonaLikeMutationLikeMutation',
-            'variables': '{{"media_id":"{}"}}'.format(postID),
-            'server_timestamps': 'true',
-            'doc_id': "6163527303756305",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Liking Post"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def unlike_post(self, postURL):
-        """
-        Unlike a Threads.net post.
-
-        Args:
-            postURL (str): The URL of the post to unlike.
-
-        Returns:
-            dict: A JSON response confirming the unlike action.
-
-        Raises:
-            ThreadScrapeError: If there's an error while attempting to unlike the post.
-        """
-        postID = self.get_post_id(postURL)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaLikeMutationUnlikeMutation'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'fb_api_req_friendly_name': 'useBarcelonaLikeMutationUnlikeMutation',
-            'variables': '{{"media_id":"{}"}}'.format(postID),
-            'server_timestamps': 'true',
-            'doc_id': "6574229129305381",
-        }
-
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error UnLiking Post"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-
-    def get_profile_info(self, username):
-        """
-        Get profile information for a Threads.net user.
-
-        Args:
-            username (str): The username or profile URL of the user.
-
-        Returns:
-            dict: A JSON response containing profile information.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving profile information.
-        """
-        self.session.headers.update({'x-fb-friendly-name': 'BarcelonaUsernameHoverCardImplQuery'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'fb_api_req_friendly_name': 'BarcelonaUsernameHoverCardImplQuery',
-            'variables': '{{"username":"{}"}}'.format(username),
-            'server_timestamps': 'true',
-            'doc_id': "6294229744032325",
-        }
-
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Retriving Profile Details"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def search(self, query, limit=10):
-        """
-        Search for users on Threads.net.
-
-        Args:
-            query (str): The search query.
-            limit (int, optional): The maximum number of results to return (default is 10).
-
-        Returns:
-            dict: A JSON response containing search results.
-
-        Raises:
-            ThreadScrapeError: If there's an error while performing the search.
-        """
-        limit = int(limit)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaAccountSearchGraphQLDataSourceQuery'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'fb_api_req_friendly_name': 'useBarcelonaAccountSearchGraphQLDataSourceQuery',
-            'variables': '{{"query":"{}","first":{},"__relay_internal__pv__BarcelonaIsLoggedInrelayprovider":true}}'.format(query, limit),
-            'server_timestamps': 'true',
-            'doc_id': "6427333243987367",
-        }
-
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Searching"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-
-    def get_recommended_users(self, limit=20):
-        """
-        Get recommended Threads.net users to follow.
-
-        Args:
-            limit (int, optional): The maximum number of recommended users to retrieve (default is 20).
-
-        Returns:
-            dict: A JSON response containing recommended user data.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving recommended users.
-        """
-        self.session.headers.update({'x-fb-friendly-name': 'BarcelonaSearchRecommendedUsersRefetchableQuery'})
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'fb_api_req_friendly_name': 'BarcelonaSearchRecommendedUsersRefetchableQuery',
-            'variables': '{{"after":"{}","before":null,"first":10,"last":null,"__relay_internal__pv__BarcelonaIsLoggedInrelayprovider":true}}'.format(limit),
-            'server_timestamps': 'true',
-            'doc_id': "6476698865784411",
-        }
-
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Retriving Profile Details"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def create_thread(self, text):
-        """
-        Create a new Threads.net thread (text post).
-
-        Args:
-            text (str): The text content of the thread.
-
-        Returns:
-            dict: A JSON response confirming the thread creation.
-
-        Raises:
-            ThreadScrapeError: If there's an error while creating the thread.
-
-        Note: Only this method requires the x-csrftoken in order to create post
-        """
-        self.session.headers.update({'x-csrftoken': self.x_csrftoken})
-        data = {
-            'caption': text,
-            'is_meta_only_post': '',
-            'is_paid_partnership': '',
-            'publish_mode': 'text_post',
-            'text_post_app_info': '{"reply_control":0}',
-          }
-
-        response = self.session.post(
-            '{}/api/v1/media/configure_text_only_post/'.format(self.BASE_URL), data=data,
-         )
-
-        error_message = "Error Creating Thread"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def update_reply_permission(self, postURL, option="accounts_you_follow"):
-        """
-        Update the reply permission of a Threads.net post.
-
-        Args:
-            postURL (str): The URL of the post to update.
-            option (str, optional): The reply permission option (default is "accounts_you_follow"). Available Options are mentioned_only, your_followers and accounts_you_follow
-
-        Returns:
-            dict: A JSON response confirming the update.
-
-        Raises:
-            ThreadScrapeError: If there's an error while updating the reply permission.
-        """
-        postID = self.get_post_id(postURL)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaSetPostReplyControlMutation'})
-        # mentioned_only, accounts_you_follow, your_followers
-
-        data = {
-            'fb_dtsg': self.fb_dtsg,
-            'fb_api_req_friendly_name': 'useBarcelonaSetPostReplyControlMutation',
-            'variables': '{{"reply_control":"{}","post_id":"{}"}}'.format(option, postID),
-            'server_timestamps': 'true',
-            'doc_id': "6476698865784411",
-        }
-
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Updating Reply Permission"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-
-    def delete_thread(self, postURL):
-        """
-        Delete a Threads.net thread.
-
-        Args:
-            postURL (str): The URL of the thread to delete.
-
-        Returns:
-            dict: A JSON response confirming the thread deletion.
-
-        Raises:
-            ThreadScrapeError: If there's an error while deleting the thread.
-        """
-        id = self.get_id(postURL)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaDeleteMutationMutation'})
-
-        data = {
-                'fb_dtsg': self.fb_dtsg,
-                'fb_api_req_friendly_name': 'useBarcelonaDeleteMutationMutation',
-                'variables': '{{"media_id":"{}"}}'.format(id),
-                'server_timestamps': 'true',
-                'doc_id': "9722027491203611",
-            }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Deleting Thread"
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def block_user(self, username):
-        """
-        Block a Threads.net user.
-
-        Args:
-            username (str): The username or profile URL of the user to block.
-
-        Returns:
-            dict: A JSON response confirming the block action.
-
-        Raises:
-            ThreadScrapeError: If there's an error while blocking the user.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaUserBlockMutation'})
-
-        data = {
-          'fb_dtsg': self.fb_dtsg,
-          'lsd': 'BSWpx6WGeZ94S2rNbmkxn4',
-          'fb_api_req_friendly_name': 'useBarcelonaUserBlockMutation',
-          'variables': '{{"user_id":"{}"}}'.format(userID),
-          'server_timestamps': 'true',
-          'doc_id': "7159968810697379",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error Blocking User {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def unblock_user(self, username):
-        """
-        Unblock a Threads.net user.
-
-        Args:
-            username (str): The username or profile URL of the user to unblock.
-
-        Returns:
-            dict: A JSON response confirming the unblock action.
-
-        Raises:
-            ThreadScrapeError: If there's an error while unblocking the user.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'useBarcelonaUserUnblockMutation'})
-
-        data = {
-          'fb_dtsg': self.fb_dtsg,
-          'lsd': 'BSWpx6WGeZ94S2rNbmkxn4',
-          'fb_api_req_friendly_name': 'useBarcelonaUserUnblockMutation',
-          'variables': '{{"user_id":"{}"}}'.format(userID),
-          'server_timestamps': 'true',
-          'doc_id': "6572924756096893",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error UnBlocking User {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-    def get_user_profile_threads(self, username):
-        """
-        Get the Threads.net threads associated with a user's profile.
-
-        Args:
-            username (str): The username or profile URL of the user.
-
-        Returns:
-            dict: A JSON response containing user profile threads.
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving user profile threads.
-        """
-        userID = self.get_user_id(username)
-
-        self.session.headers.update({'x-fb-friendly-name': 'BarcelonaProfileThreadsTabQuery'})
-
-        data = {
-          'fb_dtsg': self.fb_dtsg,
-          'lsd': 'BSWpx6WGeZ94S2rNbmkxn4',
-          'fb_api_req_friendly_name': 'BarcelonaProfileThreadsTabQuery',
-          'variables': '{{"userID":"{}"}}'.format(userID),
-          'server_timestamps': 'true',
-          'doc_id': "6232751443445612",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error retrieving Threads for {}".format(username)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-
-
-    def get_post_info(self, postURL):
-        """
-        Get the Info for Thread Post.
-
-        Args:
-            postURL (str): postURL to get the info for
-
-        Returns:
-            dict: A JSON response containing thread's post
-
-        Raises:
-            ThreadScrapeError: If there's an error retrieving post.
-        """
-        postID = self.get_post_id(postURL)
-
-        self.session.headers.update({'x-fb-friendly-name': 'BarcelonaPostPageQuery'})
-
-        data = {
-          'fb_dtsg': self.fb_dtsg,
-          'lsd': 'SI3IPQlJXR0BOvV0HaHVtY',
-          'fb_api_req_friendly_name': 'BarcelonaPostPageQuery',
-          'variables': '{{"postID":"{}","__relay_internal__pv__BarcelonaIsLoggedInrelayprovider":true,"__relay_internal__pv__BarcelonaIsFeedbackHubEnabledrelayprovider":false}}'.format(postID),
-          'server_timestamps': 'true',
-          'doc_id': "6994920940542386",
-        }
-
-        response = self.session.post(self.GRAPHQL_URL, data=data)
-
-        error_message = "Error retrieving Post Info for {}".format(postURL)
-
-        r_json = get_json_response(response, error_message)
-
-        return r_json
-    
-
-    def get_post_media(self, postURL, image_size="original"):
-        post_info = self.get_post_info(postURL)
-        media = arrange_media_data(post_info, image_size=image_size)
-
-        return media
\ No newline at end of file
+import requests, time
+from .errors import ThreadScrapeError, RateLimitError, ServerError
+from .utils import get_json_response, arrange_media_data, parse_username, parse_retry_after, validate_credentials, post_cache_key
+from .cache import LRUCache
+from .refs import UserRef, PostRef
+from .transport import create_session, pool_stats
+from .batch import run_batch
+from .pagination import ConnectionIterator
+from .ratelimit import RequestDispatcher
+from .pool import SessionPool
+from .operations import OPERATIONS, BY_FRIENDLY_NAME
+from .extract import extract_from_response, PageExtractor
+from .decoding import JSONDecoder
+from .response_cache import operation_tag
+from .singleflight import SingleFlight
+from .hooks import Hooks, Metrics
+from .models import User, Thread
+
+
+class ThreadScrape:
+    """
+    A class for scraping data from the Threads.net WEB-API.
+
+    Session wide state is only written in __init__, so one instance can be shared by a pool of threads.
+    """
+
+    def __init__(self, data, user_id_cache=None, session=None, dispatcher=None, post_cache=None, decoder=None,
+                 response_cache=None, base_url="https://www.threads.net", hooks=None):
+        """
+        Initializes a ThreadScrape instance with user data.
+
+        Args:
+            data (dict or SessionPool): A dictionary containing user session data with keys 'sessionid', 'fb_dtsg', and 'x-csrftoken'.
+                These are required for making authenticated requests. A SessionPool spreads requests over several accounts.
+            user_id_cache (optional): Cache used by get_user_id to remember resolved user IDs, such as
+                LRUCache or SQLiteCache (default is an in-memory LRUCache).
+            session (requests.Session, optional): Session all requests are sent through, see
+                transport.create_session to size its connection pool (default is create_session()).
+            dispatcher (RequestDispatcher, optional): Rate limits, retries and circuit breaking applied to every
+                request (default retries 429 responses and connection errors 3 times, without rate limits).
+                With a SessionPool they apply to the client as a whole, not per account.
+            post_cache (optional): Cache used by resolve_post to remember the IDs of post URLs
+                (default is an in-memory LRUCache).
+            decoder (JSONDecoder, optional): Decodes GraphQL responses, with optional per endpoint schemas
+                (default uses the fastest installed JSON backend).
+            response_cache (ResponseCache, optional): Caches the responses of read-only queries, mutations
+                invalidate the responses they affect (default is no caching).
+            base_url (str, optional): The site requests are sent to, e.g. a mock_server.MockServer for
+                benchmarks (default is "https://www.threads.net").
+            hooks (Hooks, optional): Event handlers called along the request path, also given to the
+                dispatcher when it has none (default is an empty Hooks()).
+        """
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.session = session if session is not None else create_session()
+        self.dispatcher = dispatcher if dispatcher is not None else RequestDispatcher(
+            retry_on=(RateLimitError, requests.ConnectionError, requests.Timeout), hooks=self.hooks,
+        )
+        if self.dispatcher.hooks is None:
+            self.dispatcher.hooks = self.hooks
+        self.user_id_cache = user_id_cache if user_id_cache is not None else LRUCache()
+        self.post_cache = post_cache if post_cache is not None else LRUCache()
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.response_cache = response_cache
+        self.inflight = SingleFlight()
+        self.BASE_URL = base_url
+        self.GRAPHQL_URL = "{}/api/graphql".format(base_url)
+        self.lsd_token = "AVqw_XEyRAI"
+        self.common_headers = self.get_common_headers()
+        self.session_pool = data if isinstance(data, SessionPool) else None
+        self.setup_credentials(data)
+        self.setup_headers()
+        self.setup_session_pool()
+
+    def get_common_headers(self):
+        """
+        Get common HTTP headers used in requests.
+
+        Returns:
+            dict: A dictionary containing common HTTP headers.
+        """
+        return {
+            "authority": self.BASE_URL,
+            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+            "accept-language": "en,en-US;q=0.9,en-IN;q=0.8",
+            "cache-control": "max-age=0",
+            "dpr": "1.5",
+            "sec-ch-prefers-color-scheme": "dark",
+            "sec-ch-ua": '"Chromium";v="116", "Not)A;Brand";v="24", "Google Chrome";v="116"',
+            "sec-ch-ua-full-version-list": '"Chromium";v="116.0.5845.180", "Not)A;Brand";v="24.0.0.0", "Google Chrome";v="116.0.5845.180"',
+            "sec-fetch-dest": "document",
+            "sec-fetch-mode": "navigate",
+            "sec-fetch-site": "none",
+            "sec-fetch-user": "?1",
+            "upgrade-insecure-requests": "1",
+            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36",
+            "viewport-width": "1280",
+        }
+
+
+    def setup_credentials(self, data):
+        """
+        Set up user credentials for the session.
+
+        Args:
+            data (dict or SessionPool): A dictionary containing user session data. For a SessionPool
+                the first account's credentials are used.
+
+        Raises:
+            ValueError: If required keys are missing or data format is invalid.
+        """
+        if isinstance(data, SessionPool):
+            first = data.sessions[0]
+            data = {"sessionid": first.sessionid, "fb_dtsg": first.fb_dtsg, "x-csrftoken": first.x_csrftoken}
+
+        validate_credentials(data)
+
+        self.sessionid = data["sessionid"]
+        self.fb_dtsg = data["fb_dtsg"]
+        self.x_csrftoken = data["x-csrftoken"]
+
+    def setup_headers(self, session=None, sessionid=None):
+        """
+        Set up HTTP headers for the session.
+
+        Args:
+            session (optional): The session to set up (default is self.session).
+            sessionid (str, optional): The sessionid cookie (default is self.sessionid).
+        """
+        session = session if session is not None else self.session
+        session.cookies.update({"sessionid": sessionid if sessionid is not None else self.sessionid})
+        session.headers.update(
+            {
+                "authority": "www.threads.net",
+                "accept": "*/*",
+                "accept-language": "en,en-US;q=0.9,en-IN;q=0.8",
+                "content-type": "application/x-www-form-urlencoded",
+                "dpr": "1.5",
+                "origin": "https://www.threads.net",
+                "sec-ch-prefers-color-scheme": "dark",
+                "sec-ch-ua": '"Chromium";v="116", "Not)A;Brand";v="24", "Google Chrome";v="116"',
+                "sec-ch-ua-full-version-list": '"Chromium";v="116.0.5845.180", "Not)A;Brand";v="24.0.0.0", "Google Chrome";v="116.0.5845.180"',
+                "sec-ch-ua-mobile": "?0",
+                "sec-ch-ua-model": '""',
+                "sec-ch-ua-platform": '"Windows"',
+                "sec-ch-ua-platform-version": '"15.0.0"',
+                "sec-fetch-dest": "empty",
+                "sec-fetch-mode": "cors",
+                "sec-fetch-site": "same-origin",
+                "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36",
+                "x-asbd-id": "129477",
+                "x-fb-lsd": self.lsd_token,
+                "x-ig-app-id": "238260118697367",
+            }
+        )
+
+    def setup_session_pool(self):
+        """
+        Give every account of the session pool its own cookies and headers, sharing the transport of self.session.
+        """
+        if self.session_pool is None:
+            return
+
+        for pooled in self.session_pool.sessions:
+            pooled.session = requests.Session()
+            for prefix, adapter in self.session.adapters.items():
+                pooled.session.mount(prefix, adapter)
+            self.setup_headers(pooled.session, pooled.sessionid)
+
+    def _request(self, method, url, data=None, headers=None, stream=False, key=None, defer_release=False):
+        """
+        Send a request with the client session, or with the least loaded account of the session pool.
+
+        With a session pool the 'fb_dtsg' form field and 'x-csrftoken' header are replaced with the
+        chosen account's, and the outcome is reported back to the pool. Connection errors and error
+        statuses, 429 included, count against the account.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL.
+            data (dict, optional): The form data.
+            headers (dict, optional): Request specific headers.
+            stream (bool, optional): Defer downloading the body (default is False).
+            key (str, optional): The operation reported to hooks, such as the GraphQL friendly name.
+            defer_release (bool, optional): Leave the outcome of a successful status to the caller, who
+                reports it with _release once the body is read (default is False).
+
+        Returns:
+            requests.Response: The HTTP response.
+        """
+        if not self.hooks:
+            return self._send(method, url, data, headers, stream, defer_release)
+
+        self.hooks.emit("before_request", key=key, method=method, url=url)
+        started = time.perf_counter()
+        response = self._send(method, url, data, headers, stream, defer_release)
+        # A streamed body is read later, its size is reported by the caller
+        self.hooks.emit(
+            "after_response", key=key, phase="request", seconds=time.perf_counter() - started,
+            status=response.status_code, bytes=None if stream else len(response.content),
+        )
+        return response
+
+    def _send(self, method, url, data, headers, stream, defer_release=False):
+        if self.session_pool is None:
+            return self.session.request(method, url, data=data, headers=headers, stream=stream)
+
+        pooled = self.session_pool.acquire()
+        if data is not None and 'fb_dtsg' in data:
+            data = dict(data, fb_dtsg=pooled.fb_dtsg)
+        if headers is not None and 'x-csrftoken' in headers:
+            headers = dict(headers, **{'x-csrftoken': pooled.x_csrftoken})
+
+        try:
+            response = pooled.session.request(method, url, data=data, headers=headers, stream=stream)
+        except Exception:
+            self.session_pool.release(pooled, ok=False)
+            raise
+
+        if defer_release and response.status_code < 400:
+            response.pooled_session = pooled
+        else:
+            self.session_pool.release(pooled, ok=response.status_code < 400)
+        return response
+
+    def _release(self, response, ok):
+        """
+        Report the outcome of a request sent with defer_release to the session pool.
+
+        Args:
+            response (requests.Response): The response returned by _request.
+            ok (bool): Whether the request succeeded.
+        """
+        pooled = response.__dict__.pop("pooled_session", None)
+        if pooled is not None:
+            self.session_pool.release(pooled, ok)
+
+    def enable_metrics(self, metrics=None):
+        """
+        Collect metrics of every request, and of the client's caches.
+
+        Args:
+            metrics (Metrics, optional): The collector to attach (default is a new Metrics()).
+
+        Returns:
+            Metrics: The collector, metrics.prometheus() exports it in the Prometheus text format.
+        """
+        metrics = metrics if metrics is not None else Metrics()
+        metrics.attach(self.hooks)
+        metrics.track("user_id", self.user_id_cache)
+        metrics.track("post", self.post_cache)
+        metrics.track("inflight", self.inflight)
+        if self.response_cache is not None:
+            metrics.track("response", self.response_cache)
+        return metrics
+
+    def session_stats(self):
+        """
+        Get per account statistics of the session pool.
+
+        Returns:
+            list: One dict per account, empty without a session pool.
+        """
+        return self.session_pool.stats() if self.session_pool is not None else []
+
+    def _post_graphql(self, data):
+        """
+        Send a GraphQL request.
+
+        The friendly name header is passed with the request instead of being set on the shared session,
+        so concurrent calls from several threads don't overwrite each other's headers.
+
+        Args:
+            data (dict): The form data, including 'fb_api_req_friendly_name'.
+
+        Returns:
+            requests.Response: The HTTP response, whose outcome the caller reports with _release.
+        """
+        headers = {'x-fb-friendly-name': data['fb_api_req_friendly_name']}
+
+        return self._request(
+            "POST", self.GRAPHQL_URL, data=data, headers=headers, key=data['fb_api_req_friendly_name'], defer_release=True,
+        )
+
+    def _graphql(self, data, error_message, tags=()):
+        """
+        Send a GraphQL request through the dispatcher, rate limited on its friendly name.
+
+        Args:
+            data (dict): The form data, including 'fb_api_req_friendly_name'.
+            error_message (str): Custom error message to raise in case of errors.
+            tags (iterable, optional): For queries, the response cache tags the response is stored under.
+                For mutations, the tags invalidated once it succeeds.
+
+        Returns:
+            dict: Parsed JSON response. Concurrent identical queries share one request and its response,
+                which must not be modified.
+        """
+        key = data['fb_api_req_friendly_name']
+
+        def attempt():
+            response = self._post_graphql(data)
+            started = time.perf_counter()
+            ok = False
+            try:
+                r_json = get_json_response(response, error_message, decoder=self.decoder, key=key)
+                ok = True
+            finally:
+                # A 200 carrying GraphQL errors counts against the account like an error status
+                self._release(response, ok)
+
+            if not self.hooks:
+                return r_json
+
+            self.hooks.emit(
+                "after_response", key=key, phase="decode", seconds=time.perf_counter() - started,
+                status=response.status_code,
+            )
+            return r_json
+
+        def send():
+            return self.dispatcher.call(key, attempt)
+
+        operation = BY_FRIENDLY_NAME.get(key)
+        if operation is not None and operation.mutation:
+            r_json = send()
+            if self.response_cache is not None:
+                self.response_cache.invalidate(tags)
+            return r_json
+
+        def coalesced():
+            return self.inflight.do((key, data['doc_id'], data['variables']), send)
+
+        if self.response_cache is None:
+            return coalesced()
+
+        return self.response_cache.fetch(data, coalesced, tags)
+
+    def _user_tags(self, username, userID):
+        """
+        Get the response cache tags of a user: its ID, and its username when known.
+        """
+        tags = ["user:{}".format(userID)]
+        name = username.username if isinstance(username, UserRef) else username
+        if isinstance(name, str):
+            tags.append("username:{}".format(parse_username(name).lower()))
+        return tags
+
+    def _post_tags(self, postURL):
+        """
+        Get the ID of a post and the response cache tags a change to it invalidates: the post and its
+        author's profile threads, or every profile's threads when the author isn't known without a fetch.
+        """
+        if isinstance(postURL, PostRef) and postURL.post_id is not None and postURL.user_id is None:
+            return postURL.post_id, ["post:{}".format(postURL.post_id), operation_tag('get_user_profile_threads')]
+
+        post = self.resolve_post(postURL)
+        tags = ["post:{}".format(post.post_id)]
+        tags.append("threads:{}".format(post.user_id) if post.user_id is not None else operation_tag('get_user_profile_threads'))
+        return post.post_id, tags
+
+    def _extract_page(self, url, names):
+        """
+        Stream an HTML page through the dispatcher, rate limited under the 'page' key, and stop
+        reading as soon as every marker in names is found.
+
+        Args:
+            url (str): The page URL.
+            names (tuple): Keys of extract.PATTERNS to look for.
+
+        Returns:
+            dict: The value found for each name, names that weren't found are missing. Concurrent fetches
+                of the same page share one request.
+        """
+        def send():
+            started = time.perf_counter()
+            response = self._request("GET", url, headers=self.get_common_headers(), stream=True, key="page")
+            if response.status_code == 429:
+                response.close()
+                raise RateLimitError("Rate limited fetching {}".format(url), parse_retry_after(response))
+            if response.status_code >= 500:
+                response.close()
+                raise ServerError("Error fetching {} ({})".format(url, response.status_code), response.status_code)
+
+            extractor = PageExtractor(names)
+            found = extract_from_response(response, names, extractor=extractor)
+            if self.hooks:
+                self.hooks.emit(
+                    "after_response", key="page", phase="page", seconds=time.perf_counter() - started,
+                    status=response.status_code, bytes=extractor.bytes_read,
+                )
+            return found
+
+        return self.inflight.do(("page", url, tuple(names)), lambda: self.dispatcher.call("page", send))
+
+    def _user_ref(self, username):
+        """
+        Resolve a username, profile URL or UserRef once into a UserRef.
+        """
+        if isinstance(username, UserRef):
+            return username
+        if isinstance(username, int):
+            return UserRef(username)
+
+        return UserRef(self.get_user_id(username), parse_username(username))
+
+    def execute(self, name, error_message=None, **variables):
+        """
+        Run any operation of the registry by name.
+
+        Args:
+            name (str): The key of the operation in operations.OPERATIONS.
+            error_message (str, optional): Custom error message to raise in case of errors.
+            **variables: The operation's variables.
+
+        Returns:
+            dict: Parsed JSON response.
+
+        Raises:
+            ValueError: If the variables don't match the operation's schema.
+            ThreadScrapeError: If there's an error running the operation.
+        """
+        data = OPERATIONS[name].build(self.fb_dtsg, **variables)
+
+        return self._graphql(data, error_message or "Error running {}".format(name))
+
+    def pool_stats(self):
+        """
+        Get connection pool statistics for the session.
+
+        Returns:
+            dict: Per host statistics with the number of connections opened, requests sent,
+                idle connections and pool size.
+        """
+        return pool_stats(self.session)
+
+    def get_user_id(self, url):
+        """
+        Get the user ID from a Threads.net profile URL or username.
+
+        Args:
+            url (str or UserRef): The profile URL, username or UserRef. A UserRef or int is returned as is
+                without fetching the profile page.
+
+        Returns:
+            int: The user ID.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving the user ID.
+        """
+        if isinstance(url, UserRef):
+            return url.user_id
+        if isinstance(url, int):
+            return url
+
+        username = parse_username(url)
+
+        cached_user_id = self.user_id_cache.get(username.lower())
+        if cached_user_id is not None:
+            return cached_user_id
+
+        found = self._extract_page("{}/@{}".format(self.BASE_URL, username), ("userID",))
+
+        if "userID" in found:
+            user_id = int(found["userID"])
+        else:
+            raise ThreadScrapeError("Error Retriving userID")
+
+        self.user_id_cache.set(username.lower(), user_id)
+
+        return user_id
+
+    def invalidate_user_id(self, url=None):
+        """
+        Drop cached user IDs so the next get_user_id call fetches the profile page again.
+
+        Args:
+            url (str, optional): The profile URL or username to forget. Clears the whole cache when omitted.
+        """
+        if url is None:
+            self.user_id_cache.clear()
+            return
+
+        self.user_id_cache.invalidate(parse_username(url).lower())
+
+    def get_post_id(self, url):
+        """
+        Get the post ID from a Threads.net post URL.
+
+        Args:
+            url (str or PostRef): The post URL or PostRef. A PostRef holding a post_id skips the page fetch.
+
+        Returns:
+            str: The post ID.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving the post ID.
+        """
+        if isinstance(url, PostRef) and url.post_id is not None:
+            return url.post_id
+
+        return self.resolve_post(url).post_id
+
+    def get_id(self, url):
+        """
+        Get the ID from a Threads.net URL.
+
+        Args:
+            url (str or PostRef): The URL or PostRef. A PostRef holding both post_id and user_id skips the page fetch.
+
+        Returns:
+            str: The ID.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving the ID.
+        """
+        id = self.resolve_post(url).id
+
+        if id is None:
+            raise ThreadScrapeError("Error Retriving ID")
+
+        return id
+
+    def resolve_post(self, url):
+        """
+        Get every ID of a Threads.net post from a single fetch of its page.
+
+        The postID and the '<post_id>_<user_id>' ID are read in one pass and cached by URL, so
+        get_post_id, get_id and every method built on them fetch a given post page once.
+
+        Args:
+            url (str or PostRef): The post URL or PostRef.
+
+        Returns:
+            PostRef: The post with its post_id, author user_id (None if not found), url and code.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving the post ID, or a PostRef has neither a url nor a user_id.
+        """
+        if isinstance(url, PostRef):
+            if url.post_id is not None and url.user_id is not None:
+                return url
+            if url.url is None:
+                raise ThreadScrapeError("PostRef needs a url or user_id to resolve the ID")
+            url = url.url
+
+        key = post_cache_key(url)
+        ids = self.post_cache.get(key)
+
+        if ids is None:
+            found = self._extract_page(url, ("postID", "id"))
+
+            if "postID" not in found:
+                raise ThreadScrapeError("Error Retriving postID")
+
+            ids = {"post_id": found["postID"], "user_id": found["id"].split("_", 1)[1] if "id" in found else None}
+            self.post_cache.set(key, ids)
+
+        return PostRef(ids["post_id"], ids["user_id"], url)
+
+    def invalidate_post(self, url=None):
+        """
+        Drop cached post IDs so the next resolve_post call fetches the post page again.
+
+        Args:
+            url (str, optional): The post URL to forget. Clears the whole cache when omitted.
+        """
+        if url is None:
+            self.post_cache.clear()
+            return
+
+        self.post_cache.invalidate(post_cache_key(url))
+
+
+    def get_followers(self, username, first=None, after=None):
+        """
+        Get the Followers from a Threads.net profile URL or username.
+
+        Args:
+            username (str or UserRef): The profile URL, username or UserRef.
+            first (int, optional): The page size (default is the server's).
+            after (str, optional): The end_cursor of the previous page (default is the first page).
+
+        Returns:
+            dict: Get the Followers from a Threads.net profile URL or username.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving the user ID.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['get_followers'].build(self.fb_dtsg, userID=userID, first=first, after=after)
+
+        error_message = "Error retrieving Followers for {}".format(username)
+
+        r_json = self._graphql(data, error_message)
+
+        return r_json
+
+    def get_following(self, username, first=None, after=None):
+        """
+        Get the user's following data
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user.
+            first (int, optional): The page size (default is the server's).
+            after (str, optional): The end_cursor of the previous page (default is the first page).
+
+        Returns:
+            dict: A JSON response containing following data.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving following data.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['get_following'].build(self.fb_dtsg, userID=userID, first=first, after=after)
+
+        error_message = "Error retrieving Followers for username {}".format(username)
+
+        r_json = self._graphql(data, error_message)
+
+        return r_json
+
+    def follow_user(self, username):
+        """
+        Follow a Threads.net user.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user to follow.
+
+        Returns:
+            dict: A JSON response confirming the follow action.
+
+        Raises:
+            ThreadScrapeError: If there's an error while attempting to follow the user.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['follow_user'].build(self.fb_dtsg, target_user_id=userID)
+
+        error_message = "Error Following User {}".format(username)
+
+        r_json = self._graphql(data, error_message, self._user_tags(username, userID) + [operation_tag('search')])
+
+        return r_json
+
+    def unfollow_user(self, username):
+        """
+        Unfollow a Threads.net user.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user to unfollow.
+
+        Returns:
+            dict: A JSON response confirming the unfollow action.
+
+        Raises:
+            ThreadScrapeError: If there's an error while attempting to unfollow the user.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['unfollow_user'].build(self.fb_dtsg, target_user_id=userID)
+
+        error_message = "Error UnFollowing User {}".format(username)
+
+        r_json = self._graphql(data, error_message, self._user_tags(username, userID) + [operation_tag('search')])
+
+        return r_json
+
+    def like_post(self, postURL):
+        """
+        Like a Threads.net post.
+
+        Args:
+            postURL (str or PostRef): The URL or PostRef of the post to like.
+
+        Returns:
+            dict: A JSON response confirming the like action.
+
+        Raises:
+            ThreadScrapeError: If there's an error while attempting to like the post.
+        """
+        postID, tags = self._post_tags(postURL)
+
+        data = OPERATIONS['like_post'].build(self.fb_dtsg, media_id=postID)
+
+        error_message = "Error Liking Post"
+
+        r_json = self._graphql(data, error_message, tags)
+
+        return r_json
+
+    def unlike_post(self, postURL):
+        """
+        Unlike a Threads.net post.
+
+        Args:
+            postURL (str or PostRef): The URL or PostRef of the post to unlike.
+
+        Returns:
+            dict: A JSON response confirming the unlike action.
+
+        Raises:
+            ThreadScrapeError: If there's an error while attempting to unlike the post.
+        """
+        postID, tags = self._post_tags(postURL)
+
+        data = OPERATIONS['unlike_post'].build(self.fb_dtsg, media_id=postID)
+
+        error_message = "Error UnLiking Post"
+
+        r_json = self._graphql(data, error_message, tags)
+
+        return r_json
+
+
+    def get_profile_info(self, username):
+        """
+        Get profile information for a Threads.net user.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user.
+
+        Returns:
+            dict: A JSON response containing profile information.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving profile information.
+        """
+        if isinstance(username, UserRef):
+            if username.username is None:
+                raise ThreadScrapeError("A UserRef without a username can't be used to retrieve Profile Details")
+            username = username.username
+
+        data = OPERATIONS['get_profile_info'].build(self.fb_dtsg, username=username)
+
+        error_message = "Error Retriving Profile Details"
+
+        r_json = self._graphql(data, error_message, ["username:{}".format(parse_username(username).lower())])
+
+        return r_json
+
+    def get_profile_info_many(self, usernames, max_workers=8, ordered=True):
+        """
+        Get profile information for many Threads.net users concurrently.
+
+        Args:
+            usernames (iterable): The usernames or UserRefs. Repeated usernames are only fetched once.
+            max_workers (int, optional): The maximum number of requests in flight (default is 8).
+            ordered (bool, optional): Yield results in input order, otherwise as they complete (default is True).
+
+        Yields:
+            BatchResult: The input with either its profile information or the raised error.
+        """
+        return run_batch(self.get_profile_info, usernames, max_workers=max_workers, ordered=ordered)
+
+    def search(self, query, limit=10):
+        """
+        Search for users on Threads.net.
+
+        Args:
+            query (str): The search query.
+            limit (int, optional): The maximum number of results to return (default is 10).
+
+        Returns:
+            dict: A JSON response containing search results.
+
+        Raises:
+            ThreadScrapeError: If there's an error while performing the search.
+        """
+        data = OPERATIONS['search'].build(self.fb_dtsg, query=query, first=limit)
+
+        error_message = "Error Searching"
+
+        r_json = self._graphql(data, error_message)
+
+        return r_json
+
+
+    def get_recommended_users(self, limit=20, after=None):
+        """
+        Get recommended Threads.net users to follow.
+
+        Args:
+            limit (int, optional): The maximum number of recommended users to retrieve (default is 20).
+            after (str, optional): The end_cursor of the previous page (default is the first page).
+
+        Returns:
+            dict: A JSON response containing recommended user data.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving recommended users.
+        """
+        data = OPERATIONS['get_recommended_users'].build(self.fb_dtsg, first=limit, after=after)
+
+        error_message = "Error Retriving Profile Details"
+
+        r_json = self._graphql(data, error_message)
+
+        return r_json
+
+    def iter_followers(self, username, page_size=50, after=None, prefetch=False):
+        """
+        Iterate over every follower of a Threads.net user, page by page.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user.
+            page_size (int, optional): The number of followers requested per page (default is 50).
+            after (str, optional): Cursor to resume from (default is the first page).
+            prefetch (bool, optional): Fetch the next page while the current one is consumed (default is False).
+
+        Returns:
+            ConnectionIterator: Yields follower nodes, its models() method yields them as models.User,
+                pages() yields whole pages and end_cursor holds the cursor to resume from.
+        """
+        user = self._user_ref(username)
+
+        return ConnectionIterator(lambda cursor: self.get_followers(user, page_size, cursor), after, prefetch, User)
+
+    def iter_following(self, username, page_size=50, after=None, prefetch=False):
+        """
+        Iterate over every account a Threads.net user follows, page by page.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user.
+            page_size (int, optional): The number of accounts requested per page (default is 50).
+            after (str, optional): Cursor to resume from (default is the first page).
+            prefetch (bool, optional): Fetch the next page while the current one is consumed (default is False).
+
+        Returns:
+            ConnectionIterator: Yields user nodes.
+        """
+        user = self._user_ref(username)
+
+        return ConnectionIterator(lambda cursor: self.get_following(user, page_size, cursor), after, prefetch, User)
+
+    def iter_user_profile_threads(self, username, page_size=25, after=None, prefetch=False):
+        """
+        Iterate over every thread of a user's profile, page by page.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user.
+            page_size (int, optional): The number of threads requested per page (default is 25).
+            after (str, optional): Cursor to resume from (default is the first page).
+            prefetch (bool, optional): Fetch the next page while the current one is consumed (default is False).
+
+        Returns:
+            ConnectionIterator: Yields thread nodes.
+        """
+        user = self._user_ref(username)
+
+        return ConnectionIterator(lambda cursor: self.get_user_profile_threads(user, page_size, cursor), after, prefetch, Thread)
+
+    def iter_recommended_users(self, page_size=20, after=None, prefetch=False):
+        """
+        Iterate over recommended Threads.net users, page by page.
+
+        Args:
+            page_size (int, optional): The number of users requested per page (default is 20).
+            after (str, optional): Cursor to resume from (default is the first page).
+            prefetch (bool, optional): Fetch the next page while the current one is consumed (default is False).
+
+        Returns:
+            ConnectionIterator: Yields user nodes.
+        """
+        return ConnectionIterator(lambda cursor: self.get_recommended_users(page_size, cursor), after, prefetch, User)
+
+    def create_thread(self, text):
+        """
+        Create a new Threads.net thread (text post).
+
+        Args:
+            text (str): The text content of the thread.
+
+        Returns:
+            dict: A JSON response confirming the thread creation.
+
+        Raises:
+            ThreadScrapeError: If there's an error while creating the thread.
+
+        Note: Only this method requires the x-csrftoken in order to create post
+        """
+        data = {
+            'caption': text,
+            'is_meta_only_post': '',
+            'is_paid_partnership': '',
+            'publish_mode': 'text_post',
+            'text_post_app_info': '{"reply_control":0}',
+          }
+
+        error_message = "Error Creating Thread"
+
+        r_json = self.dispatcher.call('configure_text_only_post', lambda: get_json_response(
+            self._request(
+                "POST", '{}/api/v1/media/configure_text_only_post/'.format(self.BASE_URL), data=data,
+                headers={'x-csrftoken': self.x_csrftoken}, key='configure_text_only_post',
+            ),
+            error_message,
+            decoder=self.decoder,
+        ))
+
+        if self.response_cache is not None:
+            self.response_cache.invalidate([operation_tag('get_user_profile_threads')])
+
+        return r_json
+
+    def update_reply_permission(self, postURL, option="accounts_you_follow"):
+        """
+        Update the reply permission of a Threads.net post.
+
+        Args:
+            postURL (str or PostRef): The URL or PostRef of the post to update.
+            option (str, optional): The reply permission option (default is "accounts_you_follow"). Available Options are mentioned_only, your_followers and accounts_you_follow
+
+        Returns:
+            dict: A JSON response confirming the update.
+
+        Raises:
+            ThreadScrapeError: If there's an error while updating the reply permission.
+        """
+        postID, tags = self._post_tags(postURL)
+
+        # mentioned_only, accounts_you_follow, your_followers
+
+        data = OPERATIONS['update_reply_permission'].build(self.fb_dtsg, reply_control=option, post_id=postID)
+
+        error_message = "Error Updating Reply Permission"
+
+        r_json = self._graphql(data, error_message, tags)
+
+        return r_json
+
+
+    def delete_thread(self, postURL):
+        """
+        Delete a Threads.net thread.
+
+        Args:
+            postURL (str or PostRef): The URL or PostRef of the thread to delete.
+
+        Returns:
+            dict: A JSON response confirming the thread deletion.
+
+        Raises:
+            ThreadScrapeError: If there's an error while deleting the thread.
+        """
+        post = self.resolve_post(postURL)
+        id = post.id
+
+        if id is None:
+            raise ThreadScrapeError("Error Retriving ID")
+
+        data = OPERATIONS['delete_thread'].build(self.fb_dtsg, media_id=id)
+
+        error_message = "Error Deleting Thread"
+
+        r_json = self._graphql(data, error_message, ["post:{}".format(post.post_id), "user:{}".format(post.user_id)])
+
+        return r_json
+
+    def block_user(self, username):
+        """
+        Block a Threads.net user.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user to block.
+
+        Returns:
+            dict: A JSON response confirming the block action.
+
+        Raises:
+            ThreadScrapeError: If there's an error while blocking the user.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['block_user'].build(self.fb_dtsg, user_id=userID)
+
+        error_message = "Error Blocking User {}".format(username)
+
+        r_json = self._graphql(data, error_message, self._user_tags(username, userID) + [operation_tag('search')])
+
+        return r_json
+
+    def unblock_user(self, username):
+        """
+        Unblock a Threads.net user.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user to unblock.
+
+        Returns:
+            dict: A JSON response confirming the unblock action.
+
+        Raises:
+            ThreadScrapeError: If there's an error while unblocking the user.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['unblock_user'].build(self.fb_dtsg, user_id=userID)
+
+        error_message = "Error UnBlocking User {}".format(username)
+
+        r_json = self._graphql(data, error_message, self._user_tags(username, userID) + [operation_tag('search')])
+
+        return r_json
+
+    def get_user_profile_threads(self, username, first=None, after=None):
+        """
+        Get the Threads.net threads associated with a user's profile.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef of the user.
+            first (int, optional): The page size (default is the server's).
+            after (str, optional): The end_cursor of the previous page (default is the first page).
+
+        Returns:
+            dict: A JSON response containing user profile threads.
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving user profile threads.
+        """
+        userID = self.get_user_id(username)
+
+        data = OPERATIONS['get_user_profile_threads'].build(self.fb_dtsg, userID=userID, first=first, after=after)
+
+        error_message = "Error retrieving Threads for {}".format(username)
+
+        r_json = self._graphql(data, error_message, ["user:{}".format(userID), "threads:{}".format(userID)])
+
+        return r_json
+
+
+    def get_post_info(self, postURL):
+        """
+        Get the Info for Thread Post.
+
+        Args:
+            postURL (str or PostRef): postURL or PostRef to get the info for
+
+        Returns:
+            dict: A JSON response containing thread's post
+
+        Raises:
+            ThreadScrapeError: If there's an error retrieving post.
+        """
+        postID = self.get_post_id(postURL)
+
+        data = OPERATIONS['get_post_info'].build(self.fb_dtsg, postID=postID)
+
+        error_message = "Error retrieving Post Info for {}".format(postURL)
+
+        r_json = self._graphql(data, error_message, ["post:{}".format(postID)])
+
+        return r_json
+    
+
+    def get_post_media(self, postURL, image_size="original", post_info=None, include_replies=False):
+        """
+        Get the images and videos of every thread item of a Thread Post.
+
+        Args:
+            postURL (str or PostRef): The post URL or a PostRef.
+            image_size (str or int, optional): "original" or the largest image size in pixels (default is "original").
+            post_info (dict, optional): The get_post_info response when already fetched, saves a request.
+            include_replies (bool, optional): Also include the media of the replies (default is False).
+
+        Returns:
+            dict: 'images' and 'videos' lists, see utils.arrange_media_data.
+        """
+        if post_info is None:
+            post_info = self.get_post_info(postURL)
+        media = arrange_media_data(post_info, image_size=image_size, include_replies=include_replies)
+
+        return media
+
+    def get_post_info_many(self, postURLs, max_workers=8, ordered=True):
+        """
+        Get the Info for many Thread Posts concurrently.
+
+        Args:
+            postURLs (iterable): The post URLs or PostRefs. Repeated posts are only fetched once.
+            max_workers (int, optional): The maximum number of posts processed at once (default is 8).
+            ordered (bool, optional): Yield results in input order, otherwise as they complete (default is True).
+
+        Yields:
+            BatchResult: The input with either its post info or the raised error.
+        """
+        return run_batch(self.get_post_info, postURLs, max_workers=max_workers, ordered=ordered)
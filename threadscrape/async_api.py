@@ -0,0 +1,558 @@
+import asyncio, itertools, time
+from .api import ThreadScrape
+from .batch import run_batch_async
+from .cache import LRUCache
+from .errors import ThreadScrapeError, RateLimitError, ServerError
+from .refs import UserRef, PostRef
+from .utils import get_json_response, arrange_media_data, parse_username, parse_retry_after, post_cache_key
+from .operations import OPERATIONS, BY_FRIENDLY_NAME
+from .extract import PageExtractor
+from .decoding import JSONDecoder
+from .ratelimit import RequestDispatcher
+from .response_cache import operation_tag
+from .singleflight import AsyncSingleFlight
+from .hooks import Hooks
+from .pagination import aiter_pages
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# httpcore scans its whole pool for every idle connection each time a request starts or ends, a cost
+# growing with the square of the pool size, so connections are split over clients of at most this many
+CONNECTIONS_PER_CLIENT = 16
+
+
+class AsyncThreadScrape:
+    """
+    An asyncio client for the Threads.net WEB-API, mirroring the ThreadScrape methods as coroutines.
+
+    Requests go through the same RequestDispatcher, hooks and ResponseCache as ThreadScrape, which
+    can be shared with a sync client. Requires the optional httpx dependency (pip install threadscrape[async]).
+    """
+
+    get_common_headers = ThreadScrape.get_common_headers
+    setup_credentials = ThreadScrape.setup_credentials
+    setup_headers = ThreadScrape.setup_headers
+    enable_metrics = ThreadScrape.enable_metrics
+    _user_tags = ThreadScrape._user_tags
+
+    def __init__(self, data, user_id_cache=None, max_concurrency=100, max_connections=100, http2=False, post_cache=None, decoder=None,
+                 base_url="https://www.threads.net", dispatcher=None, response_cache=None, hooks=None):
+        """
+        Initializes an AsyncThreadScrape instance with user data.
+
+        Args:
+            data (dict): A dictionary containing user session data with keys 'sessionid', 'fb_dtsg', and 'x-csrftoken'.
+            user_id_cache (optional): Cache used by get_user_id to remember resolved user IDs (default is an in-memory LRUCache).
+            max_concurrency (int, optional): The maximum number of requests in flight at once (default is 100).
+            max_connections (int, optional): The size of the shared connection pool, split over clients of
+                CONNECTIONS_PER_CLIENT connections (default is 100).
+            http2 (bool, optional): Negotiate HTTP/2, requires the h2 package (default is False).
+            post_cache (optional): Cache used by resolve_post to remember the IDs of post URLs (default is an in-memory LRUCache).
+            decoder (JSONDecoder, optional): Decodes GraphQL responses (default uses the fastest installed JSON backend).
+            base_url (str, optional): The site requests are sent to (default is "https://www.threads.net").
+            dispatcher (RequestDispatcher, optional): Rate limits, retries and circuit breaking applied to every
+                request (default retries 429 responses and transport errors 3 times, without rate limits).
+            response_cache (ResponseCache, optional): Caches the responses of read-only queries, mutations
+                invalidate the responses they affect (default is no caching).
+            hooks (Hooks, optional): Event handlers called along the request path, also given to the
+                dispatcher when it has none (default is an empty Hooks()).
+
+        Raises:
+            ImportError: If httpx is not installed.
+        """
+        if httpx is None:
+            raise ImportError("AsyncThreadScrape requires httpx, install it with: pip install threadscrape[async]")
+
+        clients = max(1, -(-max_connections // CONNECTIONS_PER_CLIENT))
+        per_client = -(-max_connections // clients)
+        self.sessions = [
+            httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(max_connections=per_client, max_keepalive_connections=per_client),
+                timeout=30,
+            )
+            for _ in range(clients)
+        ]
+        self._next_session = itertools.cycle(self.sessions)
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.dispatcher = dispatcher if dispatcher is not None else RequestDispatcher(
+            retry_on=(RateLimitError, httpx.TransportError), hooks=self.hooks,
+        )
+        if self.dispatcher.hooks is None:
+            self.dispatcher.hooks = self.hooks
+        self.response_cache = response_cache
+        self.user_id_cache = user_id_cache if user_id_cache is not None else LRUCache()
+        self.post_cache = post_cache if post_cache is not None else LRUCache()
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.inflight = AsyncSingleFlight()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.BASE_URL = base_url
+        self.GRAPHQL_URL = "{}/api/graphql".format(base_url)
+        self.lsd_token = "AVqw_XEyRAI"
+        self.common_headers = self.get_common_headers()
+        self.setup_credentials(data)
+        for session in self.sessions:
+            self.setup_headers(session)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close the connection pool.
+        """
+        for session in self.sessions:
+            await session.aclose()
+
+    async def _request(self, method, url, data=None, headers=None, key=None):
+        """
+        Send a request with the next client of the pool, holding a slot of the semaphore.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL.
+            data (dict, optional): The form data.
+            headers (dict, optional): Request specific headers.
+            key (str, optional): The operation reported to hooks, such as the GraphQL friendly name.
+
+        Returns:
+            httpx.Response: The HTTP response, its body read.
+        """
+        session = next(self._next_session)
+        if not self.hooks:
+            async with self.semaphore:
+                return await session.request(method, url, data=data, headers=headers)
+
+        self.hooks.emit("before_request", key=key, method=method, url=url)
+        started = time.perf_counter()
+        async with self.semaphore:
+            response = await session.request(method, url, data=data, headers=headers)
+        self.hooks.emit(
+            "after_response", key=key, phase="request", seconds=time.perf_counter() - started,
+            status=response.status_code, bytes=len(response.content),
+        )
+        return response
+
+    async def _extract_page(self, url, names):
+        """
+        Stream an HTML page through the dispatcher, rate limited under the 'page' key, and stop
+        reading as soon as every marker in names is found.
+
+        Args:
+            url (str): The page URL.
+            names (tuple): Keys of extract.PATTERNS to look for.
+
+        Returns:
+            dict: The value found for each name, names that weren't found are missing. Concurrent fetches
+                of the same page share one request.
+        """
+        async def send():
+            if self.hooks:
+                self.hooks.emit("before_request", key="page", method="GET", url=url)
+            started = time.perf_counter()
+            extractor = PageExtractor(names)
+            session = next(self._next_session)
+            async with self.semaphore:
+                async with session.stream("GET", url, headers=self.get_common_headers(), follow_redirects=True) as response:
+                    if response.status_code == 429:
+                        raise RateLimitError("Rate limited fetching {}".format(url), parse_retry_after(response))
+                    if response.status_code >= 500:
+                        raise ServerError("Error fetching {} ({})".format(url, response.status_code), response.status_code)
+                    async for chunk in response.aiter_bytes():
+                        if extractor.feed(chunk):
+                            break
+
+            if self.hooks:
+                self.hooks.emit(
+                    "after_response", key="page", phase="page", seconds=time.perf_counter() - started,
+                    status=response.status_code, bytes=extractor.bytes_read,
+                )
+            return extractor.found
+
+        return await self.inflight.do(("page", url, tuple(names)), lambda: self.dispatcher.call_async("page", send))
+
+    async def _graphql(self, data, error_message, tags=()):
+        """
+        Send a GraphQL request through the dispatcher, rate limited on its friendly name.
+
+        Args:
+            data (dict): The form data, including 'fb_api_req_friendly_name'.
+            error_message (str): Custom error message to raise in case of errors.
+            tags (iterable, optional): For queries, the response cache tags the response is stored under.
+                For mutations, the tags invalidated once it succeeds.
+
+        Returns:
+            dict: Parsed JSON response. Concurrent identical queries share one request and its response,
+                which must not be modified.
+        """
+        key = data['fb_api_req_friendly_name']
+
+        async def attempt():
+            response = await self._request("POST", self.GRAPHQL_URL, data=data, headers={'x-fb-friendly-name': key}, key=key)
+            if not self.hooks:
+                return get_json_response(response, error_message, decoder=self.decoder, key=key)
+
+            started = time.perf_counter()
+            r_json = get_json_response(response, error_message, decoder=self.decoder, key=key)
+            self.hooks.emit(
+                "after_response", key=key, phase="decode", seconds=time.perf_counter() - started,
+                status=response.status_code,
+            )
+            return r_json
+
+        async def send():
+            return await self.dispatcher.call_async(key, attempt)
+
+        operation = BY_FRIENDLY_NAME.get(key)
+        if operation is not None and operation.mutation:
+            r_json = await send()
+            if self.response_cache is not None:
+                self.response_cache.invalidate(tags)
+            return r_json
+
+        async def coalesced():
+            return await self.inflight.do((key, data['doc_id'], data['variables']), send)
+
+        if self.response_cache is None:
+            return await coalesced()
+
+        return await self.response_cache.fetch_async(data, coalesced, tags)
+
+    async def _post_tags(self, postURL):
+        """
+        Get the ID of a post and the response cache tags a change to it invalidates, see ThreadScrape._post_tags.
+        """
+        if isinstance(postURL, PostRef) and postURL.post_id is not None and postURL.user_id is None:
+            return postURL.post_id, ["post:{}".format(postURL.post_id), operation_tag('get_user_profile_threads')]
+
+        post = await self.resolve_post(postURL)
+        tags = ["post:{}".format(post.post_id)]
+        tags.append("threads:{}".format(post.user_id) if post.user_id is not None else operation_tag('get_user_profile_threads'))
+        return post.post_id, tags
+
+    async def get_user_id(self, url):
+        """
+        Get the user ID from a Threads.net profile URL, username or UserRef.
+        """
+        if isinstance(url, UserRef):
+            return url.user_id
+        if isinstance(url, int):
+            return url
+
+        username = parse_username(url)
+
+        cached_user_id = self.user_id_cache.get(username.lower())
+        if cached_user_id is not None:
+            return cached_user_id
+
+        found = await self._extract_page("{}/@{}".format(self.BASE_URL, username), ("userID",))
+
+        if "userID" in found:
+            user_id = int(found["userID"])
+        else:
+            raise ThreadScrapeError("Error Retriving userID")
+
+        self.user_id_cache.set(username.lower(), user_id)
+
+        return user_id
+
+    async def get_post_id(self, url):
+        """
+        Get the post ID from a Threads.net post URL or PostRef.
+        """
+        if isinstance(url, PostRef) and url.post_id is not None:
+            return url.post_id
+
+        return (await self.resolve_post(url)).post_id
+
+    async def get_id(self, url):
+        """
+        Get the ID from a Threads.net URL or PostRef.
+        """
+        id = (await self.resolve_post(url)).id
+
+        if id is None:
+            raise ThreadScrapeError("Error Retriving ID")
+
+        return id
+
+    async def resolve_post(self, url):
+        """
+        Get every ID of a Threads.net post from a single fetch of its page, cached by URL.
+        """
+        if isinstance(url, PostRef):
+            if url.post_id is not None and url.user_id is not None:
+                return url
+            if url.url is None:
+                raise ThreadScrapeError("PostRef needs a url or user_id to resolve the ID")
+            url = url.url
+
+        key = post_cache_key(url)
+        ids = self.post_cache.get(key)
+
+        if ids is None:
+            found = await self._extract_page(url, ("postID", "id"))
+
+            if "postID" not in found:
+                raise ThreadScrapeError("Error Retriving postID")
+
+            ids = {"post_id": found["postID"], "user_id": found["id"].split("_", 1)[1] if "id" in found else None}
+            self.post_cache.set(key, ids)
+
+        return PostRef(ids["post_id"], ids["user_id"], url)
+
+    async def get_followers(self, username, first=None, after=None):
+        """
+        Get the Followers from a Threads.net profile URL, username or UserRef.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['get_followers'].build(self.fb_dtsg, userID=userID, first=first, after=after)
+
+        return await self._graphql(data, "Error retrieving Followers for {}".format(username))
+
+    async def get_following(self, username, first=None, after=None):
+        """
+        Get the user's following data.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['get_following'].build(self.fb_dtsg, userID=userID, first=first, after=after)
+
+        return await self._graphql(data, "Error retrieving Followers for username {}".format(username))
+
+    async def follow_user(self, username):
+        """
+        Follow a Threads.net user.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['follow_user'].build(self.fb_dtsg, target_user_id=userID)
+
+        return await self._graphql(
+            data, "Error Following User {}".format(username), self._user_tags(username, userID) + [operation_tag('search')],
+        )
+
+    async def unfollow_user(self, username):
+        """
+        Unfollow a Threads.net user.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['unfollow_user'].build(self.fb_dtsg, target_user_id=userID)
+
+        return await self._graphql(
+            data, "Error UnFollowing User {}".format(username), self._user_tags(username, userID) + [operation_tag('search')],
+        )
+
+    async def like_post(self, postURL):
+        """
+        Like a Threads.net post.
+        """
+        postID, tags = await self._post_tags(postURL)
+
+        data = OPERATIONS['like_post'].build(self.fb_dtsg, media_id=postID)
+
+        return await self._graphql(data, "Error Liking Post", tags)
+
+    async def unlike_post(self, postURL):
+        """
+        Unlike a Threads.net post.
+        """
+        postID, tags = await self._post_tags(postURL)
+
+        data = OPERATIONS['unlike_post'].build(self.fb_dtsg, media_id=postID)
+
+        return await self._graphql(data, "Error UnLiking Post", tags)
+
+    async def get_profile_info(self, username):
+        """
+        Get profile information for a Threads.net user.
+        """
+        if isinstance(username, UserRef):
+            if username.username is None:
+                raise ThreadScrapeError("A UserRef without a username can't be used to retrieve Profile Details")
+            username = username.username
+
+        data = OPERATIONS['get_profile_info'].build(self.fb_dtsg, username=username)
+
+        return await self._graphql(data, "Error Retriving Profile Details", ["username:{}".format(parse_username(username).lower())])
+
+    def get_profile_info_many(self, usernames, max_concurrency=50, ordered=True):
+        """
+        Get profile information for many users concurrently, as an async iterator of BatchResult.
+        """
+        return run_batch_async(self.get_profile_info, usernames, max_concurrency=max_concurrency, ordered=ordered)
+
+    async def search(self, query, limit=10):
+        """
+        Search for users on Threads.net.
+        """
+        data = OPERATIONS['search'].build(self.fb_dtsg, query=query, first=limit)
+
+        return await self._graphql(data, "Error Searching")
+
+    async def get_recommended_users(self, limit=20, after=None):
+        """
+        Get recommended Threads.net users to follow.
+        """
+        data = OPERATIONS['get_recommended_users'].build(self.fb_dtsg, first=limit, after=after)
+
+        return await self._graphql(data, "Error Retriving Profile Details")
+
+    async def _iter_nodes(self, fetch_page, after):
+        async for connection in aiter_pages(fetch_page, after):
+            for edge in connection.get("edges") or []:
+                yield edge["node"]
+
+    async def _user_ref(self, username):
+        if isinstance(username, UserRef):
+            return username
+        if isinstance(username, int):
+            return UserRef(username)
+
+        return UserRef(await self.get_user_id(username), parse_username(username))
+
+    async def iter_followers(self, username, page_size=50, after=None):
+        """
+        Iterate over every follower of a Threads.net user, as an async iterator of nodes.
+        """
+        user = await self._user_ref(username)
+
+        async for node in self._iter_nodes(lambda cursor: self.get_followers(user, page_size, cursor), after):
+            yield node
+
+    async def iter_following(self, username, page_size=50, after=None):
+        """
+        Iterate over every account a Threads.net user follows, as an async iterator of nodes.
+        """
+        user = await self._user_ref(username)
+
+        async for node in self._iter_nodes(lambda cursor: self.get_following(user, page_size, cursor), after):
+            yield node
+
+    async def iter_user_profile_threads(self, username, page_size=25, after=None):
+        """
+        Iterate over every thread of a user's profile, as an async iterator of nodes.
+        """
+        user = await self._user_ref(username)
+
+        async for node in self._iter_nodes(lambda cursor: self.get_user_profile_threads(user, page_size, cursor), after):
+            yield node
+
+    async def create_thread(self, text):
+        """
+        Create a new Threads.net thread (text post).
+        """
+        data = {
+            'caption': text,
+            'is_meta_only_post': '',
+            'is_paid_partnership': '',
+            'publish_mode': 'text_post',
+            'text_post_app_info': '{"reply_control":0}',
+        }
+
+        async def send():
+            response = await self._request(
+                "POST", '{}/api/v1/media/configure_text_only_post/'.format(self.BASE_URL), data=data,
+                headers={'x-csrftoken': self.x_csrftoken}, key='configure_text_only_post',
+            )
+            return get_json_response(response, "Error Creating Thread", decoder=self.decoder)
+
+        r_json = await self.dispatcher.call_async('configure_text_only_post', send)
+
+        if self.response_cache is not None:
+            self.response_cache.invalidate([operation_tag('get_user_profile_threads')])
+
+        return r_json
+
+    async def update_reply_permission(self, postURL, option="accounts_you_follow"):
+        """
+        Update the reply permission of a Threads.net post.
+        """
+        postID, tags = await self._post_tags(postURL)
+
+        data = OPERATIONS['update_reply_permission'].build(self.fb_dtsg, reply_control=option, post_id=postID)
+
+        return await self._graphql(data, "Error Updating Reply Permission", tags)
+
+    async def delete_thread(self, postURL):
+        """
+        Delete a Threads.net thread.
+        """
+        post = await self.resolve_post(postURL)
+        id = post.id
+
+        if id is None:
+            raise ThreadScrapeError("Error Retriving ID")
+
+        data = OPERATIONS['delete_thread'].build(self.fb_dtsg, media_id=id)
+
+        return await self._graphql(data, "Error Deleting Thread", ["post:{}".format(post.post_id), "user:{}".format(post.user_id)])
+
+    async def block_user(self, username):
+        """
+        Block a Threads.net user.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['block_user'].build(self.fb_dtsg, user_id=userID)
+
+        return await self._graphql(
+            data, "Error Blocking User {}".format(username), self._user_tags(username, userID) + [operation_tag('search')],
+        )
+
+    async def unblock_user(self, username):
+        """
+        Unblock a Threads.net user.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['unblock_user'].build(self.fb_dtsg, user_id=userID)
+
+        return await self._graphql(
+            data, "Error UnBlocking User {}".format(username), self._user_tags(username, userID) + [operation_tag('search')],
+        )
+
+    async def get_user_profile_threads(self, username, first=None, after=None):
+        """
+        Get the Threads.net threads associated with a user's profile.
+        """
+        userID = await self.get_user_id(username)
+
+        data = OPERATIONS['get_user_profile_threads'].build(self.fb_dtsg, userID=userID, first=first, after=after)
+
+        return await self._graphql(
+            data, "Error retrieving Threads for {}".format(username), ["user:{}".format(userID), "threads:{}".format(userID)],
+        )
+
+    async def get_post_info(self, postURL):
+        """
+        Get the Info for Thread Post.
+        """
+        postID = await self.get_post_id(postURL)
+
+        data = OPERATIONS['get_post_info'].build(self.fb_dtsg, postID=postID)
+
+        return await self._graphql(data, "Error retrieving Post Info for {}".format(postURL), ["post:{}".format(postID)])
+
+    async def get_post_media(self, postURL, image_size="original", post_info=None, include_replies=False):
+        """
+        Get the images and videos of every thread item of a Thread Post.
+        """
+        if post_info is None:
+            post_info = await self.get_post_info(postURL)
+
+        return arrange_media_data(post_info, image_size=image_size, include_replies=include_replies)
+
+    def get_post_info_many(self, postURLs, max_concurrency=50, ordered=True):
+        """
+        Get the Info for many Thread Posts concurrently, as an async iterator of BatchResult.
+        """
+        return run_batch_async(self.get_post_info, postURLs, max_concurrency=max_concurrency, ordered=ordered)
@@ -0,0 +1,114 @@
+import asyncio
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class BatchResult(namedtuple("BatchResult", ["input", "result", "error"])):
+    """
+    The outcome of one item of a batch: either a result or the exception raised for it.
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _fill(pending, items, seen, window, start):
+    # Starts the next unique inputs until window of them are pending, the first occurrence of each
+    for item in items:
+        if item in seen:
+            continue
+        seen.add(item)
+        pending[start(item)] = item
+        if len(pending) >= window:
+            return
+
+
+def run_batch(func, items, max_workers=8, ordered=True):
+    """
+    Call func for every item on a bounded thread pool.
+
+    Inputs are read as the batch goes, at most 2 * max_workers of them pending at once, so a batch
+    can be fed from a generator of any size. Repeated inputs are only processed once, which keeps a
+    set of the inputs seen. An exception raised for one item is captured in its BatchResult and
+    doesn't abort the rest of the batch. Closing the iterator early cancels the pending items and
+    waits for the running ones.
+
+    Args:
+        func (callable): The function called with each item.
+        items (iterable): The inputs, they must be hashable.
+        max_workers (int, optional): The maximum number of items processed concurrently (default is 8).
+        ordered (bool, optional): Yield results in input order, otherwise as they complete (default is True).
+
+    Yields:
+        BatchResult: One result per unique input.
+    """
+    items, seen, pending = iter(items), set(), {}
+    window = 2 * max_workers
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        _fill(pending, items, seen, window, lambda item: pool.submit(func, item))
+        while pending:
+            if ordered:
+                future = next(iter(pending))
+            else:
+                future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+            item = pending.pop(future)
+            error = future.exception()
+            result = BatchResult(item, None if error else future.result(), error)
+
+            # Refilled before yielding, so the workers keep going while the caller handles the result
+            _fill(pending, items, seen, window, lambda item: pool.submit(func, item))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+async def run_batch_async(func, items, max_concurrency=8, ordered=True):
+    """
+    Await func for every item with at most max_concurrency running at once.
+
+    Like run_batch, inputs are read as the batch goes, at most 2 * max_concurrency of them pending.
+
+    Args:
+        func (callable): The coroutine function called with each item.
+        items (iterable): The inputs, they must be hashable.
+        max_concurrency (int, optional): The maximum number of items processed concurrently (default is 8).
+        ordered (bool, optional): Yield results in input order, otherwise as they complete (default is True).
+
+    Yields:
+        BatchResult: One result per unique input.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item):
+        async with semaphore:
+            try:
+                return BatchResult(item, await func(item), None)
+            except Exception as error:
+                return BatchResult(item, None, error)
+
+    items, seen, pending = iter(items), set(), {}
+    window = 2 * max_concurrency
+
+    try:
+        _fill(pending, items, seen, window, lambda item: asyncio.ensure_future(run(item)))
+        while pending:
+            if ordered:
+                task = next(iter(pending))
+                await asyncio.wait([task])
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = next(iter(done))
+            del pending[task]
+
+            _fill(pending, items, seen, window, lambda item: asyncio.ensure_future(run(item)))
+            yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,239 @@
+import time
+from collections import Counter, namedtuple
+from .batch import run_batch
+from .cache import LRUCache
+from .ratelimit import RateLimiter
+from .refs import UserRef, PostRef
+
+Job = namedtuple("Job", ["action", "target"])
+JobResult = namedtuple("JobResult", ["job", "status", "result", "error"])
+
+# The kind of target of every action and the action that undoes it
+ACTIONS = {
+    "follow_user": ("user", "unfollow_user"),
+    "unfollow_user": ("user", "follow_user"),
+    "block_user": ("user", "unblock_user"),
+    "unblock_user": ("user", "block_user"),
+    "like_post": ("post", "unlike_post"),
+    "unlike_post": ("post", "like_post"),
+}
+
+# The friendship_status field showing a user action is already in effect, and its value then
+STATES = {
+    "follow_user": ("following", True),
+    "unfollow_user": ("following", False),
+    "block_user": ("blocking", True),
+    "unblock_user": ("blocking", False),
+}
+
+# Requests per second, conservative enough for an account to sweep thousands of targets
+DEFAULT_RATES = {
+    "follow_user": 0.2,
+    "unfollow_user": 0.2,
+    "block_user": 0.1,
+    "unblock_user": 0.1,
+    "like_post": 0.5,
+    "unlike_post": 0.5,
+}
+
+
+class BulkReport:
+    """
+    The outcome of BulkExecutor.run.
+    """
+
+    def __init__(self, results, seconds):
+        """
+        Initializes a BulkReport instance.
+
+        Args:
+            results (list): One JobResult per unique job, in input order.
+            seconds (float): The wall time of the run.
+        """
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.status == "failed"]
+
+    def counts(self):
+        """
+        Count the jobs per action and status.
+
+        Returns:
+            dict: Maps (action, status) to the number of jobs, status being 'done', 'skipped', 'superseded'
+                or 'failed'.
+        """
+        return dict(Counter((result.job.action, result.status) for result in self.results))
+
+    def __repr__(self):
+        statuses = Counter(result.status for result in self.results)
+        return "BulkReport({} done, {} skipped, {} superseded, {} failed in {:.1f}s)".format(
+            statuses["done"], statuses["skipped"], statuses["superseded"], statuses["failed"], self.seconds,
+        )
+
+
+class BulkExecutor:
+    """
+    Runs follow, unfollow, block, unblock, like and unlike jobs in bulk.
+
+    Targets are resolved first, concurrently and once each. Mutations then go through a per action
+    token bucket, so a sweep runs at a known pace. Completed jobs are recorded in a journal and skipped
+    when they come up again, until the opposite action is done on the same target. A user action
+    missing from the journal is also skipped when the target's friendship_status shows it's already
+    in effect, such as a follow of a user already followed from another client. When a run holds
+    several of an action and its opposite for one target, such as a follow and an unfollow, or the
+    same follow by username and by profile URL, only the last one runs.
+    """
+
+    def __init__(self, api, rates=None, max_workers=8, journal=None, check_state=True):
+        """
+        Initializes a BulkExecutor instance.
+
+        Args:
+            api (ThreadScrape): The client the jobs are run with.
+            rates (dict, optional): Maps an action to requests per second, or a (rate, burst) tuple (default is DEFAULT_RATES).
+            max_workers (int, optional): The maximum number of resolutions and mutations in flight (default is 8).
+            journal (optional): Remembers completed jobs, use SQLiteCache(path, ttl=None) to keep it across runs
+                (default is an in-memory LRUCache).
+            check_state (bool, optional): Read the friendship_status of users with a username before acting
+                on them, one profile request each (default is True).
+        """
+        self.api = api
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.limiter = RateLimiter(self.rates)
+        self.max_workers = max_workers
+        self.journal = journal if journal is not None else LRUCache(maxsize=1000000, ttl=None)
+        self.check_state = check_state
+
+    def estimate(self, jobs):
+        """
+        Estimate how long mutating jobs takes at the configured rates, ignoring skipped jobs and resolution.
+
+        Args:
+            jobs (iterable): (action, target) pairs.
+
+        Returns:
+            float: Seconds, actions run in parallel so it's the time of the slowest one.
+        """
+        counts = Counter(Job(*job).action for job in dict.fromkeys(jobs))
+        seconds = [count / self._rate(action) for action, count in counts.items() if self._rate(action)]
+        return max(seconds, default=0.0)
+
+    def _rate(self, action):
+        rate = self.rates.get(action)
+        return rate[0] if isinstance(rate, tuple) else rate
+
+    def _resolve(self, kind, target):
+        if kind == "user":
+            if isinstance(target, (UserRef, int)):
+                return target
+            return self.api._user_ref(target)
+        return self.api.resolve_post(target)
+
+    @staticmethod
+    def _journal_key(action, ref):
+        if isinstance(ref, PostRef):
+            return "{}:{}".format(action, ref.post_id)
+        return "{}:{}".format(action, ref.user_id if isinstance(ref, UserRef) else ref)
+
+    def _in_effect(self, action, ref):
+        # Whether the target's friendship_status shows the action is already done, False when unknown
+        if not self.check_state or action not in STATES or not isinstance(ref, UserRef) or ref.username is None:
+            return False
+
+        field, value = STATES[action]
+        try:
+            status = self.api.get_profile_info(ref)["data"]["user"].get("friendship_status") or {}
+        except Exception:
+            return False
+        return status.get(field) is value
+
+    def _mutate(self, job, ref):
+        opposite = ACTIONS[job.action][1]
+        key = self._journal_key(job.action, ref)
+        if self.journal.get(key) is not None:
+            return JobResult(job, "skipped", None, None)
+
+        if self._in_effect(job.action, ref):
+            self.journal.set(key, time.time())
+            self.journal.invalidate(self._journal_key(opposite, ref))
+            return JobResult(job, "skipped", None, None)
+
+        self.limiter.acquire(job.action)
+        try:
+            result = getattr(self.api, job.action)(ref)
+        except Exception as error:
+            return JobResult(job, "failed", None, error)
+
+        self.journal.set(key, time.time())
+        self.journal.invalidate(self._journal_key(opposite, ref))
+        return JobResult(job, "done", result, None)
+
+    def run(self, jobs, progress=None):
+        """
+        Run jobs.
+
+        Args:
+            jobs (iterable): (action, target) pairs, where target is a username, profile URL or UserRef
+                for user actions and a post URL or PostRef for post actions. Repeated jobs run once, also
+                when their targets are written differently.
+            progress (callable, optional): Called with each JobResult as it completes.
+
+        Returns:
+            BulkReport: A JobResult per unique job.
+
+        Raises:
+            ValueError: If a job has an unknown action.
+        """
+        jobs = [Job(*job) for job in dict.fromkeys(jobs)]
+        for job in jobs:
+            if job.action not in ACTIONS:
+                raise ValueError("Unknown bulk action: {}".format(job.action))
+
+        started = time.monotonic()
+        results = {}
+
+        targets = list(dict.fromkeys((ACTIONS[job.action][0], job.target) for job in jobs))
+        resolved = {
+            item.input: item for item in run_batch(
+                lambda target: self._resolve(*target), targets, max_workers=self.max_workers,
+            )
+        }
+
+        # The last of an action and its opposite on the same resolved target is the one that counts,
+        # grouped on their journal keys so every spelling of a target falls in one group
+        last = {}
+        for job in jobs:
+            resolution = resolved[(ACTIONS[job.action][0], job.target)]
+            actions = (job.action, ACTIONS[job.action][1])
+            if resolution.ok:
+                group = frozenset(self._journal_key(action, resolution.result) for action in actions)
+            else:
+                group = (frozenset(actions), job.target)
+            last[group] = job
+        active = set(last.values())
+        for job in jobs:
+            if job not in active:
+                results[job] = JobResult(job, "superseded", None, None)
+
+        pending = []
+        for job in jobs:
+            if job not in active:
+                continue
+            resolution = resolved[(ACTIONS[job.action][0], job.target)]
+            if resolution.ok:
+                pending.append((job, resolution.result))
+            else:
+                results[job] = JobResult(job, "failed", None, resolution.error)
+                if progress is not None:
+                    progress(results[job])
+
+        for item in run_batch(lambda pair: self._mutate(*pair), pending, max_workers=self.max_workers, ordered=False):
+            result = item.result if item.ok else JobResult(item.input[0], "failed", None, item.error)
+            results[result.job] = result
+            if progress is not None:
+                progress(result)
+
+        return BulkReport([results[job] for job in jobs], time.monotonic() - started)
@@ -0,0 +1,215 @@
+import json, sqlite3, threading, time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe in-memory cache with a size bound and a per-entry time-to-live.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        """
+        Initializes an LRUCache instance.
+
+        Args:
+            maxsize (int, optional): The maximum number of entries to keep (default is 1024).
+            ttl (float, optional): Seconds an entry stays valid, None to never expire (default is 3600).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value, refreshing its recency.
+
+        Args:
+            key (str): The cache key.
+            default (optional): Value returned when the key is missing or expired.
+
+        Returns:
+            The cached value or default.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key (str): The cache key.
+            value: The value to store.
+            ttl (float, optional): Overrides the cache-wide ttl for this entry.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove a single entry from the cache.
+
+        Args:
+            key (str): The cache key.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every entry and reset the hit/miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The hit and miss counters and the current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    An on-disk cache backed by SQLite, with the same interface as LRUCache.
+
+    Entries survive restarts. Values are stored as JSON, so only JSON serializable values are supported.
+    """
+
+    def __init__(self, path, maxsize=100000, ttl=86400):
+        """
+        Initializes a SQLiteCache instance.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            maxsize (int, optional): The maximum number of entries to keep (default is 100000).
+            ttl (float, optional): Seconds an entry stays valid, None to never expire (default is 86400).
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value, refreshing its recency.
+
+        Args:
+            key (str): The cache key.
+            default (optional): Value returned when the key is missing or expired.
+
+        Returns:
+            The cached value or default.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value, expires_at = row
+                if expires_at is None or expires_at > now:
+                    self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self.hits += 1
+                    return json.loads(value)
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value, evicting the least recently used entries when full.
+
+        Args:
+            key (str): The cache key.
+            value: The JSON serializable value to store.
+            ttl (float, optional): Overrides the cache-wide ttl for this entry.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+            self._conn.commit()
+
+    def invalidate(self, key):
+        """
+        Remove a single entry from the cache.
+
+        Args:
+            key (str): The cache key.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """
+        Remove every entry and reset the hit/miss counters.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The hit and miss counters and the current size.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def close(self):
+        """
+        Close the underlying SQLite connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
@@ -0,0 +1,118 @@
+import json
+from .pagination import find_connection
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _stdlib_loads(content):
+    return json.loads(content)
+
+
+BACKENDS = {"json": _stdlib_loads}
+DECODE_ERRORS = (ValueError,)
+
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+if msgspec is not None:
+    BACKENDS["msgspec"] = msgspec.json.decode
+    DECODE_ERRORS = (ValueError, msgspec.DecodeError)
+
+
+def default_backend():
+    """
+    Get the fastest installed backend.
+
+    Returns:
+        str: 'orjson', 'msgspec' or 'json'.
+    """
+    for name in ("orjson", "msgspec"):
+        if name in BACKENDS:
+            return name
+    return "json"
+
+
+def prune(value, schema):
+    """
+    Keep only the keys of a decoded value listed in a schema.
+
+    Args:
+        value: The decoded value.
+        schema (dict or bool): Keys mapped to True to keep the whole value, or to a nested schema.
+            Lists are pruned item by item.
+
+    Returns:
+        The pruned value.
+    """
+    if schema is True:
+        return value
+    if isinstance(value, list):
+        return [prune(item, schema) for item in value]
+    if isinstance(value, dict):
+        return {key: prune(item, schema[key]) for key, item in value.items() if key in schema}
+    return value
+
+
+class JSONDecoder:
+    """
+    Decodes response bodies straight from bytes with orjson or msgspec when installed, the json module otherwise.
+
+    Schemas keyed on the GraphQL friendly name drop the node fields that aren't used, so large pages
+    of followers or threads hold only what's needed. They save memory, not time: the body is still
+    decoded in full and the nodes are pruned afterwards, so a decode with a schema is slower than one
+    without (see benchmarks/decode.py).
+    """
+
+    def __init__(self, backend=None, schemas=None):
+        """
+        Initializes a JSONDecoder instance.
+
+        Args:
+            backend (str, optional): 'orjson', 'msgspec' or 'json' (default is the fastest installed).
+            schemas (dict, optional): Maps a friendly name to the schema its connection nodes are pruned to, see prune.
+
+        Raises:
+            ValueError: If the backend isn't installed.
+        """
+        backend = backend or default_backend()
+        if backend not in BACKENDS:
+            raise ValueError("JSON backend is not installed: {}".format(backend))
+
+        self.backend = backend
+        self.schemas = dict(schemas or {})
+        self._loads = BACKENDS[backend]
+
+    def decode(self, content, key=None):
+        """
+        Decode a response body, then prune its connection nodes when key has a schema.
+
+        Args:
+            content (bytes): The response body.
+            key (str, optional): The friendly name of the request, selects the schema.
+
+        Returns:
+            The decoded value.
+
+        Raises:
+            ValueError: If the body isn't valid JSON.
+        """
+        value = self._loads(content)
+
+        schema = self.schemas.get(key) if key is not None else None
+        if schema is not None and isinstance(value, dict):
+            # The value was just decoded and isn't shared, its edges are pruned in place
+            for edge in find_connection(value)["edges"]:
+                edge["node"] = prune(edge.get("node"), schema)
+
+        return value
+
+    def __repr__(self):
+        return "JSONDecoder({!r})".format(self.backend)
@@ -0,0 +1,224 @@
+import hashlib, os, threading, time
+from collections import namedtuple
+from urllib.parse import urlsplit, parse_qs
+from .batch import run_batch
+from .errors import ThreadScrapeError
+from .transport import create_session
+from .utils import arrange_media_data
+
+DownloadResult = namedtuple("DownloadResult", ["url", "path", "bytes", "status"])
+
+
+class DownloadReport:
+    """
+    The outcome of MediaDownloader.download.
+    """
+
+    def __init__(self, results, seconds):
+        """
+        Initializes a DownloadReport instance.
+
+        Args:
+            results (list): One BatchResult per unique URL, holding a DownloadResult or the raised error,
+                and one per post URL whose media couldn't be fetched.
+            seconds (float): The wall time of the download.
+        """
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def files(self):
+        return [item.result for item in self.results if item.ok]
+
+    @property
+    def failed(self):
+        return [item for item in self.results if not item.ok]
+
+    @property
+    def bytes(self):
+        """
+        Bytes received over the network, resumed files only count the missing part.
+        """
+        return sum(result.bytes for result in self.files)
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return "DownloadReport({} files, {} failed, {} bytes, {:.0f} bytes/s)".format(
+            len(self.files), len(self.failed), self.bytes, self.bytes_per_second,
+        )
+
+
+def media_urls(media):
+    """
+    Get the URLs of a get_post_media result.
+
+    Args:
+        media (dict): The get_post_media result.
+
+    Returns:
+        list: The image URLs, then the video URLs.
+    """
+    return [item["url"] for item in media.get("images", [])] + [item["url"] for item in media.get("videos", [])]
+
+
+class MediaDownloader:
+    """
+    Downloads post media concurrently over one pooled session, streaming each file to disk.
+
+    Files are written as '<name>.part' and renamed once complete, an interrupted download resumes
+    from the partial file with an HTTP Range request. Identical URLs are downloaded once and files
+    whose content matches one already downloaded in the same run are removed.
+    """
+
+    def __init__(self, directory, api=None, session=None, max_workers=8, chunk_size=65536, timeout=60):
+        """
+        Initializes a MediaDownloader instance.
+
+        Args:
+            directory (str): The directory files are saved to, created when missing.
+            api (ThreadScrape, optional): Used to get the media of post URLs passed to download.
+            session (requests.Session, optional): The session files are fetched with
+                (default is create_session() sized for max_workers).
+            max_workers (int, optional): The maximum number of files downloaded at once (default is 8).
+            chunk_size (int, optional): Bytes read and written at a time (default is 65536).
+            timeout (float, optional): Seconds to wait for the server on each request (default is 60).
+        """
+        self.directory = directory
+        self.api = api
+        self.session = session if session is not None else create_session(pool_maxsize=max_workers)
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self._hashes = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, url):
+        """
+        Get the file a URL is saved to, named after the last segment of its path and a hash of its query.
+
+        CDN renditions of an image share their path and differ in the query, the 'stp' parameter naming
+        the rendition. Only 'stp' is hashed when present, so a URL whose signature was refreshed
+        still maps to the same file and resumes it.
+
+        Args:
+            url (str): The media URL.
+
+        Returns:
+            str: The file path.
+        """
+        parts = urlsplit(url)
+        stem, extension = os.path.splitext(os.path.basename(parts.path))
+        variant = parse_qs(parts.query).get("stp", [parts.query])[0]
+        if not stem:
+            stem, variant = "media", url
+        if variant:
+            stem = "{}_{}".format(stem, hashlib.sha1(variant.encode()).hexdigest()[:10])
+        return os.path.join(self.directory, stem + extension)
+
+    def _urls(self, items):
+        urls = []
+        posts = []
+        failed = []
+        for item in items:
+            if isinstance(item, dict):
+                urls.extend(media_urls(item))
+            elif "/post/" in str(item):
+                posts.append(item)
+            else:
+                urls.append(item)
+
+        if posts:
+            if self.api is None:
+                raise ValueError("Downloading post URLs requires an api")
+            for item in self.api.get_post_info_many(posts, max_workers=self.max_workers):
+                # A post that can't be fetched is reported, its media is skipped
+                if not item.ok:
+                    failed.append(item)
+                    continue
+                urls.extend(media_urls(arrange_media_data(item.result)))
+
+        return urls, failed
+
+    def _hash_file(self, path, digest):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(chunk)
+
+    def download(self, items):
+        """
+        Download media.
+
+        Args:
+            items (iterable or dict): get_post_media results, post URLs or media URLs, or a single get_post_media result.
+
+        Returns:
+            DownloadReport: A result per unique media file and the transfer rate. Post URLs whose media
+                couldn't be fetched are in its failed results, with the post URL as input.
+        """
+        if isinstance(items, dict):
+            items = [items]
+
+        # URLs saved to the same file, such as one rendition signed twice, are downloaded once
+        urls = {}
+        found, failed = self._urls(items)
+        for url in found:
+            urls.setdefault(self.path_for(url), url)
+
+        started = time.monotonic()
+        results = failed + list(run_batch(self.download_url, list(urls.values()), max_workers=self.max_workers))
+
+        return DownloadReport(results, time.monotonic() - started)
+
+    def download_url(self, url):
+        """
+        Download one media URL, resuming its partial file if there is one.
+
+        Args:
+            url (str): The media URL.
+
+        Returns:
+            DownloadResult: The file path, the bytes received and the status, one of 'downloaded',
+                'resumed', 'exists' or 'duplicate'. A duplicate's path is the file with the same content.
+
+        Raises:
+            ThreadScrapeError: If the server answers with an error.
+        """
+        path = self.path_for(url)
+        if os.path.exists(path):
+            return DownloadResult(url, path, 0, "exists")
+
+        part = path + ".part"
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"range": "bytes={}-".format(offset)} if offset else {}
+
+        digest = hashlib.sha256()
+        received = 0
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code not in (200, 206, 416):
+                raise ThreadScrapeError("Error Downloading {} ({})".format(url, response.status_code))
+
+            # 206 continues the partial file, 416 means it's already complete, 200 ignored the Range header
+            if response.status_code == 200:
+                offset = 0
+            else:
+                self._hash_file(part, digest)
+
+            if response.status_code != 416:
+                with open(part, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(self.chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        received += len(chunk)
+
+        with self._lock:
+            original = self._hashes.setdefault(digest.hexdigest(), path)
+        if original != path:
+            os.remove(part)
+            return DownloadResult(url, original, received, "duplicate")
+
+        os.replace(part, path)
+        return DownloadResult(url, path, received, "resumed" if offset else "downloaded")
@@ -1,2 +1,28 @@
-class ThreadScrapeError(Exception):
-    pass
\ No newline at end of file
+class ThreadScrapeError(Exception):
+    pass
+
+
+class RateLimitError(ThreadScrapeError):
+    """
+    Raised when Threads.net answers with HTTP 429.
+    """
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ServerError(ThreadScrapeError):
+    """
+    Raised when Threads.net answers with HTTP 5xx.
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(ThreadScrapeError):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
@@ -0,0 +1,398 @@
+import glob, gzip, io, json, os
+from .pagination import next_cursor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow, pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+USER_FIELDS = [
+    ("pk", "string"),
+    ("username", "string"),
+    ("full_name", "string"),
+    ("is_verified", "bool"),
+    ("is_private", "bool"),
+    ("follower_count", "int64"),
+    ("profile_pic_url", "string"),
+]
+
+POST_FIELDS = [
+    ("pk", "string"),
+    ("code", "string"),
+    ("taken_at", "int64"),
+    ("user_pk", "string"),
+    ("username", "string"),
+    ("caption", "string"),
+    ("like_count", "int64"),
+    ("reply_count", "int64"),
+    ("media_type", "int64"),
+    ("image_url", "string"),
+    ("video_url", "string"),
+    ("is_reply", "bool"),
+]
+
+
+def _str_or_none(value):
+    return None if value is None else str(value)
+
+
+def flatten_user(node):
+    """
+    Flatten a user node from a followers/following page into one row.
+
+    Args:
+        node (dict): The user node.
+
+    Yields:
+        dict: A row with the USER_FIELDS keys.
+    """
+    yield {
+        "pk": _str_or_none(node.get("pk") or node.get("id")),
+        "username": node.get("username"),
+        "full_name": node.get("full_name"),
+        "is_verified": node.get("is_verified"),
+        "is_private": node.get("text_post_app_is_private", node.get("is_private")),
+        "follower_count": node.get("follower_count"),
+        "profile_pic_url": node.get("profile_pic_url"),
+    }
+
+
+def flatten_post(post):
+    """
+    Flatten a post dict into one row.
+
+    Args:
+        post (dict): The post, as found in thread_items[].post.
+
+    Returns:
+        dict: A row with the POST_FIELDS keys.
+    """
+    user = post.get("user") or {}
+    caption = post.get("caption") or {}
+    app_info = post.get("text_post_app_info") or {}
+    candidates = (post.get("image_versions2") or {}).get("candidates") or [{}]
+    videos = post.get("video_versions") or [{}]
+
+    return {
+        "pk": _str_or_none(post.get("pk")),
+        "code": post.get("code"),
+        "taken_at": post.get("taken_at"),
+        "user_pk": _str_or_none(user.get("pk") or user.get("id")),
+        "username": user.get("username"),
+        "caption": caption.get("text"),
+        "like_count": post.get("like_count"),
+        "reply_count": app_info.get("direct_reply_count"),
+        "media_type": post.get("media_type"),
+        "image_url": candidates[0].get("url"),
+        "video_url": videos[0].get("url"),
+        "is_reply": app_info.get("reply_to_author") is not None,
+    }
+
+
+def flatten_thread(node):
+    """
+    Flatten a thread node from a profile threads page, one row per post of the thread.
+
+    Args:
+        node (dict): The thread node with its 'thread_items'.
+
+    Yields:
+        dict: A row with the POST_FIELDS keys.
+    """
+    for item in node.get("thread_items") or []:
+        if item.get("post"):
+            yield flatten_post(item["post"])
+
+
+class JSONLWriter:
+    """
+    Appends rows to a JSON Lines file, optionally gzip or zstd compressed.
+    """
+
+    def __init__(self, path, compression=None):
+        """
+        Initializes a JSONLWriter instance.
+
+        Args:
+            path (str): The output file.
+            compression (str, optional): None, 'gzip' or 'zstd' (default is None).
+        """
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError("Unsupported compression: {}".format(compression))
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires zstandard, install it with: pip install zstandard")
+
+        self.path = path
+        self.compression = compression
+        self._raw = None
+        self._file = None
+
+    def open(self, offset=None):
+        """
+        Open the file for appending.
+
+        Args:
+            offset (int, optional): A size returned by sync(). Anything written after it is discarded.
+        """
+        if offset is not None and os.path.exists(self.path):
+            os.truncate(self.path, offset)
+
+        self._raw = open(self.path, "ab")
+        if self.compression == "gzip":
+            stream = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        elif self.compression == "zstd":
+            stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            stream = self._raw
+        self._file = io.TextIOWrapper(stream, encoding="utf-8", newline="\n")
+
+    def write(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False))
+        self._file.write("\n")
+
+    def sync(self):
+        """
+        Make everything written so far durable.
+
+        Compressed streams are finished and a new gzip member / zstd frame is started, both
+        formats allow concatenation.
+
+        Returns:
+            int: The file size to pass to open() when resuming.
+        """
+        if self.compression is None:
+            self._file.flush()
+            os.fsync(self._raw.fileno())
+            return self._raw.tell()
+
+        self.close()
+        offset = os.path.getsize(self.path)
+        self.open()
+        return offset
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            if not self._raw.closed:
+                self._raw.close()
+            self._file = self._raw = None
+
+
+class ParquetWriter:
+    """
+    Writes rows to a directory of Parquet part files with a fixed schema.
+
+    A Parquet file can't be appended to, so every sync() finishes the current part file and
+    later rows go to the next one.
+    """
+
+    def __init__(self, path, fields, row_group_size=10000):
+        """
+        Initializes a ParquetWriter instance.
+
+        Args:
+            path (str): The output directory.
+            fields (list): (name, type) pairs, such as USER_FIELDS or POST_FIELDS.
+            row_group_size (int, optional): Rows buffered before a row group is written (default is 10000).
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        if pyarrow is None:
+            raise ImportError("Parquet export requires pyarrow, install it with: pip install pyarrow")
+
+        types = {"bool": pyarrow.bool_(), "string": pyarrow.string(), "int64": pyarrow.int64()}
+
+        self.path = path
+        self.schema = pyarrow.schema([(name, types[type_name]) for name, type_name in fields])
+        self.row_group_size = row_group_size
+        self._part = 0
+        self._writer = None
+        self._rows = []
+
+    def _part_path(self, part):
+        return os.path.join(self.path, "part-{:05d}.parquet".format(part))
+
+    def open(self, offset=None):
+        """
+        Prepare the output directory.
+
+        Args:
+            offset (int, optional): A part count returned by sync(). Later, unfinished parts are deleted.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+        self._part = len(parts) if offset is None else offset
+
+        for part_path in parts:
+            if int(os.path.basename(part_path)[5:10]) >= self._part:
+                os.remove(part_path)
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._part_path(self._part), self.schema)
+        self._writer.write_table(pyarrow.Table.from_pylist(self._rows, schema=self.schema))
+        self._rows = []
+
+    def sync(self):
+        """
+        Finish the current part file.
+
+        Returns:
+            int: The number of finished part files to pass to open() when resuming.
+        """
+        self._write_row_group()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._part += 1
+        return self._part
+
+    def close(self):
+        self.sync()
+
+
+def _load_checkpoint(path):
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, state):
+    if path is None:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def export_pages(iterate, writer, flatten, checkpoint_path=None, checkpoint_every=10):
+    """
+    Stream a paginated connection into a writer, one page at a time.
+
+    With a checkpoint file the export can be resumed after a crash: it restarts from the last
+    checkpointed cursor and discards output written after that checkpoint.
+
+    Args:
+        iterate (callable): Called with the cursor to resume from, returns a ConnectionIterator.
+        writer (JSONLWriter or ParquetWriter): The output.
+        flatten (callable): Turns a node into an iterable of rows.
+        checkpoint_path (str, optional): JSON file tracking progress (default is no resume support).
+        checkpoint_every (int, optional): Pages between checkpoints (default is 10).
+
+    Returns:
+        dict: The final state with the number of rows written.
+    """
+    state = _load_checkpoint(checkpoint_path)
+    if state.get("done"):
+        return state
+
+    rows = state.get("rows", 0)
+    offset = state.get("offset")
+    if offset is None and checkpoint_path is not None:
+        # Nothing was checkpointed, whatever an earlier run wrote is redone from the first page
+        offset = 0
+    writer.open(offset)
+    try:
+        for page_number, page in enumerate(iterate(state.get("cursor")).pages(), 1):
+            for edge in page.get("edges") or []:
+                for row in flatten(edge["node"]):
+                    writer.write(row)
+                    rows += 1
+
+            cursor = next_cursor(page)
+            if checkpoint_path is not None and cursor is not None and page_number % checkpoint_every == 0:
+                _save_checkpoint(checkpoint_path, {"cursor": cursor, "offset": writer.sync(), "rows": rows})
+    finally:
+        writer.close()
+
+    state = {"done": True, "rows": rows}
+    _save_checkpoint(checkpoint_path, state)
+    return state
+
+
+def open_writer(path, format="jsonl", compression=None, fields=USER_FIELDS):
+    """
+    Create a writer for an export format.
+
+    Args:
+        path (str): The output file (jsonl) or directory (parquet).
+        format (str, optional): 'jsonl' or 'parquet' (default is 'jsonl').
+        compression (str, optional): None, 'gzip' or 'zstd', jsonl only (default is None).
+        fields (list, optional): The Parquet schema (default is USER_FIELDS).
+
+    Returns:
+        JSONLWriter or ParquetWriter: The writer.
+    """
+    if format == "jsonl":
+        return JSONLWriter(path, compression)
+    if format == "parquet":
+        return ParquetWriter(path, fields)
+
+    raise ValueError("Unsupported format: {}".format(format))
+
+
+def export_followers(api, username, path, format="jsonl", compression=None, page_size=50, resume=True):
+    """
+    Export every follower of a user.
+
+    Args:
+        api (ThreadScrape): The client.
+        username (str or UserRef): The username, profile URL or UserRef of the user.
+        path (str): The output file (jsonl) or directory (parquet).
+        format (str, optional): 'jsonl' or 'parquet' (default is 'jsonl').
+        compression (str, optional): None, 'gzip' or 'zstd', jsonl only (default is None).
+        page_size (int, optional): The number of followers requested per page (default is 50).
+        resume (bool, optional): Keep a '<path>.checkpoint' file to resume interrupted exports (default is True).
+
+    Returns:
+        dict: The final state with the number of rows written.
+    """
+    user = api._user_ref(username)
+
+    return export_pages(
+        lambda cursor: api.iter_followers(user, page_size=page_size, after=cursor, prefetch=True),
+        open_writer(path, format, compression, USER_FIELDS), flatten_user,
+        path.rstrip("/\\") + ".checkpoint" if resume else None,
+    )
+
+
+def export_following(api, username, path, format="jsonl", compression=None, page_size=50, resume=True):
+    """
+    Export every account a user follows, see export_followers for the arguments.
+    """
+    user = api._user_ref(username)
+
+    return export_pages(
+        lambda cursor: api.iter_following(user, page_size=page_size, after=cursor, prefetch=True),
+        open_writer(path, format, compression, USER_FIELDS), flatten_user,
+        path.rstrip("/\\") + ".checkpoint" if resume else None,
+    )
+
+
+def export_user_profile_threads(api, username, path, format="jsonl", compression=None, page_size=25, resume=True):
+    """
+    Export every post of a user's profile threads, one row per post, see export_followers for the arguments.
+    """
+    user = api._user_ref(username)
+
+    return export_pages(
+        lambda cursor: api.iter_user_profile_threads(user, page_size=page_size, after=cursor, prefetch=True),
+        open_writer(path, format, compression, POST_FIELDS), flatten_thread,
+        path.rstrip("/\\") + ".checkpoint" if resume else None,
+    )
@@ -0,0 +1,80 @@
+import re
+
+# Matched against raw response bytes, the markers are plain ASCII
+PATTERNS = {
+    "userID": re.compile(rb'"userID":"(\d+)"'),
+    "postID": re.compile(rb'"postID":"(\d+)"'),
+    "id": re.compile(rb'"id":"(\d+_\d+)"'),
+}
+
+
+class PageExtractor:
+    """
+    Finds the first match of several patterns in a page fed chunk by chunk, without decoding it.
+
+    The tail of the previous chunk is kept so markers split across two chunks are still found.
+    """
+
+    def __init__(self, names, overlap=256):
+        """
+        Initializes a PageExtractor instance.
+
+        Args:
+            names (iterable): Keys of PATTERNS to look for.
+            overlap (int, optional): Bytes kept from the previous chunk, longer than any match (default is 256).
+        """
+        self.pending = [name for name in names]
+        self.found = {}
+        self.overlap = overlap
+        self.bytes_read = 0
+        self._tail = b""
+
+    @property
+    def done(self):
+        return not self.pending
+
+    def feed(self, chunk):
+        """
+        Scan the next chunk of the page.
+
+        Args:
+            chunk (bytes): The chunk.
+
+        Returns:
+            bool: True once every pattern has been found.
+        """
+        self.bytes_read += len(chunk)
+        buffer = self._tail + chunk
+        for name in list(self.pending):
+            match = PATTERNS[name].search(buffer)
+            if match:
+                self.found[name] = match.group(1).decode("ascii")
+                self.pending.remove(name)
+        self._tail = buffer[-self.overlap:]
+
+        return self.done
+
+
+def extract_from_response(response, names, chunk_size=16384, extractor=None):
+    """
+    Read a streamed requests response until every pattern is found, then close it.
+
+    Args:
+        response (requests.Response): A response opened with stream=True.
+        names (iterable): Keys of PATTERNS to look for.
+        chunk_size (int, optional): Bytes read at a time (default is 16384).
+        extractor (PageExtractor, optional): The extractor to feed, to read its bytes_read afterwards.
+
+    Returns:
+        dict: The value found for each name, names that weren't found are missing.
+    """
+    extractor = extractor if extractor is not None else PageExtractor(names)
+    try:
+        for chunk in response.iter_content(chunk_size):
+            if extractor.feed(chunk):
+                break
+    finally:
+        # Closing before the body is fully read drops the connection instead of draining it
+        response.close()
+
+    return extractor.found
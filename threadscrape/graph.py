@@ -0,0 +1,486 @@
+import hashlib, json, math, os, queue, struct, threading, time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .pagination import next_cursor
+from .refs import UserRef
+
+
+class BloomFilter:
+    """
+    A set of integers in a fixed bit array, answering 'maybe seen' or 'never seen'.
+
+    Sized for capacity items at the given false positive rate, it takes about 2.4 MB per million
+    items at 1e-4, against about 70 MB for a Python set of ints.
+    """
+
+    def __init__(self, capacity, error_rate=1e-4, bits=None):
+        """
+        Initializes a BloomFilter instance.
+
+        Args:
+            capacity (int): The number of items it's sized for.
+            error_rate (float, optional): The false positive rate at capacity (default is 1e-4).
+            bits (bytearray, optional): The bit array of a saved filter.
+        """
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.to_bytes(8, "little"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """
+        Add an integer.
+
+        Args:
+            item (int): A non-negative integer below 2**64, such as a user ID.
+
+        Returns:
+            bool: True if the item was maybe already there.
+        """
+        present = True
+        bits = self.bits
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path, capacity, error_rate=1e-4):
+        with open(path, "rb") as f:
+            return cls(capacity, error_rate, bytearray(f.read()))
+
+
+class DiskQueue:
+    """
+    A FIFO queue of (user ID, depth) records in an append-only file, read from an offset.
+    """
+
+    RECORD = struct.Struct("<QB")
+
+    def __init__(self, path, offset=0, size=None):
+        """
+        Initializes a DiskQueue instance.
+
+        Args:
+            path (str): Path of the queue file.
+            offset (int, optional): Byte offset of the next record to pop (default is 0).
+            size (int, optional): Truncate the file to this many bytes, dropping records pushed after a checkpoint.
+        """
+        self.path = path
+        self._writer = open(path, "ab")
+        if size is not None:
+            self._writer.truncate(size)
+        self._reader = open(path, "rb")
+        self.offset = offset
+
+    def push(self, user_id, depth):
+        self._writer.write(self.RECORD.pack(user_id, depth))
+
+    def pop_many(self, count):
+        """
+        Pop up to count records.
+
+        Returns:
+            list: (user ID, depth) tuples, empty once the queue is.
+        """
+        self._writer.flush()
+        self._reader.seek(self.offset)
+        data = self._reader.read(count * self.RECORD.size)
+        data = data[:len(data) - len(data) % self.RECORD.size]
+        self.offset += len(data)
+        return list(self.RECORD.iter_unpack(data))
+
+    @property
+    def size(self):
+        # tell() isn't updated by truncate(), the file's size is
+        self._writer.flush()
+        return os.fstat(self._writer.fileno()).st_size
+
+    def __len__(self):
+        return (self.size - self.offset) // self.RECORD.size
+
+    def close(self):
+        self._writer.close()
+        self._reader.close()
+
+
+class EdgeStore:
+    """
+    Directed edges as pairs of unsigned 64-bit user IDs in a flat binary file, 16 bytes per edge.
+    """
+
+    def __init__(self, path, size=None, buffer_size=65536):
+        """
+        Initializes an EdgeStore instance.
+
+        Args:
+            path (str): Path of the edge file.
+            size (int, optional): Truncate the file to this many bytes, dropping edges written after a checkpoint.
+            buffer_size (int, optional): Edges buffered in memory before they're written (default is 65536).
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self._file = open(path, "ab")
+        if size is not None:
+            self._file.truncate(size)
+        self._buffer = array("Q")
+
+    def append(self, source, target):
+        self._buffer.append(source)
+        self._buffer.append(target)
+        if len(self._buffer) >= 2 * self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self._buffer.tofile(self._file)
+        self._file.flush()
+        self._buffer = array("Q")
+
+    @property
+    def size(self):
+        self.flush()
+        return os.fstat(self._file.fileno()).st_size
+
+    def __len__(self):
+        return self.size // 16
+
+    def load(self):
+        """
+        Read every edge.
+
+        Returns:
+            array: array('Q') of source, target, source, target, ... user IDs.
+        """
+        self.flush()
+        edges = array("Q")
+        with open(self.path, "rb") as f:
+            edges.frombytes(f.read())
+        return edges
+
+    def __iter__(self):
+        self.flush()
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = array("Q")
+                chunk.frombytes(f.read(16 * self.buffer_size))
+                if not chunk:
+                    return
+                for index in range(0, len(chunk), 2):
+                    yield chunk[index], chunk[index + 1]
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class GraphCrawler:
+    """
+    Crawls the follower graph breadth first from seed users, keeping its state on disk.
+
+    The frontier is a DiskQueue, the visited set a BloomFilter keyed on user IDs and the edges an
+    EdgeStore, so memory stays flat however large the crawl. Neighbours are recorded a page at a time
+    as workers fetch them, through a queue of at most two pages per worker, and a depth is expanded
+    only once the one before it is. Crawled users are written
+    to nodes.tsv with their usernames. A checkpoint is written every checkpoint_every pages and when
+    the crawl ends, with the cursor of every user whose expansion is underway, and a crawler opened on
+    the same directory resumes from it.
+
+    An edge (a, b) means a follows b. Crawling in both directions records an edge between two expanded
+    users twice, once from each end. A false positive of the visited set drops a user from the crawl,
+    about error_rate of them at bloom_capacity users.
+    """
+
+    def __init__(self, api, directory, direction="followers", max_depth=2, max_nodes=None, max_edges_per_node=10000,
+                 page_size=50, max_workers=4, bloom_capacity=10000000, error_rate=1e-4, checkpoint_every=100):
+        """
+        Initializes a GraphCrawler instance.
+
+        Args:
+            api (ThreadScrape): The client the graph is fetched with.
+            directory (str): Where the crawl state and results are kept, created if missing.
+            direction (str, optional): 'followers', 'following' or 'both' (default is 'followers').
+            max_depth (int, optional): Users up to this many hops from a seed are recorded, those at max_depth
+                aren't expanded (default is 2).
+            max_nodes (int, optional): Stop discovering users once this many are recorded (default is no limit).
+            max_edges_per_node (int, optional): Neighbours read per user and direction, bounding the pages
+                fetched for popular accounts, None reads all of them (default is 10000).
+            page_size (int, optional): Users requested per page (default is 50).
+            max_workers (int, optional): Users expanded at once (default is 4).
+            bloom_capacity (int, optional): Users the visited set is sized for (default is 10000000, about 24 MB).
+            error_rate (float, optional): The visited set's false positive rate at capacity (default is 1e-4).
+            checkpoint_every (int, optional): Pages recorded between two checkpoints (default is 100).
+
+        Raises:
+            ValueError: If the direction is unknown.
+        """
+        if direction not in ("followers", "following", "both"):
+            raise ValueError("Unknown crawl direction: {}".format(direction))
+
+        self.api = api
+        self.directory = directory
+        self.direction = direction
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_edges_per_node = max_edges_per_node
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.checkpoint_every = checkpoint_every
+
+        os.makedirs(directory, exist_ok=True)
+        checkpoint = self._read_checkpoint()
+        self.stats = {"nodes": 0, "edges": 0, "expanded": 0, "failed": 0}
+        # Users popped from the frontier, being expanded or waiting to be: [user_id, depth, direction, cursor, count]
+        self._expanding = {}
+        self._pending = deque()
+
+        if checkpoint is None:
+            self.visited = BloomFilter(bloom_capacity, error_rate)
+            self.frontier = DiskQueue(self._path("frontier.bin"), size=0)
+            self.edges = EdgeStore(self._path("edges.bin"), size=0)
+            self._nodes = open(self._path("nodes.tsv"), "ab")
+            self._nodes.truncate(0)
+        else:
+            self.visited = BloomFilter.load(self._path("visited.bloom"), checkpoint["bloom_capacity"], checkpoint["error_rate"])
+            self.frontier = DiskQueue(self._path("frontier.bin"), checkpoint["frontier_offset"], checkpoint["frontier_size"])
+            self.edges = EdgeStore(self._path("edges.bin"), checkpoint["edges_size"])
+            self._nodes = open(self._path("nodes.tsv"), "ab")
+            self._nodes.truncate(checkpoint["nodes_size"])
+            self.stats.update(checkpoint["stats"])
+            self._pending.extend(checkpoint.get("pending", []))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_checkpoint(self):
+        try:
+            with open(self._path("checkpoint.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def checkpoint(self):
+        """
+        Save the crawl state, the files being truncated back to it on resume.
+        """
+        self._nodes.flush()
+        self.visited.save(self._path("visited.bloom.tmp"))
+        os.replace(self._path("visited.bloom.tmp"), self._path("visited.bloom"))
+
+        state = {
+            "frontier_offset": self.frontier.offset,
+            "frontier_size": self.frontier.size,
+            "edges_size": self.edges.size,
+            "nodes_size": os.fstat(self._nodes.fileno()).st_size,
+            "bloom_capacity": self.visited.capacity,
+            "error_rate": self.visited.error_rate,
+            "stats": self.stats,
+            "pending": list(self._expanding.values()) + list(self._pending),
+        }
+        with open(self._path("checkpoint.json.tmp"), "w") as f:
+            json.dump(state, f)
+        os.replace(self._path("checkpoint.json.tmp"), self._path("checkpoint.json"))
+
+    def _discover(self, user_id, username, depth):
+        # Returns True if the user is part of the graph, newly or already
+        if user_id in self.visited:
+            return True
+        if self.max_nodes is not None and self.stats["nodes"] >= self.max_nodes:
+            return False
+
+        self.visited.add(user_id)
+        self.stats["nodes"] += 1
+        self._nodes.write("{}\t{}\n".format(user_id, username or "").encode())
+        if depth < self.max_depth:
+            self.frontier.push(user_id, depth)
+        return True
+
+    def _directions(self):
+        return ("followers", "following") if self.direction == "both" else (self.direction,)
+
+    def _expand(self, unit, pages, stop):
+        # Runs on a worker, sends each page of neighbours to the crawling thread as it arrives
+        def send(message):
+            while not stop["abort"].is_set():
+                try:
+                    pages.put(message, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        user_id, depth, direction, after, count = unit
+        directions = self._directions()
+        try:
+            for index in range(directions.index(direction), len(directions)):
+                direction = directions[index]
+                iterator = getattr(self.api, "iter_" + direction)(UserRef(user_id), self.page_size, after)
+                for connection in iterator.pages():
+                    neighbours = []
+                    for edge in connection.get("edges") or []:
+                        if self.max_edges_per_node is not None and count >= self.max_edges_per_node:
+                            break
+                        node = edge["node"]
+                        neighbours.append((int(node.get("pk") or node["id"]), node.get("username")))
+                        count += 1
+
+                    after = next_cursor(connection, after)
+                    if after is None or (self.max_edges_per_node is not None and count >= self.max_edges_per_node):
+                        after = None
+                    # The state to resume from once this page is recorded
+                    if after is not None:
+                        state = [user_id, depth, direction, after, count]
+                    elif index + 1 < len(directions):
+                        state = [user_id, depth, directions[index + 1], None, 0]
+                    else:
+                        state = None
+                    send(("page", user_id, (direction, neighbours, state)))
+
+                    if after is None:
+                        break
+                    if stop["stop"].is_set():
+                        send(("stopped", user_id, None))
+                        return
+                after, count = None, 0
+        except Exception as error:
+            send(("failed", user_id, error))
+        finally:
+            send(("exit", user_id, None))
+
+    def _next_unit(self):
+        if not self._pending:
+            self._pending.extend([user_id, depth, self._directions()[0], None, 0]
+                                 for user_id, depth in self.frontier.pop_many(self.max_workers))
+        return self._pending.popleft() if self._pending else None
+
+    def crawl(self, seeds=(), max_seconds=None):
+        """
+        Crawl until the frontier is empty, or for max_seconds.
+
+        Args:
+            seeds (iterable, optional): Usernames, profile URLs or UserRefs to start from, already crawled
+                ones being ignored when resuming.
+            max_seconds (float, optional): Stop fetching after this long, checkpoint and return. Pages being
+                fetched are waited for, users whose expansion was cut short resume from their cursor
+                (default is no limit).
+
+        Returns:
+            dict: The number of users recorded, edges, users expanded and users whose neighbours
+                couldn't be fetched.
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        for seed in seeds:
+            user = self.api._user_ref(seed)
+            self._discover(user.user_id, user.username, 0)
+
+        pages = queue.Queue(maxsize=2 * self.max_workers)
+        stop = {"stop": threading.Event(), "abort": threading.Event()}
+        expanding = self._expanding
+        active = 0
+        since_checkpoint = 0
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while True:
+                while active < self.max_workers and not stop["stop"].is_set():
+                    unit = self._next_unit()
+                    if unit is None:
+                        break
+                    # A level is done before the next starts, so users are recorded at their shortest depth
+                    if expanding and unit[1] > min(state[1] for state in expanding.values()):
+                        self._pending.appendleft(unit)
+                        break
+                    expanding[unit[0]] = unit
+                    pool.submit(self._expand, unit, pages, stop)
+                    active += 1
+
+                if active == 0:
+                    break
+
+                try:
+                    kind, user_id, payload = pages.get(timeout=0.1)
+                except queue.Empty:
+                    kind = None
+
+                if kind == "page":
+                    direction, neighbours, state = payload
+                    depth = expanding[user_id][1] + 1
+                    for neighbour, username in neighbours:
+                        if not self._discover(neighbour, username, depth):
+                            continue
+                        if direction == "followers":
+                            self.edges.append(neighbour, user_id)
+                        else:
+                            self.edges.append(user_id, neighbour)
+                        self.stats["edges"] += 1
+
+                    if state is None:
+                        del expanding[user_id]
+                        self.stats["expanded"] += 1
+                    else:
+                        expanding[user_id] = state
+
+                    since_checkpoint += 1
+                    if since_checkpoint >= self.checkpoint_every:
+                        self.checkpoint()
+                        since_checkpoint = 0
+                elif kind == "failed":
+                    expanding.pop(user_id, None)
+                    self.stats["failed"] += 1
+                elif kind == "exit":
+                    active -= 1
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    stop["stop"].set()
+        except BaseException:
+            stop["stop"].set()
+            stop["abort"].set()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        # Users cut short by the deadline wait for the next crawl
+        self._pending.extendleft(reversed(list(expanding.values())))
+        expanding.clear()
+        self.checkpoint()
+        return dict(self.stats)
+
+    def iter_nodes(self):
+        """
+        Iterate over the recorded users.
+
+        Yields:
+            tuple: The user ID and username of every user, in discovery order.
+        """
+        self._nodes.flush()
+        with open(self._path("nodes.tsv"), "rb") as f:
+            for line in f:
+                user_id, username = line.rstrip(b"\n").split(b"\t", 1)
+                yield int(user_id), username.decode() or None
+
+    def close(self):
+        self.checkpoint()
+        self.frontier.close()
+        self.edges.close()
+        self._nodes.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,252 @@
+import bisect, threading, time
+from collections import defaultdict
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:
+    trace = None
+
+# before_request(key, method, url)
+# after_response(key, phase, seconds, status, bytes), phase being 'request', 'decode' or 'page'
+# on_error(key, error, attempt)
+# on_retry(key, attempt, delay, error)
+EVENTS = ("before_request", "after_response", "on_error", "on_retry")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tracked statistics that go down as well as up, every other statistic is a counter
+CACHE_GAUGES = ("size",)
+
+
+class Hooks:
+    """
+    Event handlers called along the request path.
+
+    'key' is the GraphQL friendly name, 'page' for HTML pages or 'configure_text_only_post'. Handlers
+    run on the thread making the request and must not raise.
+    """
+
+    def __init__(self):
+        self._handlers = {event: [] for event in EVENTS}
+
+    def register(self, event, handler=None):
+        """
+        Add a handler for an event, usable as a decorator.
+
+        Args:
+            event (str): One of EVENTS.
+            handler (callable, optional): Called with the event fields as keyword arguments.
+
+        Returns:
+            callable: The handler, or a decorator when handler is omitted.
+
+        Raises:
+            ValueError: If the event is unknown.
+        """
+        if event not in self._handlers:
+            raise ValueError("Unknown event: {}".format(event))
+        if handler is None:
+            return lambda handler: self.register(event, handler)
+
+        self._handlers[event].append(handler)
+        return handler
+
+    def unregister(self, event, handler):
+        self._handlers[event].remove(handler)
+
+    def emit(self, event, **fields):
+        for handler in self._handlers[event]:
+            handler(**fields)
+
+    def __bool__(self):
+        return any(self._handlers.values())
+
+
+def _labels(**labels):
+    return ",".join('{}="{}"'.format(
+        name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+    ) for name, value in labels.items())
+
+
+class Metrics:
+    """
+    Collects per operation request counts, phase latency histograms, bytes, errors and retries from
+    Hooks, and the statistics of tracked caches, exported in the Prometheus text format.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializes a Metrics instance.
+
+        Args:
+            buckets (tuple, optional): Upper bounds of the latency histogram buckets in seconds (default is DEFAULT_BUCKETS).
+        """
+        self.buckets = tuple(buckets)
+        self.requests = defaultdict(int)
+        self.histograms = {}
+        self.bytes = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.tracked = {}
+        self._lock = threading.Lock()
+
+    def attach(self, hooks):
+        """
+        Register the collector's handlers.
+
+        Args:
+            hooks (Hooks): The hooks of a client, such as ThreadScrape.hooks.
+
+        Returns:
+            Metrics: The collector itself.
+        """
+        hooks.register("after_response", self.after_response)
+        hooks.register("on_error", self.on_error)
+        hooks.register("on_retry", self.on_retry)
+        return self
+
+    def track(self, name, source):
+        """
+        Export the statistics of a cache or any object with a stats() method returning numbers.
+
+        Args:
+            name (str): The 'cache' label.
+            source: The object, such as LRUCache, ResponseCache or SingleFlight. Statistics named in
+                CACHE_GAUGES are exported as gauges, the others as counters.
+        """
+        self.tracked[name] = source
+
+    def after_response(self, key, phase, seconds, status=None, bytes=None):
+        with self._lock:
+            if phase == "request":
+                self.requests[(key, status)] += 1
+            histogram = self.histograms.get((key, phase))
+            if histogram is None:
+                # Bucket counts, then the sum and count
+                histogram = self.histograms[(key, phase)] = [[0] * len(self.buckets), 0.0, 0]
+            position = bisect.bisect_left(self.buckets, seconds)
+            if position < len(self.buckets):
+                histogram[0][position] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            if bytes:
+                self.bytes[(key, phase)] += bytes
+
+    def on_error(self, key, error, attempt=0):
+        with self._lock:
+            self.errors[(key, type(error).__name__)] += 1
+
+    def on_retry(self, key, attempt, delay, error=None):
+        with self._lock:
+            self.retries[key] += 1
+
+    def prometheus(self):
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+        lines = []
+        with self._lock:
+            lines.append("# HELP threadscrape_requests_total Requests sent, by operation and HTTP status.")
+            lines.append("# TYPE threadscrape_requests_total counter")
+            for (key, status), count in sorted(self.requests.items(), key=str):
+                lines.append("threadscrape_requests_total{{{}}} {}".format(_labels(operation=key, status=status), count))
+
+            lines.append("# HELP threadscrape_phase_seconds Time spent per operation in each phase: request, decode or page.")
+            lines.append("# TYPE threadscrape_phase_seconds histogram")
+            for (key, phase), (counts, total, count) in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    lines.append("threadscrape_phase_seconds_bucket{{{}}} {}".format(
+                        _labels(operation=key, phase=phase, le=bound), cumulative,
+                    ))
+                lines.append("threadscrape_phase_seconds_bucket{{{}}} {}".format(
+                    _labels(operation=key, phase=phase, le="+Inf"), count,
+                ))
+                lines.append("threadscrape_phase_seconds_sum{{{}}} {}".format(_labels(operation=key, phase=phase), total))
+                lines.append("threadscrape_phase_seconds_count{{{}}} {}".format(_labels(operation=key, phase=phase), count))
+
+            lines.append("# HELP threadscrape_bytes_total Response bytes read, by operation and phase.")
+            lines.append("# TYPE threadscrape_bytes_total counter")
+            for (key, phase), count in sorted(self.bytes.items()):
+                lines.append("threadscrape_bytes_total{{{}}} {}".format(_labels(operation=key, phase=phase), count))
+
+            lines.append("# HELP threadscrape_errors_total Failed attempts, by operation and exception.")
+            lines.append("# TYPE threadscrape_errors_total counter")
+            for (key, error), count in sorted(self.errors.items()):
+                lines.append("threadscrape_errors_total{{{}}} {}".format(_labels(operation=key, error=error), count))
+
+            lines.append("# HELP threadscrape_retries_total Retries, by operation.")
+            lines.append("# TYPE threadscrape_retries_total counter")
+            for key, count in sorted(self.retries.items()):
+                lines.append("threadscrape_retries_total{{{}}} {}".format(_labels(operation=key), count))
+
+        stats = {name: source.stats() for name, source in sorted(self.tracked.items())}
+
+        lines.append("# HELP threadscrape_cache_events_total Counters of the tracked caches, such as hits and misses.")
+        lines.append("# TYPE threadscrape_cache_events_total counter")
+        for name, values in stats.items():
+            for event, value in sorted(values.items()):
+                if event not in CACHE_GAUGES:
+                    lines.append("threadscrape_cache_events_total{{{}}} {}".format(_labels(cache=name, event=event), value))
+
+        for gauge in CACHE_GAUGES:
+            lines.append("# HELP threadscrape_cache_{} Current {} of the tracked caches.".format(gauge, gauge))
+            lines.append("# TYPE threadscrape_cache_{} gauge".format(gauge))
+            for name, values in stats.items():
+                if gauge in values:
+                    lines.append("threadscrape_cache_{}{{{}}} {}".format(gauge, _labels(cache=name), values[gauge]))
+
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryHooks:
+    """
+    Records every request phase as an OpenTelemetry span, and failed attempts as error spans.
+
+    Requires the optional opentelemetry-api package.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Initializes an OpenTelemetryHooks instance.
+
+        Args:
+            tracer (optional): The tracer spans are created with (default is the 'threadscrape' tracer).
+
+        Raises:
+            ImportError: If opentelemetry is not installed.
+        """
+        if trace is None:
+            raise ImportError("OpenTelemetryHooks requires opentelemetry, install it with: pip install opentelemetry-api")
+
+        self.tracer = tracer if tracer is not None else trace.get_tracer("threadscrape")
+
+    def attach(self, hooks):
+        hooks.register("after_response", self.after_response)
+        hooks.register("on_error", self.on_error)
+        return self
+
+    def after_response(self, key, phase, seconds, status=None, bytes=None):
+        # Phases are reported once done, the span is backdated to when the phase started
+        end = time.time_ns()
+        attributes = {"threadscrape.operation": key, "threadscrape.phase": phase}
+        if status is not None:
+            attributes["http.status_code"] = status
+        if bytes is not None:
+            attributes["threadscrape.bytes"] = bytes
+
+        span = self.tracer.start_span("{} {}".format(key, phase), start_time=end - int(seconds * 1e9), attributes=attributes)
+        span.end(end_time=end)
+
+    def on_error(self, key, error, attempt=0):
+        span = self.tracer.start_span("{} error".format(key), attributes={
+            "threadscrape.operation": key, "threadscrape.attempt": attempt,
+        })
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
@@ -0,0 +1,130 @@
+from bisect import bisect_right
+from collections import namedtuple
+
+Rendition = namedtuple("Rendition", ["url", "width", "height"])
+
+
+class RenditionIndex:
+    """
+    The renditions of one image or video, indexed by (width, height) and by size.
+    """
+
+    __slots__ = ("by_size", "_sides", "_ordered", "_best")
+
+    def __init__(self, renditions):
+        """
+        Initializes a RenditionIndex instance.
+
+        Args:
+            renditions (iterable): Rendition tuples, renditions with the same size after the first are ignored.
+        """
+        self.by_size = {}
+        for rendition in renditions:
+            self.by_size.setdefault((rendition.width, rendition.height), rendition)
+
+        # Sorted on the longest side, so the best rendition under a bound is one bisect away
+        self._ordered = sorted(self.by_size.values(), key=lambda rendition: max(rendition.width, rendition.height))
+        self._sides = [max(rendition.width, rendition.height) for rendition in self._ordered]
+        self._best = {}
+
+    @property
+    def largest(self):
+        """
+        The rendition with the longest side, None when there are no renditions.
+        """
+        return self._ordered[-1] if self._ordered else None
+
+    def best(self, max_size=None):
+        """
+        Get the largest rendition whose longest side is at most max_size.
+
+        Args:
+            max_size (int, optional): The bound in pixels (default is no bound).
+
+        Returns:
+            Rendition: The rendition, or None when every rendition is larger.
+        """
+        if max_size is None:
+            return self.largest
+
+        # Harvesting asks the same few sizes over and over, answer them from a table
+        try:
+            return self._best[max_size]
+        except KeyError:
+            position = bisect_right(self._sides, max_size)
+            rendition = self._ordered[position - 1] if position else None
+            self._best[max_size] = rendition
+            return rendition
+
+    def get(self, width, height):
+        return self.by_size.get((width, height))
+
+    def __iter__(self):
+        return iter(self._ordered)
+
+    def __len__(self):
+        return len(self._ordered)
+
+    def __repr__(self):
+        return "RenditionIndex({})".format(", ".join("{}x{}".format(*size) for size in self.by_size))
+
+
+def _renditions(candidates, width, height):
+    # Video versions often carry no size, they are as large as the original
+    for candidate in candidates or []:
+        url = candidate.get("url")
+        if url:
+            yield Rendition(url, candidate.get("width") or width or 0, candidate.get("height") or height or 0)
+
+
+def index_media(media):
+    """
+    Index the image and video renditions of one media dict, a post or a carousel slide.
+
+    Args:
+        media (dict): The media dict, with 'image_versions2' and/or 'video_versions'.
+
+    Returns:
+        tuple: The image RenditionIndex and the video RenditionIndex.
+    """
+    width, height = media.get("original_width"), media.get("original_height")
+    images = RenditionIndex(_renditions((media.get("image_versions2") or {}).get("candidates"), width, height))
+    videos = RenditionIndex(_renditions(media.get("video_versions"), width, height))
+    return images, videos
+
+
+MediaEntry = namedtuple("MediaEntry", ["index", "code", "width", "height", "images", "videos"])
+
+
+def iter_post_media(post_info, include_replies=False):
+    """
+    Walk every media of every thread item of the post in a get_post_info response.
+
+    The first edge holds the post and the rest of its author's thread, the following edges are reply
+    threads, often by other users.
+
+    Args:
+        post_info (dict): The get_post_info response.
+        include_replies (bool, optional): Also walk the reply threads (default is False).
+
+    Yields:
+        MediaEntry: Each image or video, numbered from 1 in page order, with its indexed renditions.
+            Media shared by several thread items is yielded once.
+    """
+    seen = set()
+    index = 0
+    edges = post_info['data']['data']['edges']
+    for edge in (edges if include_replies else edges[:1]):
+        for item in edge['node'].get('thread_items') or []:
+            post = item.get('post') or {}
+            for media in post.get('carousel_media') or [post]:
+                key = media.get('id') or media.get('pk') or id(media)
+                if key in seen or not (media.get('image_versions2') or media.get('video_versions')):
+                    continue
+                seen.add(key)
+
+                index += 1
+                images, videos = index_media(media)
+                yield MediaEntry(
+                    index, post.get('code'), media.get('original_width'), media.get('original_height'), images, videos,
+                )
@@ -0,0 +1,343 @@
+"""
+A local stand-in for the parts of Threads.net the client talks to, for offline benchmarks.
+
+    python -m threadscrape.mock_server --port 8080 --latency 0.05 --jitter 0.02 --error-rate 0.01
+
+Then point a client at it with ThreadScrape(data, base_url="http://127.0.0.1:8080").
+"""
+import argparse, json, random, re, socket, sys, threading, time, zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from .operations import BY_FRIENDLY_NAME, OPERATIONS
+
+CREDENTIALS = {"sessionid": "mock", "fb_dtsg": "mock", "x-csrftoken": "mock"}
+
+
+def fake_id(text):
+    return 10 ** 9 + zlib.crc32(text.encode())
+
+
+def fake_user(index):
+    """
+    Get a user node shaped like the ones of followers, following and search pages.
+    """
+    username = "user_{}".format(index)
+    return {
+        "pk": str(fake_id(username)),
+        "id": str(fake_id(username)),
+        "username": username,
+        "full_name": "User {}".format(index),
+        "is_verified": index % 7 == 0,
+        "text_post_app_is_private": False,
+        "follower_count": index * 13,
+        "profile_pic_url": "https://scontent.cdninstagram.com/v/t51.2885-19/{}_n.jpg?stp=dst-jpg_s150x150&_nc_ht=scontent".format(index),
+        "friendship_status": {"following": False, "followed_by": False, "blocking": False, "muting": False},
+        "hd_profile_pic_versions": [
+            {"url": "https://scontent.cdninstagram.com/{}_{}.jpg".format(index, size), "width": size, "height": size}
+            for size in (320, 640)
+        ],
+    }
+
+
+def fake_post(index, carousel=0):
+    """
+    Get a post shaped like the ones of post pages and profile threads, with carousel slides when asked.
+    """
+    def candidates(key):
+        return {"candidates": [
+            {"url": "https://scontent.cdninstagram.com/{}_{}.jpg".format(key, size), "width": size, "height": size}
+            for size in (1080, 750, 640, 480, 320, 240, 150)
+        ]}
+
+    pk = 3 * 10 ** 18 + index
+    return {
+        "pk": str(pk),
+        "id": "{}_{}".format(pk, fake_id("user_{}".format(index))),
+        "code": "C{:010d}".format(index),
+        "taken_at": 1700000000 + index,
+        "caption": {"text": "Post number {} ".format(index) * 8},
+        "like_count": index * 3,
+        "text_post_app_info": {"direct_reply_count": index, "share_info": {"quoted_post": None, "reposted_post": None}},
+        "user": fake_user(index),
+        "image_versions2": candidates(pk),
+        "original_width": 1080,
+        "original_height": 1080,
+        "carousel_media": [
+            {"id": "{}_{}".format(pk, slide), "image_versions2": candidates("{}_{}".format(pk, slide)),
+             "original_width": 1080, "original_height": 1080}
+            for slide in range(carousel)
+        ] or None,
+    }
+
+
+def fake_connection(nodes, offset, total):
+    """
+    Get a Relay connection page, cursors being offsets into a connection of total nodes.
+    """
+    end = offset + len(nodes)
+    return {
+        "edges": [{"node": node, "cursor": str(offset + index)} for index, node in enumerate(nodes)],
+        "page_info": {"has_next_page": end < total, "end_cursor": str(end)},
+    }
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Page readers hang up early and reconnect, a backlog of 5 drops their SYNs and adds 1 s retransmits
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Page readers hang up once they have found their marker
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockServer:
+    """
+    Serves /api/graphql, /api/v1/media/configure_text_only_post/, profile pages and post pages with
+    payloads the size of the real ones, on a background thread.
+
+    Latency and failures can be injected: every request waits latency plus up to jitter seconds, and
+    fails with a 429 or a 500 at the given rates.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit_rate=0.0, error_rate=0.0,
+                 page_bytes=300000, connection_size=1000, seed=None):
+        """
+        Initializes a MockServer instance.
+
+        Args:
+            host (str, optional): The interface to listen on (default is "127.0.0.1").
+            port (int, optional): The port, 0 picks a free one (default is 0).
+            latency (float, optional): Seconds every request waits before it's answered (default is 0.0).
+            jitter (float, optional): Random extra seconds added to latency, at most (default is 0.0).
+            rate_limit_rate (float, optional): Share of requests answered 429 with a Retry-After of 1 (default is 0.0).
+            error_rate (float, optional): Share of requests answered 500 (default is 0.0).
+            page_bytes (int, optional): Size of the HTML pages, their ID markers sit in the middle (default is 300000).
+            connection_size (int, optional): Nodes in every paginated connection (default is 1000).
+            seed (int, optional): Seeds the latency and failure injection.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.page_bytes = page_bytes
+        self.connection_size = connection_size
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(MockHandler):
+            mock = server
+
+        self.httpd = MockHTTPServer((host, port), Handler)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self):
+        """
+        Serve on a background thread.
+
+        Returns:
+            MockServer: The server itself.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def inject(self):
+        """
+        Wait the injected latency and pick the injected failure of a request.
+
+        Returns:
+            int: 429, 500 or None for a normal response.
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            draw = self._random.random()
+
+        if delay:
+            time.sleep(delay)
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def page(self, markers):
+        """
+        Build an HTML page of page_bytes with the markers in its middle, where real pages have them.
+        """
+        head = "<!DOCTYPE html><html><head><title>Threads</title></head><body>"
+        scripts = "".join('<script type="application/json">{{"{}":"{}"}}</script>'.format(*marker) for marker in markers)
+        filler = max(0, self.page_bytes - len(head) - len(scripts)) // 2
+        padding = '<script>{"require":[["ScheduledServerJS","handle",null,[]]]}</script>'
+        half = (padding * (filler // len(padding) + 1))[:filler]
+        return (head + half + scripts + half + "</body></html>").encode()
+
+    def graphql(self, friendly_name, variables):
+        """
+        Build the response of a GraphQL request.
+
+        Returns:
+            tuple: The status code and the response.
+        """
+        operation = BY_FRIENDLY_NAME.get(friendly_name)
+        if operation is None:
+            return 400, {"errors": [{"message": "Unknown operation {}".format(friendly_name)}]}
+        if operation.mutation:
+            return 200, {"data": {friendly_name: {"success": True}}}
+
+        first = int(variables.get("first") or 10)
+        offset = int(variables.get("after") or 0)
+        count = max(0, min(first, self.connection_size - offset))
+
+        def users():
+            return fake_connection([fake_user(offset + index) for index in range(count)], offset, self.connection_size)
+
+        if operation is OPERATIONS["get_followers"]:
+            return 200, {"data": {"fetch__XDTUserDict": {"followers": users()}}}
+        if operation is OPERATIONS["get_following"]:
+            return 200, {"data": {"fetch__XDTUserDict": {"following": users()}}}
+        if operation is OPERATIONS["search"]:
+            return 200, {"data": {"xdt_api__v1__users__search_connection": users()}}
+        if operation is OPERATIONS["get_recommended_users"]:
+            return 200, {"data": {"viewer": {"suggested_users": users()}}}
+        if operation is OPERATIONS["get_profile_info"]:
+            return 200, {"data": {"user": fake_user(fake_id(variables["username"]) % 100000)}}
+        if operation is OPERATIONS["get_user_profile_threads"]:
+            threads = [
+                {"id": str(offset + index), "thread_items": [{"post": fake_post(offset + index)}]} for index in range(count)
+            ]
+            return 200, {"data": {"mediaData": fake_connection(threads, offset, self.connection_size)}}
+        if operation is OPERATIONS["get_post_info"]:
+            index = int(variables["postID"]) % 100000
+            # The post's own thread first, then a thread per reply
+            edges = [{"node": {"thread_items": [{"post": fake_post(index, carousel=3)}]}}] + [
+                {"node": {"thread_items": [{"post": fake_post(index + reply)}]}} for reply in range(1, 4)
+            ]
+            return 200, {"data": {"data": {"edges": edges}}}
+
+        return 200, {"data": {}}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock = None
+
+    def setup(self):
+        super().setup()
+        # Otherwise Nagle's algorithm and delayed ACKs add ~40 ms to responses sent in several writes
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            for start in range(0, len(body), 65536):
+                self.wfile.write(body[start:start + 65536])
+        except (BrokenPipeError, ConnectionResetError):
+            # Page readers hang up once they have found their marker
+            self.close_connection = True
+
+    def send_json(self, status, value):
+        self.send_body(status, json.dumps(value).encode())
+
+    def failed(self):
+        status = self.mock.inject()
+        if status == 429:
+            body = json.dumps({"message": "Please wait a few minutes before you try again."}).encode()
+            self.send_body(429, body, headers={"retry-after": "1"})
+        elif status == 500:
+            self.send_json(500, {"message": "Internal error"})
+        return status is not None
+
+    def do_GET(self):
+        if self.failed():
+            return
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        post = re.match(r"^/@([^/]+)/post/([^/]+)$", path)
+        profile = re.match(r"^/@([^/]+)$", path)
+        if post:
+            username, code = post.groups()
+            post_id, user_id = fake_id(code), fake_id(username)
+            markers = [("postID", post_id), ("id", "{}_{}".format(post_id, user_id))]
+        elif profile:
+            markers = [("userID", fake_id(profile.group(1)))]
+        else:
+            self.send_body(404, b"Not Found", "text/html")
+            return
+
+        self.send_body(200, self.mock.page(markers), "text/html; charset=utf-8")
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        if self.failed():
+            return
+
+        path = self.path.split("?", 1)[0]
+        if path == "/api/graphql":
+            status, value = self.mock.graphql(
+                form.get("fb_api_req_friendly_name"), json.loads(form.get("variables") or "{}"),
+            )
+            self.send_json(status, value)
+        elif path == "/api/v1/media/configure_text_only_post/":
+            self.send_json(200, {"media": fake_post(int(time.time() * 1000) % 100000), "status": "ok"})
+        else:
+            self.send_json(404, {"message": "Not Found"})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="A local Threads.net stand-in for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-bytes", type=int, default=300000)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = MockServer(
+        args.host, args.port, args.latency, args.jitter, args.rate_limit_rate, args.error_rate, args.page_bytes,
+        seed=args.seed,
+    )
+    print("Listening on {}".format(server.url), flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+from .pagination import find_connection
+
+
+class field:
+    """
+    A model attribute decoded from the raw response on first access, then cached in a slot.
+    """
+
+    def __init__(self, decode):
+        """
+        Initializes a field.
+
+        Args:
+            decode (callable): Called with the raw dict, returns the attribute value.
+        """
+        self.decode = decode
+        self.name = None
+        self.slot = None
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            value = self.decode(instance._data)
+            setattr(instance, self.slot, value)
+            return value
+
+
+class _ModelMeta(type):
+    # Gives every field a slot of its own, so models have no per-instance __dict__
+    def __new__(mcs, name, bases, namespace):
+        fields = [(key, value) for key, value in namespace.items() if isinstance(value, field)]
+        for key, value in fields:
+            value.name = key
+            value.slot = "_f_" + key
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + tuple(value.slot for _, value in fields)
+
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._fields = tuple(getattr(cls, "_fields", ())) + tuple(key for key, _ in fields)
+        return cls
+
+
+class Model(metaclass=_ModelMeta):
+    """
+    A lightweight wrapper around a raw GraphQL dict whose fields are decoded lazily.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    @property
+    def raw(self):
+        """
+        The wrapped dict, None once compact() was called.
+        """
+        return self._data
+
+    def compact(self):
+        """
+        Decode every field and drop the raw dict, keeping only the decoded values in memory.
+
+        Returns:
+            Model: The model itself.
+        """
+        for name in self._fields:
+            value = getattr(self, name)
+            for item in (value if isinstance(value, list) else [value]):
+                if isinstance(item, Model):
+                    item.compact()
+        self._data = None
+        return self
+
+    def to_dict(self):
+        """
+        Get the decoded fields as a plain dict.
+
+        Returns:
+            dict: The fields, nested models converted as well.
+        """
+        def convert(value):
+            if isinstance(value, Model):
+                return value.to_dict()
+            if isinstance(value, list):
+                return [convert(item) for item in value]
+            return value
+
+        return {name: convert(getattr(self, name)) for name in self._fields}
+
+    def __repr__(self):
+        key = self._fields[0]
+        return "{}({}={!r})".format(type(self).__name__, key, getattr(self, key))
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+class User(Model):
+    """
+    A Threads.net user, from followers/following/search results or a post author.
+    """
+
+    pk = field(lambda d: _int(d.get("pk") or d.get("id")))
+    username = field(lambda d: d.get("username"))
+    full_name = field(lambda d: d.get("full_name"))
+    is_verified = field(lambda d: d.get("is_verified"))
+    is_private = field(lambda d: d.get("text_post_app_is_private", d.get("is_private")))
+    follower_count = field(lambda d: d.get("follower_count"))
+    profile_pic_url = field(lambda d: d.get("profile_pic_url"))
+
+
+class MediaItem(Model):
+    """
+    One image or video of a post, a carousel has one per slide.
+    """
+
+    media_type = field(lambda d: d.get("media_type"))
+    width = field(lambda d: d.get("original_width"))
+    height = field(lambda d: d.get("original_height"))
+    images = field(lambda d: list((d.get("image_versions2") or {}).get("candidates") or []))
+    videos = field(lambda d: list(d.get("video_versions") or []))
+
+
+def _decode_media(post):
+    carousel = post.get("carousel_media")
+    if carousel:
+        return [MediaItem(media) for media in carousel]
+    if post.get("image_versions2") or post.get("video_versions"):
+        return [MediaItem(post)]
+    return []
+
+
+class Post(Model):
+    """
+    A Threads.net post, the 'post' of a thread item.
+    """
+
+    pk = field(lambda d: _int(d.get("pk")))
+    id = field(lambda d: d.get("id"))
+    code = field(lambda d: d.get("code"))
+    taken_at = field(lambda d: d.get("taken_at"))
+    caption = field(lambda d: (d.get("caption") or {}).get("text"))
+    like_count = field(lambda d: d.get("like_count"))
+    reply_count = field(lambda d: (d.get("text_post_app_info") or {}).get("direct_reply_count"))
+    user = field(lambda d: User(d.get("user") or {}))
+    media = field(_decode_media)
+
+    @classmethod
+    def from_post_info(cls, post_info):
+        """
+        Get the main post of a get_post_info response.
+
+        Args:
+            post_info (dict): The get_post_info response.
+
+        Returns:
+            Post: The post.
+        """
+        return cls(post_info['data']['data']['edges'][0]['node']['thread_items'][0]['post'])
+
+
+class Thread(Model):
+    """
+    A thread of a profile threads page: a post and the replies shown with it.
+    """
+
+    id = field(lambda d: d.get("id"))
+    posts = field(lambda d: [Post(item["post"]) for item in d.get("thread_items") or [] if item.get("post")])
+
+
+class Page:
+    """
+    One page of a Relay connection, wrapping its nodes in a model class.
+    """
+
+    __slots__ = ("item_cls", "end_cursor", "has_next_page", "_edges", "_items")
+
+    def __init__(self, connection, item_cls):
+        """
+        Initializes a Page instance.
+
+        Args:
+            connection (dict): The connection with its 'edges' and 'page_info'.
+            item_cls (type): The model class of the nodes, such as User or Thread.
+        """
+        page_info = connection.get("page_info") or {}
+        self.item_cls = item_cls
+        self.end_cursor = page_info.get("end_cursor")
+        self.has_next_page = bool(page_info.get("has_next_page"))
+        self._edges = connection.get("edges") or []
+        self._items = None
+
+    @classmethod
+    def from_response(cls, response, item_cls):
+        """
+        Build a page from a GraphQL response such as the one of get_followers.
+
+        Args:
+            response (dict): The GraphQL response.
+            item_cls (type): The model class of the nodes.
+
+        Returns:
+            Page: The page.
+        """
+        return cls(find_connection(response), item_cls)
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = [self.item_cls(edge["node"]) for edge in self._edges]
+            self._edges = None
+        return self._items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self._edges) if self._items is None else len(self._items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __repr__(self):
+        return "Page({}, {} items, end_cursor={!r})".format(self.item_cls.__name__, len(self), self.end_cursor)
@@ -0,0 +1,160 @@
+import json
+
+LOGGED_IN = "__relay_internal__pv__BarcelonaIsLoggedInrelayprovider"
+FEEDBACK_HUB = "__relay_internal__pv__BarcelonaIsFeedbackHubEnabledrelayprovider"
+
+
+class Operation:
+    """
+    A GraphQL operation of the Threads.net WEB-API and its variable schema.
+    """
+
+    __slots__ = ("friendly_name", "doc_id", "required", "optional", "constants", "mutation", "_template")
+
+    def __init__(self, friendly_name, doc_id, required=None, optional=None, constants=None, lsd=None, mutation=False):
+        """
+        Initializes an Operation instance.
+
+        Args:
+            friendly_name (str): The fb_api_req_friendly_name, also sent as the x-fb-friendly-name header.
+            doc_id (str): The persisted query ID.
+            required (dict, optional): Required variable names mapped to the type they are converted to.
+            optional (dict, optional): Optional variable names mapped to their type, omitted when None.
+            constants (dict, optional): Variables sent with the same value on every request.
+            lsd (str, optional): The lsd form field, when the operation sends one.
+            mutation (bool, optional): Whether the operation changes data (default is False).
+        """
+        self.friendly_name = friendly_name
+        self.doc_id = doc_id
+        self.required = required or {}
+        self.optional = optional or {}
+        self.constants = constants or {}
+        self.mutation = mutation
+
+        # Everything but fb_dtsg and variables is the same on every request
+        self._template = {}
+        if lsd is not None:
+            self._template['lsd'] = lsd
+        self._template['fb_api_req_friendly_name'] = friendly_name
+        self._template['server_timestamps'] = 'true'
+        self._template['doc_id'] = doc_id
+
+    def variables(self, **values):
+        """
+        Validate and convert the variables of a request.
+
+        Args:
+            **values: The variable values.
+
+        Returns:
+            dict: The variables, in schema order.
+
+        Raises:
+            ValueError: If a required variable is missing or an unknown one is given.
+        """
+        unknown = set(values) - set(self.required) - set(self.optional)
+        if unknown:
+            raise ValueError("Unknown variables for {}: {}".format(self.friendly_name, ', '.join(sorted(unknown))))
+
+        variables = {}
+        for name, type_ in self.required.items():
+            if values.get(name) is None:
+                raise ValueError("Missing variable for {}: {}".format(self.friendly_name, name))
+            variables[name] = type_(values[name])
+        variables.update(self.constants)
+        for name, type_ in self.optional.items():
+            if values.get(name) is not None:
+                variables[name] = type_(values[name])
+
+        return variables
+
+    def build(self, fb_dtsg, **values):
+        """
+        Build the form data of a request.
+
+        Args:
+            fb_dtsg (str): The fb_dtsg token.
+            **values: The variable values.
+
+        Returns:
+            dict: The form data to post to the GraphQL endpoint.
+        """
+        data = {'fb_dtsg': fb_dtsg}
+        data.update(self._template)
+        data['variables'] = json.dumps(self.variables(**values), separators=(',', ':'))
+        return data
+
+    def __repr__(self):
+        return "Operation({!r}, {!r})".format(self.friendly_name, self.doc_id)
+
+
+OPERATIONS = {
+    "get_followers": Operation(
+        'BarcelonaFriendshipsFollowersTabQuery', "6173206472779164",
+        required={"userID": str}, optional={"first": int, "after": str}, constants={LOGGED_IN: True},
+        lsd='nucUUd7UtYh-1Efz-5wTiC',
+    ),
+    "get_following": Operation(
+        'BarcelonaFriendshipsFollowingTabQuery', "6566004623483043",
+        required={"userID": str}, optional={"first": int, "after": str}, constants={LOGGED_IN: True},
+        lsd='nucUUd7UtYh-1Efz-5wTiC',
+    ),
+    "follow_user": Operation(
+        'useBarcelonaFollowMutationFollowMutation', "6240353742756860",
+        required={"target_user_id": str}, lsd='BSWpx6WGeZ94S2rNbmkxn4', mutation=True,
+    ),
+    "unfollow_user": Operation(
+        'useBarcelonaFollowMutationUnfollowMutation', "6419596478124270",
+        required={"target_user_id": str}, lsd='BSWpx6WGeZ94S2rNbmkxn4', mutation=True,
+    ),
+    "like_post": Operation(
+        'useBarcelonaLikeMutationLikeMutation', "6163527303756305",
+        required={"media_id": str}, lsd='OacJH75YYKAh8Xtd4UtEJT', mutation=True,
+    ),
+    "unlike_post": Operation(
+        'useBarcelonaLikeMutationUnlikeMutation', "6574229129305381",
+        required={"media_id": str}, mutation=True,
+    ),
+    "get_profile_info": Operation(
+        'BarcelonaUsernameHoverCardImplQuery', "6294229744032325",
+        required={"username": str},
+    ),
+    "search": Operation(
+        'useBarcelonaAccountSearchGraphQLDataSourceQuery', "6427333243987367",
+        required={"query": str, "first": int}, constants={LOGGED_IN: True},
+    ),
+    "get_recommended_users": Operation(
+        'BarcelonaSearchRecommendedUsersRefetchableQuery', "6476698865784411",
+        required={"first": int}, optional={"after": str}, constants={"before": None, "last": None, LOGGED_IN: True},
+    ),
+    # Shares its doc_id with BarcelonaSearchRecommendedUsersRefetchableQuery, kept as captured until a
+    # request of the reply control dialog is recorded again
+    "update_reply_permission": Operation(
+        'useBarcelonaSetPostReplyControlMutation', "6476698865784411",
+        required={"reply_control": str, "post_id": str}, mutation=True,
+    ),
+    "delete_thread": Operation(
+        'useBarcelonaDeleteMutationMutation', "9722027491203611",
+        required={"media_id": str}, mutation=True,
+    ),
+    "block_user": Operation(
+        'useBarcelonaUserBlockMutation', "7159968810697379",
+        required={"user_id": str}, lsd='BSWpx6WGeZ94S2rNbmkxn4', mutation=True,
+    ),
+    "unblock_user": Operation(
+        'useBarcelonaUserUnblockMutation', "6572924756096893",
+        required={"user_id": str}, lsd='BSWpx6WGeZ94S2rNbmkxn4', mutation=True,
+    ),
+    "get_user_profile_threads": Operation(
+        'BarcelonaProfileThreadsTabQuery', "6232751443445612",
+        required={"userID": str}, optional={"first": int, "after": str}, lsd='BSWpx6WGeZ94S2rNbmkxn4',
+    ),
+    "get_post_info": Operation(
+        'BarcelonaPostPageQuery', "6994920940542386",
+        required={"postID": str}, constants={LOGGED_IN: True, FEEDBACK_HUB: False},
+        lsd='SI3IPQlJXR0BOvV0HaHVtY',
+    ),
+}
+
+# Looks up the operation of a request from its form data
+BY_FRIENDLY_NAME = {operation.friendly_name: operation for operation in OPERATIONS.values()}
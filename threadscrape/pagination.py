@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def find_connection(response):
+    """
+    Find the first Relay connection (a dict with 'edges' and 'page_info') in a GraphQL response.
+
+    Args:
+        response (dict): The parsed GraphQL response.
+
+    Returns:
+        dict: The connection, or an empty one when the response doesn't contain any.
+    """
+    stack = [response]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if "edges" in value and "page_info" in value:
+                return value
+            stack.extend(reversed(list(value.values())))
+        elif isinstance(value, list):
+            stack.extend(reversed(value))
+
+    return {"edges": [], "page_info": {"has_next_page": False, "end_cursor": None}}
+
+
+def next_cursor(connection, after=None):
+    """
+    Get the cursor of the page following a connection.
+
+    Args:
+        connection (dict): The current page.
+        after (str, optional): The cursor the current page was fetched with.
+
+    Returns:
+        str: The next cursor, or None when this is the last page.
+    """
+    page_info = connection.get("page_info") or {}
+    end_cursor = page_info.get("end_cursor")
+
+    # A cursor that doesn't move would loop forever
+    if not page_info.get("has_next_page") or not end_cursor or end_cursor == after:
+        return None
+
+    return end_cursor
+
+
+class ConnectionIterator:
+    """
+    Iterates over every node of a paginated Relay connection, following page_info.end_cursor.
+
+    Only the current page is held in memory. With prefetch enabled the next page is requested on a
+    background thread while the caller processes the current one.
+    """
+
+    def __init__(self, fetch_page, after=None, prefetch=False, item_cls=None):
+        """
+        Initializes a ConnectionIterator instance.
+
+        Args:
+            fetch_page (callable): Called with the cursor (None for the first page), returns the GraphQL response.
+            after (str, optional): Cursor to resume from (default is the first page).
+            prefetch (bool, optional): Fetch the next page while the current one is consumed (default is False).
+            item_cls (type, optional): The model class of the nodes, used by models().
+        """
+        self.fetch_page = fetch_page
+        self.after = after
+        self.prefetch = prefetch
+        self.item_cls = item_cls
+        self.end_cursor = after
+
+    def pages(self):
+        """
+        Iterate over the pages of the connection.
+
+        Yields:
+            dict: Each connection page with its 'edges' and 'page_info'.
+        """
+        after = self.after
+
+        if not self.prefetch:
+            while True:
+                connection = find_connection(self.fetch_page(after))
+                yield connection
+                self.end_cursor = after = next_cursor(connection, after)
+                if after is None:
+                    return
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self.fetch_page, after)
+            while future is not None:
+                connection = find_connection(future.result())
+                cursor = next_cursor(connection, after)
+                future = pool.submit(self.fetch_page, cursor) if cursor is not None else None
+                yield connection
+                self.end_cursor = after = cursor
+
+    def __iter__(self):
+        for connection in self.pages():
+            for edge in connection.get("edges") or []:
+                yield edge["node"]
+
+    def models(self):
+        """
+        Iterate over the nodes wrapped in item_cls, such as models.User.
+
+        Yields:
+            Model: Each node.
+        """
+        for node in self:
+            yield self.item_cls(node)
+
+
+async def aiter_pages(fetch_page, after=None):
+    """
+    Iterate over the pages of a connection with an async fetch_page.
+
+    Args:
+        fetch_page (callable): Coroutine function called with the cursor, returns the GraphQL response.
+        after (str, optional): Cursor to resume from (default is the first page).
+
+    Yields:
+        dict: Each connection page with its 'edges' and 'page_info'.
+    """
+    while True:
+        connection = find_connection(await fetch_page(after))
+        yield connection
+        after = next_cursor(connection, after)
+        if after is None:
+            return
@@ -0,0 +1,138 @@
+import threading, time
+from collections import deque
+from .errors import ThreadScrapeError
+from .utils import validate_credentials
+
+
+class PooledSession:
+    """
+    One account of a SessionPool, with its credentials and health counters.
+    """
+
+    def __init__(self, index, data):
+        self.index = index
+        self.sessionid = data["sessionid"]
+        self.fb_dtsg = data["fb_dtsg"]
+        self.x_csrftoken = data["x-csrftoken"]
+        self.session = None
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.quarantined_until = 0.0
+        self.timestamps = deque()
+
+    def is_healthy(self, now):
+        return now >= self.quarantined_until
+
+    def prune(self, now, window):
+        while self.timestamps and self.timestamps[0] < now - window:
+            self.timestamps.popleft()
+
+
+class SessionPool:
+    """
+    Spreads requests over several accounts to multiply the available rate limits.
+
+    Each request goes to the healthy session with the fewest requests in flight. A session that
+    fails several requests in a row is quarantined for a while: connection errors, error statuses
+    including 429, and GraphQL error payloads all count.
+
+    The client's RequestDispatcher sits above the pool, so its rate limits, Retry-After pauses and
+    circuit breaker are global: a 429 on one account pauses its endpoint for every account, and
+    the limits are set for the pool as a whole.
+    """
+
+    def __init__(self, credentials, quarantine_after=3, quarantine_time=300, rate_window=60):
+        """
+        Initializes a SessionPool instance.
+
+        Args:
+            credentials (list): Dictionaries with keys 'sessionid', 'fb_dtsg', and 'x-csrftoken', one per account.
+            quarantine_after (int, optional): Consecutive errors before a session is quarantined (default is 3).
+            quarantine_time (float, optional): Seconds a quarantined session is skipped (default is 300).
+            rate_window (float, optional): Seconds over which request rates are measured (default is 60).
+
+        Raises:
+            ValueError: If the list is empty or any credentials are invalid.
+        """
+        if not credentials:
+            raise ValueError("SessionPool requires at least one set of credentials")
+
+        for data in credentials:
+            validate_credentials(data)
+
+        self.sessions = [PooledSession(index, data) for index, data in enumerate(credentials)]
+        self.quarantine_after = quarantine_after
+        self.quarantine_time = quarantine_time
+        self.rate_window = rate_window
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Pick the session for the next request.
+
+        Returns:
+            PooledSession: The least loaded healthy session.
+
+        Raises:
+            ThreadScrapeError: If every session is quarantined.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [pooled for pooled in self.sessions if pooled.is_healthy(now)]
+            if not healthy:
+                raise ThreadScrapeError("Every session of the pool is quarantined")
+
+            pooled = min(healthy, key=lambda pooled: (pooled.in_flight, pooled.requests))
+            pooled.in_flight += 1
+            pooled.requests += 1
+            pooled.timestamps.append(now)
+            pooled.prune(now, self.rate_window)
+            return pooled
+
+    def release(self, pooled, ok):
+        """
+        Report the outcome of a request sent with a session.
+
+        Args:
+            pooled (PooledSession): The session returned by acquire.
+            ok (bool): Whether the request succeeded.
+        """
+        with self._lock:
+            pooled.in_flight -= 1
+            if ok:
+                pooled.consecutive_errors = 0
+                return
+
+            pooled.errors += 1
+            pooled.consecutive_errors += 1
+            if pooled.consecutive_errors >= self.quarantine_after:
+                pooled.quarantined_until = time.monotonic() + self.quarantine_time
+                pooled.consecutive_errors = 0
+
+    def stats(self):
+        """
+        Get per session statistics.
+
+        Returns:
+            list: One dict per session with its request and error counts, requests in flight,
+                requests per second over rate_window and whether it's quarantined.
+        """
+        now = time.monotonic()
+        stats = []
+        with self._lock:
+            for pooled in self.sessions:
+                pooled.prune(now, self.rate_window)
+                stats.append({
+                    "index": pooled.index,
+                    "requests": pooled.requests,
+                    "errors": pooled.errors,
+                    "in_flight": pooled.in_flight,
+                    "requests_per_second": len(pooled.timestamps) / self.rate_window,
+                    "quarantined": not pooled.is_healthy(now),
+                })
+        return stats
+
+    def __len__(self):
+        return len(self.sessions)
@@ -0,0 +1,353 @@
+import asyncio, random, threading, time
+from .errors import RateLimitError, ServerError, CircuitOpenError
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket refilled at a constant rate.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initializes a TokenBucket instance.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float, optional): The maximum burst size (default is max(1, rate)).
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_time(self, tokens):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, sleeping until enough are available.
+
+        Args:
+            tokens (float, optional): The number of tokens to take (default is 1).
+        """
+        while True:
+            with self._lock:
+                wait = self._wait_time(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """
+        The coroutine counterpart of acquire, waiting without blocking the event loop.
+        """
+        while True:
+            with self._lock:
+                wait = self._wait_time(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens from the bucket without waiting.
+
+        Returns:
+            bool: True if the tokens were taken.
+        """
+        with self._lock:
+            return self._wait_time(tokens) <= 0
+
+    def pause(self, seconds):
+        """
+        Stop handing out tokens for a while, e.g. for the Retry-After of a 429 response.
+
+        Args:
+            seconds (float): How long to pause.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class RateLimiter:
+    """
+    Per endpoint token buckets, keyed on the GraphQL friendly name.
+    """
+
+    def __init__(self, rates=None, default_rate=None):
+        """
+        Initializes a RateLimiter instance.
+
+        Args:
+            rates (dict, optional): Maps a key to a rate in requests per second, or a (rate, burst) tuple.
+            default_rate (float or tuple, optional): Limit for keys missing from rates (default is unlimited).
+        """
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key):
+        """
+        Get the bucket of a key.
+
+        Returns:
+            TokenBucket: The bucket, or None when the key is unlimited.
+        """
+        with self._lock:
+            if key not in self._buckets:
+                rate = self.rates.get(key, self.default_rate)
+                if isinstance(rate, tuple):
+                    self._buckets[key] = TokenBucket(*rate)
+                else:
+                    self._buckets[key] = TokenBucket(rate) if rate else None
+            return self._buckets[key]
+
+    def acquire(self, key):
+        bucket = self.bucket(key)
+        if bucket is not None:
+            bucket.acquire()
+
+    async def acquire_async(self, key):
+        bucket = self.bucket(key)
+        if bucket is not None:
+            await bucket.acquire_async()
+
+    def pause(self, key, seconds):
+        bucket = self.bucket(key)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter.
+    """
+
+    def __init__(self, base=0.5, factor=2.0, max_delay=60.0, max_retries=3):
+        """
+        Initializes a Backoff instance.
+
+        Args:
+            base (float, optional): The delay ceiling of the first retry in seconds (default is 0.5).
+            factor (float, optional): The growth of the ceiling per retry (default is 2.0).
+            max_delay (float, optional): The maximum delay in seconds (default is 60.0).
+            max_retries (int, optional): The number of retries before giving up (default is 3).
+        """
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Get the delay before a retry.
+
+        Args:
+            attempt (int): The number of retries done so far.
+            retry_after (float, optional): The server's Retry-After, used as a lower bound.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base * self.factor ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after consecutive failures, then lets a single trial request through
+    once reset_timeout has passed.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Initializes a CircuitBreaker instance.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open the circuit (default is 5).
+            reset_timeout (float, optional): Seconds before a trial request is allowed (default is 30.0).
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """
+        Check that a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its trial request already in flight.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise CircuitOpenError("Too many failed requests, circuit breaker is open")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """
+        End a trial request that neither succeeded nor failed, e.g. one rejected for bad input.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class RequestDispatcher:
+    """
+    The single path every request goes through: rate limiting, retries with backoff and circuit breaking.
+
+    call serves threads and call_async coroutines, so one dispatcher can be shared by ThreadScrape and
+    AsyncThreadScrape clients and their limits and breaker apply to both.
+    """
+
+    def __init__(self, limiter=None, backoff=None, breaker=None, retry_on=(RateLimitError,), fail_on=(ServerError,),
+                 hooks=None):
+        """
+        Initializes a RequestDispatcher instance.
+
+        Args:
+            limiter (RateLimiter, optional): Per endpoint rate limits (default is unlimited).
+            backoff (Backoff, optional): Retry policy (default is Backoff()).
+            breaker (CircuitBreaker, optional): Circuit breaker (default is CircuitBreaker()).
+            retry_on (tuple, optional): Exceptions that are retried and count as failures (default is (RateLimitError,)).
+            fail_on (tuple, optional): Exceptions that count as failures without being retried, add ServerError
+                to retry_on to retry them too (default is (ServerError,)).
+            hooks (Hooks, optional): Notified of failed attempts and retries, see hooks.Hooks.
+        """
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.backoff = backoff if backoff is not None else Backoff()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.retry_on = retry_on
+        self.fail_on = fail_on
+        self.hooks = hooks
+        self.retries = 0
+
+    def call(self, key, send):
+        """
+        Send a request.
+
+        Args:
+            key (str): The rate limit key, the friendly name for GraphQL requests.
+            send (callable): Performs the request and returns its result.
+
+        Returns:
+            The result of send.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            Any exception raised by send, once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self.limiter.acquire(key)
+            try:
+                result = send()
+            except Exception as error:
+                delay = self._failed(key, error, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, key, send):
+        """
+        Send a request from a coroutine, see call.
+
+        Args:
+            key (str): The rate limit key, the friendly name for GraphQL requests.
+            send (callable): A coroutine function performing the request and returning its result.
+
+        Returns:
+            The result of send.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            Any exception raised by send, once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            await self.limiter.acquire_async(key)
+            try:
+                result = await send()
+            except Exception as error:
+                delay = self._failed(key, error, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def _failed(self, key, error, attempt):
+        # Records a failed attempt, returns the delay before the next one or None to raise the error
+        retried = isinstance(error, self.retry_on)
+        if retried or isinstance(error, self.fail_on):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+        if self.hooks:
+            self.hooks.emit("on_error", key=key, error=error, attempt=attempt)
+        if not retried:
+            return None
+
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            self.limiter.pause(key, retry_after)
+        if attempt >= self.backoff.max_retries:
+            return None
+
+        delay = self.backoff.delay(attempt, retry_after)
+        if self.hooks:
+            self.hooks.emit("on_retry", key=key, attempt=attempt + 1, delay=delay, error=error)
+        self.retries += 1
+        return delay
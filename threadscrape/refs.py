@@ -0,0 +1,123 @@
+from .utils import parse_shortcode
+
+
+class UserRef:
+    """
+    A reference to a Threads.net user whose numeric ID is already known.
+
+    Passing a UserRef instead of a username skips the profile page fetch done by get_user_id.
+    """
+
+    __slots__ = ("user_id", "username")
+
+    def __init__(self, user_id, username=None):
+        """
+        Initializes a UserRef instance.
+
+        Args:
+            user_id (int or str): The numeric user ID.
+            username (str, optional): The username, required only by methods that query by username.
+        """
+        self.user_id = int(user_id)
+        self.username = username
+
+    @classmethod
+    def from_node(cls, node):
+        """
+        Build a UserRef from a user dict found in a GraphQL response.
+
+        Args:
+            node (dict): A user dict with a 'pk' or 'id' key and optionally 'username'.
+
+        Returns:
+            UserRef: The user reference.
+        """
+        return cls(node.get("pk") or node["id"], node.get("username"))
+
+    def __eq__(self, other):
+        return isinstance(other, UserRef) and self.user_id == other.user_id
+
+    def __hash__(self):
+        return hash(("user", self.user_id))
+
+    def __str__(self):
+        return self.username or str(self.user_id)
+
+    def __repr__(self):
+        return "UserRef(user_id={!r}, username={!r})".format(self.user_id, self.username)
+
+
+class PostRef:
+    """
+    A reference to a Threads.net post whose numeric IDs are already known.
+
+    Passing a PostRef instead of a post URL skips the post page fetch done by get_post_id and get_id.
+    """
+
+    __slots__ = ("post_id", "user_id", "url", "code")
+
+    def __init__(self, post_id=None, user_id=None, url=None, id=None, code=None):
+        """
+        Initializes a PostRef instance.
+
+        Args:
+            post_id (int or str, optional): The numeric post ID (the media pk).
+            user_id (int or str, optional): The numeric user ID of the post author, needed by delete_thread.
+            url (str, optional): The post URL, used as a fallback when an ID is missing.
+            id (str, optional): The composite '<post_id>_<user_id>' ID, split into post_id and user_id.
+            code (str, optional): The shortcode of the post URL, parsed from url when omitted.
+        """
+        if id is not None:
+            post_id, user_id = str(id).split("_", 1)
+
+        if post_id is None and url is None:
+            raise ValueError("PostRef requires a post_id, id or url")
+
+        self.post_id = None if post_id is None else str(post_id)
+        self.user_id = None if user_id is None else str(user_id)
+        self.url = url
+        self.code = code if code is not None or url is None else parse_shortcode(url)
+
+    @property
+    def id(self):
+        """
+        The composite '<post_id>_<user_id>' ID, or None when either part is unknown.
+        """
+        if self.post_id is None or self.user_id is None:
+            return None
+        return "{}_{}".format(self.post_id, self.user_id)
+
+    @classmethod
+    def from_node(cls, post):
+        """
+        Build a PostRef from a post dict found in a GraphQL response.
+
+        Args:
+            post (dict): A post dict with a 'pk' key and optionally 'id', 'code' and 'user'.
+
+        Returns:
+            PostRef: The post reference.
+        """
+        user = post.get("user") or {}
+        user_id = user.get("pk") or user.get("id")
+
+        if user_id is None and "_" in str(post.get("id", "")):
+            return cls(id=post["id"])
+
+        url = None
+        if post.get("code") and user.get("username"):
+            url = "https://www.threads.net/@{}/post/{}".format(user["username"], post["code"])
+
+        return cls(post.get("pk"), user_id, url, code=post.get("code"))
+
+    def __eq__(self, other):
+        return isinstance(other, PostRef) and (self.post_id, self.url) == (other.post_id, other.url)
+
+    def __hash__(self):
+        return hash(("post", self.post_id, self.url))
+
+    def __str__(self):
+        return self.url or self.post_id
+
+    def __repr__(self):
+        return "PostRef(post_id={!r}, user_id={!r}, url={!r}, code={!r})".format(self.post_id, self.user_id, self.url, self.code)
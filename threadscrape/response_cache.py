@@ -0,0 +1,238 @@
+import asyncio, threading, time, uuid
+from .cache import LRUCache
+from .operations import OPERATIONS
+
+# Seconds a response stays fresh, operations missing from the table aren't cached
+DEFAULT_TTLS = {
+    "get_profile_info": 300,
+    "get_post_info": 120,
+    "search": 600,
+    "get_user_profile_threads": 120,
+}
+
+
+def operation_tag(name):
+    """
+    Get the tag every cached response of an operation is stored under.
+
+    Args:
+        name (str): The key of the operation in operations.OPERATIONS.
+
+    Returns:
+        str: The tag.
+    """
+    return "op:" + OPERATIONS[name].friendly_name
+
+
+class ResponseCache:
+    """
+    Caches the responses of read-only GraphQL queries, keyed on friendly name, doc_id and variables.
+
+    A response is served from the cache for its operation's ttl. For stale_ttl seconds after that it is
+    still served, while a background request refreshes it. Every response is stored under tags, such as
+    'user:<id>' or 'post:<id>', and invalidating a tag drops every response stored under it. Tags are
+    versioned in the backend, so invalidation is one write and survives restarts with SQLiteCache.
+    """
+
+    def __init__(self, backend=None, ttls=None, stale_ttl=60):
+        """
+        Initializes a ResponseCache instance.
+
+        Args:
+            backend (optional): Where responses are stored, LRUCache or SQLiteCache (default is an in-memory LRUCache).
+            ttls (dict, optional): Maps an operation name to the seconds its responses stay fresh (default is DEFAULT_TTLS).
+            stale_ttl (float, optional): Seconds a stale response is still served while it's refreshed (default is 60).
+        """
+        self.backend = backend if backend is not None else LRUCache(maxsize=4096)
+        self.ttls = {
+            OPERATIONS[name].friendly_name: ttl for name, ttl in (DEFAULT_TTLS if ttls is None else ttls).items()
+        }
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._refreshing = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+        # Tag versions must outlive every entry recorded against them
+        self._tag_ttl = max(list(self.ttls.values()) + [0]) + stale_ttl + 3600
+
+    def key(self, data):
+        """
+        Get the cache key of a request.
+
+        Args:
+            data (dict): The form data built by Operation.build.
+
+        Returns:
+            str: The key.
+        """
+        return "response:{}:{}:{}".format(data['fb_api_req_friendly_name'], data['doc_id'], data['variables'])
+
+    def _tag_version(self, tag, create=False):
+        version = self.backend.get("tag:" + tag)
+        if version is None and create:
+            version = uuid.uuid4().hex
+            self.backend.set("tag:" + tag, version, ttl=self._tag_ttl)
+        return version
+
+    def _versions(self, tags):
+        # Read before the request is sent, so an invalidation racing it leaves the entry stale
+        return {tag: self._tag_version(tag, create=True) for tag in tags}
+
+    def _store(self, key, value, ttl, versions):
+        self.backend.set(key, {"value": value, "stored_at": time.time(), "tags": versions}, ttl=ttl + self.stale_ttl)
+
+    def _start_refresh(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _refresh(self, key, send, ttl, tags):
+        if not self._start_refresh(key):
+            return
+
+        def run():
+            try:
+                versions = self._versions(tags)
+                self._store(key, send(), ttl, versions)
+            except Exception:
+                # The stale entry keeps being served until it expires, then the next call raises
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _refresh_async(self, key, send, ttl, tags):
+        if not self._start_refresh(key):
+            return
+
+        async def run():
+            try:
+                versions = self._versions(tags)
+                self._store(key, await send(), ttl, versions)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # The loop only keeps weak references to tasks
+        task = asyncio.ensure_future(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _lookup(self, key, ttl):
+        # Returns 'fresh', 'stale' or None, and the cached response
+        entry = self.backend.get(key)
+        if entry is not None and all(self._tag_version(tag) == version for tag, version in entry["tags"].items()):
+            age = time.time() - entry["stored_at"]
+            if age < ttl:
+                self.hits += 1
+                return "fresh", entry["value"]
+            if age < ttl + self.stale_ttl:
+                self.stale_hits += 1
+                return "stale", entry["value"]
+
+        self.misses += 1
+        return None, None
+
+    def fetch(self, data, send, tags=()):
+        """
+        Get the response of a request from the cache, or send it.
+
+        Args:
+            data (dict): The form data built by Operation.build.
+            send (callable): Sends the request and returns the parsed response.
+            tags (iterable, optional): Tags the response is stored under, besides its operation tag.
+
+        Returns:
+            dict: The response.
+        """
+        friendly_name = data['fb_api_req_friendly_name']
+        ttl = self.ttls.get(friendly_name)
+        if ttl is None:
+            return send()
+
+        key = self.key(data)
+        tags = ["op:" + friendly_name] + list(tags)
+
+        state, value = self._lookup(key, ttl)
+        if state == "stale":
+            self._refresh(key, send, ttl, tags)
+        if state is not None:
+            return value
+
+        versions = self._versions(tags)
+        value = send()
+        self._store(key, value, ttl, versions)
+
+        return value
+
+    async def fetch_async(self, data, send, tags=()):
+        """
+        The coroutine counterpart of fetch, stale responses being refreshed in a task.
+
+        Args:
+            data (dict): The form data built by Operation.build.
+            send (callable): A coroutine function sending the request and returning the parsed response.
+            tags (iterable, optional): Tags the response is stored under, besides its operation tag.
+
+        Returns:
+            dict: The response.
+        """
+        friendly_name = data['fb_api_req_friendly_name']
+        ttl = self.ttls.get(friendly_name)
+        if ttl is None:
+            return await send()
+
+        key = self.key(data)
+        tags = ["op:" + friendly_name] + list(tags)
+
+        state, value = self._lookup(key, ttl)
+        if state == "stale":
+            self._refresh_async(key, send, ttl, tags)
+        if state is not None:
+            return value
+
+        versions = self._versions(tags)
+        value = await send()
+        self._store(key, value, ttl, versions)
+
+        return value
+
+    def invalidate(self, tags):
+        """
+        Drop every response stored under any of the tags.
+
+        Args:
+            tags (iterable): The tags, see operation_tag for the tag of a whole operation.
+        """
+        for tag in tags:
+            self.backend.set("tag:" + tag, uuid.uuid4().hex, ttl=self._tag_ttl)
+
+    def clear(self):
+        """
+        Drop every cached response and reset the counters.
+        """
+        self.backend.clear()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The fresh hit, stale hit, miss and background refresh counters.
+        """
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses, "refreshes": self.refreshes}
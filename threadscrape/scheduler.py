@@ -0,0 +1,233 @@
+import heapq, itertools, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from .ratelimit import TokenBucket
+
+
+class ScheduledTarget:
+    """
+    A polled target and what's known of how often it changes.
+    """
+
+    __slots__ = ("target", "interval", "due", "rate", "polled_at", "polls", "changes", "failures", "last_error", "removed")
+
+    def __init__(self, target, interval, due):
+        self.target = target
+        self.interval = interval
+        self.due = due
+        self.rate = None
+        self.polled_at = None
+        self.polls = 0
+        self.changes = 0
+        self.failures = 0
+        self.last_error = None
+        self.removed = False
+
+    def __repr__(self):
+        return "ScheduledTarget({!r}, interval={:.1f}s, rate={})".format(self.target, self.interval, self.rate)
+
+
+class PollScheduler:
+    """
+    Polls many targets on a worker pool, each at an interval adapted to how often it changes.
+
+    Targets wait in a priority queue ordered on when they're due. After every poll the target's rate
+    of change, changes per second, is updated as an exponential moving average and its next interval
+    set so that about expected_changes changes are found per poll, within min_interval and
+    max_interval. A target that posts hourly is polled every few minutes, a dormant one backs off to
+    max_interval. Every poll takes a token from a global poll budget, so the polls per second stay
+    fixed however many targets are watched. A poll may send several requests, such as a ThreadWatcher
+    poll reading more than one page, so the request rate is bounded by the client's own rate limiter.
+    """
+
+    def __init__(self, poll, budget=1.0, max_workers=8, min_interval=60.0, max_interval=86400.0,
+                 initial_interval=600.0, expected_changes=1.0, smoothing=0.3):
+        """
+        Initializes a PollScheduler instance.
+
+        Args:
+            poll (callable): Called with a target, returns the number of changes found, such as
+                lambda username: len(watcher.poll(username)).
+            budget (float or TokenBucket, optional): The poll budget, polls per second over all targets, or the bucket to take them from (default is 1.0).
+            max_workers (int, optional): The maximum number of polls in flight (default is 8).
+            min_interval (float, optional): The shortest interval between two polls of a target in seconds (default is 60.0).
+            max_interval (float, optional): The longest interval between two polls of a target in seconds (default is 86400.0).
+            initial_interval (float, optional): The interval of a target until its rate is known (default is 600.0).
+            expected_changes (float, optional): The number of changes a poll aims to find (default is 1.0).
+            smoothing (float, optional): Weight of the latest poll in the rate average, between 0 and 1 (default is 0.3).
+        """
+        self.poll = poll
+        self.budget = budget if isinstance(budget, TokenBucket) else TokenBucket(budget)
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.expected_changes = expected_changes
+        self.smoothing = smoothing
+        self.targets = {}
+        self.polls = 0
+        self.failures = 0
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    @classmethod
+    def for_watcher(cls, watcher, on_threads=None, **kwargs):
+        """
+        Build a scheduler polling the profiles of a ThreadWatcher, each new thread being a change.
+
+        Args:
+            watcher (ThreadWatcher): The watcher the profiles are polled with.
+            on_threads (callable, optional): Called with the username and the list of new threads of every poll finding some.
+            **kwargs: The other PollScheduler arguments.
+
+        Returns:
+            PollScheduler: The scheduler, targets being usernames.
+        """
+        def poll(username):
+            threads = watcher.poll(username)
+            if threads and on_threads is not None:
+                on_threads(username, threads)
+            return len(threads)
+
+        return cls(poll, **kwargs)
+
+    def _push(self, entry):
+        heapq.heappush(self._heap, (entry.due, next(self._counter), entry))
+        self._cond.notify()
+
+    def add(self, target, delay=0.0):
+        """
+        Start polling a target.
+
+        Args:
+            target: A hashable target passed to poll, such as a username.
+            delay (float, optional): Seconds until its first poll (default is 0.0).
+        """
+        with self._cond:
+            if target in self.targets:
+                return
+            entry = self.targets[target] = ScheduledTarget(target, self.initial_interval, time.monotonic() + delay)
+            self._push(entry)
+
+    def remove(self, target):
+        with self._cond:
+            entry = self.targets.pop(target, None)
+            if entry is not None:
+                entry.removed = True
+
+    def _next_interval(self, entry, changes, now):
+        if entry.polled_at is not None:
+            sample = changes / max(now - entry.polled_at, 1e-9)
+            if entry.rate is None:
+                entry.rate = sample
+            else:
+                entry.rate = self.smoothing * sample + (1 - self.smoothing) * entry.rate
+
+        if entry.rate is None:
+            interval = entry.interval
+        elif entry.rate > 0:
+            interval = self.expected_changes / entry.rate
+        else:
+            interval = entry.interval * 2
+
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _run_one(self, entry):
+        try:
+            changes = self.poll(entry.target)
+        except Exception as error:
+            changes, failed = 0, error
+        else:
+            failed = None
+
+        now = time.monotonic()
+        with self._cond:
+            self.polls += 1
+            entry.polls += 1
+            if failed is None:
+                entry.interval = self._next_interval(entry, changes, now)
+                entry.polled_at = now
+                entry.changes += changes
+                entry.failures = 0
+            else:
+                # A failed poll says nothing of the rate, only push it back
+                self.failures += 1
+                entry.failures += 1
+                entry.last_error = failed
+                entry.interval = min(self.max_interval, entry.interval * 2)
+
+            entry.due = now + entry.interval
+            if not entry.removed:
+                self._push(entry)
+
+    def _next_due(self, deadline):
+        with self._cond:
+            while not self._stopped:
+                while self._heap and self._heap[0][2].removed:
+                    heapq.heappop(self._heap)
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    return None
+
+                wait = None
+                if self._heap:
+                    wait = self._heap[0][0] - now
+                    if wait <= 0:
+                        return heapq.heappop(self._heap)[2]
+                if deadline is not None:
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self._cond.wait(wait)
+        return None
+
+    def run(self, duration=None):
+        """
+        Poll the targets as they come due, until stop is called or duration has elapsed. Returns at
+        once if stop was called before.
+
+        Args:
+            duration (float, optional): Seconds to run for (default is until stop is called).
+        """
+        deadline = time.monotonic() + duration if duration is not None else None
+        slots = threading.Semaphore(self.max_workers)
+
+        def run_one(entry):
+            try:
+                self._run_one(entry)
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                slots.acquire()
+                entry = self._next_due(deadline)
+                if entry is None:
+                    slots.release()
+                    return
+                self.budget.acquire()
+                pool.submit(run_one, entry)
+
+    def stop(self):
+        """
+        Make run return once the polls in flight are done. It may be called before run starts, and a
+        stopped scheduler stays stopped.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Get the scheduler's statistics.
+
+        Returns:
+            dict: The number of targets, polls, failed polls and changes found.
+        """
+        with self._cond:
+            return {
+                "targets": len(self.targets),
+                "polls": self.polls,
+                "failures": self.failures,
+                "changes": sum(entry.changes for entry in self.targets.values()),
+            }
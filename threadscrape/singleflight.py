@@ -0,0 +1,116 @@
+import asyncio, threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one: the first caller runs the function and
+    every caller that arrives while it runs waits for and shares its result or exception.
+
+    The shared result is the same object for every caller, treat it as read-only.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Run func, or wait for the call already running for key.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            func (callable): Called without arguments.
+
+        Returns:
+            The result of func.
+
+        Raises:
+            Any exception raised by func.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.calls += 1
+            else:
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except BaseException as error:
+                call.error = error
+            finally:
+                # Later callers start a new call, this one's result may already be outdated
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """
+        Get the coalescing statistics.
+
+        Returns:
+            dict: The calls run and the calls that shared one already in flight.
+        """
+        return {"calls": self.calls, "shared": self.shared}
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio counterpart of SingleFlight, for coroutine functions.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._futures = {}
+
+    async def do(self, key, func):
+        """
+        Await func(), or the call already running for key.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            func (callable): A coroutine function called without arguments.
+
+        Returns:
+            The result of func.
+        """
+        future = self._futures.get(key)
+        if future is not None:
+            self.shared += 1
+            # Shielded so a cancelled waiter doesn't cancel the call for everyone
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = self._futures[key] = asyncio.ensure_future(func())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._futures.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._futures.pop(key, None))
+
+    def stats(self):
+        return {"calls": self.calls, "shared": self.shared}
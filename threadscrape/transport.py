@@ -0,0 +1,65 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True):
+    """
+    Create a requests session backed by a single pooled transport.
+
+    Args:
+        pool_connections (int, optional): The number of hosts to keep a connection pool for (default is 10).
+        pool_maxsize (int, optional): The maximum number of connections kept open per host (default is 10).
+        pool_block (bool, optional): Wait for a free connection instead of opening an extra one
+            when a host's pool is exhausted (default is False).
+        keep_alive (bool, optional): Reuse connections between requests (default is True).
+
+    Returns:
+        requests.Session: The configured session.
+
+    Note: requests speaks HTTP/1.1 only, connections are reused through keep-alive instead of HTTP/2 multiplexing.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if not keep_alive:
+        session.headers["connection"] = "close"
+
+    return session
+
+
+def pool_stats(session):
+    """
+    Get connection pool statistics for a session.
+
+    Args:
+        session (requests.Session): The session to inspect.
+
+    Returns:
+        dict: Per host statistics with the number of connections opened, requests sent,
+            idle connections and pool size.
+    """
+    stats = {}
+    seen = set()
+
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            # urllib3 fills free slots with None, only real entries are idle connections
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0
+            stats["{}://{}:{}".format(pool.scheme, pool.host, pool.port)] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": idle,
+                "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+            }
+
+    return stats
@@ -1,80 +1,159 @@
-import json
-from .errors import ThreadScrapeError
-
-def get_json_response(response, error_message, expected_status_codes = [200]):
-    """
-    Handle common tasks for JSON responses, including checking status codes.
-
-    Args:
-        response (requests.Response): The HTTP response object.
-        error_message (str): Custom error message to raise in case of errors.
-        expected_status_codes (list): List of expected HTTP status codes.
-
-    Returns:
-        dict: Parsed JSON response.
-
-    Raises:
-        ThreadScrapeError: If the response status code is not in the expected list or if there are GraphQL errors.
-    """
-
-    if response.status_code not in expected_status_codes:
-        raise ThreadScrapeError(error_message)
-
-    try:
-        response_json = response.json()
-        if 'errors' in response_json:
-            # Handle GraphQL errors
-            error_messages = [error.get('message', 'Unknown error') for error in response_json['errors']]
-            raise ThreadScrapeError('\n'.join(error_messages))
-        return response_json
-    
-    except json.JSONDecodeError:
-        raise ThreadScrapeError("Error decoding JSON response")
-
-
-
-
-def arrange_media_data(json_data, image_size="original"):
-
-    data = json_data
-
-    carousel_media = data['data']['data']['edges'][0]['node']['thread_items'][0]['post']['carousel_media']
-
-    # Initialize an empty list to store image URLs
-    images = []
-    videos = []
-    if carousel_media is not None:
-      # Iterate through carousel media and append image URLs with the specified size to the list
-      for index, media in enumerate(carousel_media):
-          image_versions = media.get('image_versions2', {})
-          if image_versions:
-              for candidate in image_versions.get('candidates', []):
-                  url = candidate.get('url', '')
-                  if image_size == "original" or f"_s{image_size}x{image_size}" in url:
-                      image_data = {
-                          "url": url,
-                          "height": image_size if image_size != "original" else media.get("original_height", ""),
-                          "width": image_size if image_size != "original" else media.get("original_width", ""),
-                          "index": index + 1  # Add the index to image_data
-                      }
-                      images.append(image_data)
-                      break  # Stop looking for other sizes once found
-
-
-    else:
-          image_versions = data['data']['data']['edges'][0]['node']['thread_items'][0]['post']
-      
-          image_data = {
-              "url": image_versions.get('image_versions2', [{}]).get('candidates', [{}])[0].get('url'),
-              "height": image_versions.get("original_height", ""),
-              "width": image_versions.get("original_width", ""),
-              "index": 1  # Add the index for the fallback image
-          }
-          images.append(image_data)
-
-    result = {
-        "images": images,
-        "videos": videos
-    }
-
-    return result
\ No newline at end of file
+import re
+from .errors import ThreadScrapeError, RateLimitError, ServerError
+from .decoding import JSONDecoder, DECODE_ERRORS
+from .media import iter_post_media
+
+DEFAULT_DECODER = JSONDecoder()
+
+def validate_credentials(data):
+    """
+    Check that user session data has every required key in the expected format.
+
+    Args:
+        data (dict): A dictionary containing user session data.
+
+    Raises:
+        ValueError: If required keys are missing or data format is invalid.
+    """
+    # Check if all required keys are present
+    required_keys = ["sessionid", "fb_dtsg", "x-csrftoken"]
+    missing_keys = [key for key in required_keys if key not in data]
+
+    if missing_keys:
+        raise ValueError(f"Missing keys: {', '.join(missing_keys)}")
+
+    # Check if values are in the expected format
+    if not isinstance(data["sessionid"], str) or not isinstance(data["fb_dtsg"], str) or not isinstance(data["x-csrftoken"], str):
+        raise ValueError("Invalid data format")
+
+def parse_username(url):
+    """
+    Get the username from a Threads.net profile URL or username.
+
+    Args:
+        url (str): The profile URL or username.
+
+    Returns:
+        str: The username.
+    """
+    if "https" in url:
+        pattern = r'https://www\.threads\.net/@([^/]+)'
+        return re.search(pattern, url).group(1)
+
+    return url
+
+def parse_shortcode(url):
+    """
+    Get the shortcode from a Threads.net post URL.
+
+    Args:
+        url (str): The post URL.
+
+    Returns:
+        str: The shortcode, or None when the URL isn't a post URL.
+    """
+    match = re.search(r'/post/([^/?#]+)', url)
+
+    return match.group(1) if match else None
+
+def post_cache_key(url):
+    """
+    Normalize a Threads.net post URL into a cache key, ignoring the query string, fragment and trailing slash.
+
+    Args:
+        url (str): The post URL.
+
+    Returns:
+        str: The cache key.
+    """
+    return re.split(r'[?#]', url, 1)[0].rstrip('/').lower()
+
+def parse_retry_after(response):
+    """
+    Get the Retry-After header of a response in seconds.
+
+    Args:
+        response (requests.Response): The HTTP response object.
+
+    Returns:
+        float: The delay, or None when the header is missing or is an HTTP date.
+    """
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def get_json_response(response, error_message, expected_status_codes = [200], decoder=None, key=None):
+    """
+    Handle common tasks for JSON responses, including checking status codes.
+
+    Args:
+        response (requests.Response): The HTTP response object.
+        error_message (str): Custom error message to raise in case of errors.
+        expected_status_codes (list): List of expected HTTP status codes.
+        decoder (JSONDecoder, optional): Decodes the body (default is DEFAULT_DECODER).
+        key (str, optional): The friendly name of the request, selects the decoder schema.
+
+    Returns:
+        dict: Parsed JSON response.
+
+    Raises:
+        RateLimitError: If the response status code is 429.
+        ServerError: If the response status code is 5xx.
+        ThreadScrapeError: If the response status code is not in the expected list or if there are GraphQL errors.
+    """
+
+    if response.status_code == 429:
+        raise RateLimitError(error_message, retry_after=parse_retry_after(response))
+
+    if response.status_code >= 500:
+        raise ServerError(error_message, response.status_code)
+
+    if response.status_code not in expected_status_codes:
+        raise ThreadScrapeError(error_message)
+
+    try:
+        # Decoding the raw bytes skips the text decode of response.json()
+        response_json = (decoder or DEFAULT_DECODER).decode(response.content, key)
+    except DECODE_ERRORS:
+        raise ThreadScrapeError("Error decoding JSON response")
+
+    if 'errors' in response_json:
+        # Handle GraphQL errors
+        error_messages = [error.get('message', 'Unknown error') for error in response_json['errors']]
+        raise ThreadScrapeError('\n'.join(error_messages))
+    return response_json
+
+def arrange_media_data(json_data, image_size="original", include_replies=False):
+    """
+    Get the images and videos of every thread item of the post in a get_post_info response.
+
+    Args:
+        json_data (dict): The get_post_info response.
+        image_size (str or int, optional): "original" for the largest image, or a size in pixels to get the
+            largest image whose longest side fits in it (default is "original").
+        include_replies (bool, optional): Also include the media of the reply threads (default is False).
+
+    Returns:
+        dict: 'images' and 'videos' lists of dicts with 'url', 'height', 'width' and 'index', the index numbering
+            every media from 1 in page order. A video's image is its thumbnail.
+    """
+    max_size = None if image_size == "original" else int(image_size)
+
+    images = []
+    videos = []
+    for entry in iter_post_media(json_data, include_replies):
+        image = entry.images.best(max_size)
+        if image is not None:
+            images.append({"url": image.url, "height": image.height, "width": image.width, "index": entry.index})
+
+        video = entry.videos.largest
+        if video is not None:
+            videos.append({"url": video.url, "height": video.height, "width": video.width, "index": entry.index})
+
+    result = {
+        "images": images,
+        "videos": videos
+    }
+
+    return result
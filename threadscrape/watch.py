@@ -0,0 +1,187 @@
+import sqlite3, threading, time
+from collections import namedtuple
+from .batch import run_batch
+from .models import Thread
+
+NewThread = namedtuple("NewThread", ["user_id", "username", "thread"])
+
+
+def _mark(thread):
+    # Threads are ordered on their root post, newest first
+    post = thread.posts[0] if thread.posts else None
+    if post is None:
+        return None
+    return (post.taken_at or 0, post.pk or 0)
+
+
+class WatchState:
+    """
+    The high-water mark of every watched user, the (taken_at, pk) of the newest post seen, in SQLite.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes a WatchState instance.
+
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            "user_id TEXT PRIMARY KEY, username TEXT, taken_at INTEGER NOT NULL, pk INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, user_id):
+        """
+        Get the mark of a user.
+
+        Args:
+            user_id (int): The user ID.
+
+        Returns:
+            tuple: (taken_at, pk) of the newest post seen, or None for a user never polled.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT taken_at, pk FROM watermarks WHERE user_id = ?", (str(user_id),)).fetchone()
+        return tuple(row) if row is not None else None
+
+    def set(self, user_id, mark, username=None):
+        """
+        Store the mark of a user, unless it's older than the stored one.
+
+        Args:
+            user_id (int): The user ID.
+            mark (tuple): (taken_at, pk) of the newest post seen.
+            username (str, optional): Stored alongside for reference.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO watermarks (user_id, username, taken_at, pk, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET username = COALESCE(excluded.username, username), "
+                "taken_at = excluded.taken_at, pk = excluded.pk, updated_at = excluded.updated_at "
+                "WHERE (excluded.taken_at, excluded.pk) > (taken_at, pk)",
+                (str(user_id), username, mark[0], mark[1], time.time()),
+            )
+            self._conn.commit()
+
+    def forget(self, user_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM watermarks WHERE user_id = ?", (str(user_id),))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM watermarks").fetchone()[0]
+
+
+class ThreadWatcher:
+    """
+    Polls the profile threads of watched users and emits only the threads posted since the last poll.
+
+    Pages are fetched newest first until one ends with a thread at or below the user's mark, so a poll
+    costs one small page unless more than page_size threads were posted. Pinned threads at the top of
+    a profile don't stop pagination, only the last thread of a page is compared.
+    """
+
+    def __init__(self, api, state, page_size=10, max_pages=10, first_poll_pages=1):
+        """
+        Initializes a ThreadWatcher instance.
+
+        Args:
+            api (ThreadScrape): The client the profiles are fetched with.
+            state (WatchState): Where the marks are stored.
+            page_size (int, optional): Threads per page (default is 10).
+            max_pages (int, optional): The maximum number of pages fetched per user and poll (default is 10).
+            first_poll_pages (int, optional): Pages emitted for a user polled for the first time, 0 only
+                records the mark (default is 1).
+        """
+        self.api = api
+        self.state = state
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.first_poll_pages = first_poll_pages
+
+    def _collect(self, username):
+        user = self.api._user_ref(username)
+        mark = self.state.get(user.user_id)
+        max_pages = self.max_pages if mark is not None else max(1, self.first_poll_pages)
+
+        pages = self.api.iter_user_profile_threads(user, self.page_size).pages()
+
+        new = []
+        newest = mark
+        for number, connection in enumerate(pages, 1):
+            threads = [Thread(edge["node"]) for edge in connection.get("edges") or []]
+            for thread in threads:
+                thread_mark = _mark(thread)
+                if thread_mark is None:
+                    continue
+                if mark is None or thread_mark > mark:
+                    new.append(thread)
+                if newest is None or thread_mark > newest:
+                    newest = thread_mark
+
+            last = _mark(threads[-1]) if threads else None
+            if number >= max_pages or (mark is not None and last is not None and last <= mark):
+                break
+
+        if mark is None and not self.first_poll_pages:
+            new = []
+
+        return user, new, newest
+
+    def poll(self, username):
+        """
+        Get the threads a user posted since the last poll, and advance the user's mark.
+
+        Args:
+            username (str or UserRef): The username, profile URL or UserRef.
+
+        Returns:
+            list: The new threads as models.Thread, newest first.
+        """
+        user, new, newest = self._collect(username)
+        if newest is not None:
+            self.state.set(user.user_id, newest, user.username)
+        return new
+
+    def stream(self, usernames, interval=None, max_workers=8):
+        """
+        Poll many users concurrently and emit their new threads.
+
+        A user's mark advances only once all of its new threads have been consumed, so threads are
+        emitted again after a crash rather than lost.
+
+        Args:
+            usernames (iterable): Usernames, profile URLs or UserRefs.
+            interval (float, optional): Seconds between the starts of two cycles, polls once when None (default is None).
+            max_workers (int, optional): The maximum number of users polled at once (default is 8).
+
+        Yields:
+            NewThread: The user ID, username and thread of every new thread. Users whose poll failed
+                are skipped until the next cycle.
+        """
+        usernames = list(usernames)
+        while True:
+            started = time.monotonic()
+            for item in run_batch(self._collect, usernames, max_workers=max_workers, ordered=False):
+                if not item.ok:
+                    continue
+
+                user, new, newest = item.result
+                for thread in new:
+                    yield NewThread(user.user_id, user.username, thread)
+                if newest is not None:
+                    self.state.set(user.user_id, newest, user.username)
+
+            if interval is None:
+                return
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))